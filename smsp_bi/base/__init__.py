@@ -1,2 +1,2 @@
-from .bi import BI_2
+from .bi import BI_2, BI_2_V, BI_3
 from .ti import TI
@@ -1,40 +1,115 @@
-import math
 from abc import ABC, abstractmethod
 
-from smsp_bi.utils import irange
+import numpy as np
+
+from smsp_bi import preprocessing
+from smsp_bi.base.indices import BucketIndices
+from smsp_bi.stats import Stats
+from smsp_bi.utils import SMSP, Schedule
 
 
 class BI_2(ABC):
-    def __init__(self, smsp):
-        # smsp is SMSP object
+    def __init__(self, smsp, preprocess=False, precedences=False, relax=False):
+        # smsp is SMSP object.  If preprocess is True, variables are only
+        # created for start times within the windows given by start_windows.
+        # If precedences is True, the precedences between jobs given by
+        # preprocessing.precedences are added as constraints, or as lazy
+        # constraints, where supported, if precedences is "lazy".  If relax is
+        # True the LP relaxation is solved, see set_relax.  The build and solves
+        # are measured in stats.
+        self.stats = Stats(f"{type(self).__module__}.{type(self).__name__}")
         self.smsp = smsp.copy()
         self.p = smsp._processing_times
         self.d = smsp._due_dates
         self.c = smsp._cost
+        self.preprocess = preprocess
+        self.precedences = precedences
+        self.before = None
+        if preprocess or precedences:
+            self.before = preprocessing.precedences(self.smsp)
+        self.relax = False
 
-        self._setup()
+        self._stage(self._setup)
         self._create_model()
+        if relax:
+            self.set_relax(True)
 
     def _setup(self):
-        T = sum(self.p)
+        T = self.smsp.horizon()
         self.J = range(len(self.p))
         self.Delta = min(self.p)
-        self.B = int(math.ceil(T / self.Delta))
+        # a schedule may complete at T, which is in bucket T // Delta + 1
+        self.B = T // self.Delta + 1
         self.P = [p_ // self.Delta + 1 for p_ in self.p]
         self.pi = [P_ - p_ / self.Delta for P_, p_ in zip(self.P, self.p)]
         self.K = [(0, 1) if p_ % self.Delta else (0,) for p_ in self.p]
+        self._setup_due_dates()
+        first = np.ones(len(self.p), dtype=int)
+        last = self.B - np.array(self.P) + 1
+        if self.preprocess:
+            earliest, latest = preprocessing.start_windows(
+                self.smsp, before=self.before
+            )
+            first = earliest // self.Delta + 1
+            last = np.minimum(last, latest // self.Delta + 1)
+        if self.smsp.has_time_windows():
+            earliest, latest = self.smsp.time_windows()
+            first = np.maximum(first, earliest // self.Delta + 1)
+            last = np.minimum(last, latest // self.Delta + 1)
+        self.z_indices = BucketIndices.from_ranges(
+            first=[[first[j], first[j]] for j in self.J],
+            last=[[last[j] if k in self.K[j] else 0 for k in (0, 1)] for j in self.J],
+            spans=[[self.P[j], self.P[j] + 1] for j in self.J],
+            n_buckets=self.B,
+        )
+        self._setup_remainders()
+
+    def _setup_remainders(self):
+        # The least and most time remaining in bucket b when job j starts, for
+        # each z[j, b, k], which bound u[j, b, k] (scaled by Delta).  A job
+        # spans an extra bucket (k = 1) if no more than p % Delta remains.  The
+        # release dates and deadlines of jobs starting in the buckets at the
+        # ends of their windows narrow these ranges, and indices whose range
+        # is empty are dropped.
+        z = self.z_indices
+        remainder = self.p[z.j] % self.Delta
+        self.remainder_lb = np.where(z.k == 0, remainder + 1, 1)
+        self.remainder_ub = np.where(z.k == 0, self.Delta, remainder)
+        if self.smsp.has_time_windows():
+            earliest, latest = self.smsp.time_windows()
+            end = self.Delta * z.b
+            self.remainder_lb = np.maximum(self.remainder_lb, end - latest[z.j])
+            self.remainder_ub = np.minimum(self.remainder_ub, end - earliest[z.j])
+            keep = self.remainder_lb <= self.remainder_ub
+            self.z_indices = BucketIndices(
+                z.j[keep], z.b[keep], z.k[keep], z.e[keep], z.n_jobs, z.n_buckets
+            )
+            self.remainder_lb = self.remainder_lb[keep]
+            self.remainder_ub = self.remainder_ub[keep]
+
+    def _setup_due_dates(self):
         self.D = [d_ // self.Delta + 1 for d_ in self.d]
         self.delta = [D_ - d_ / self.Delta for D_, d_ in zip(self.D, self.d)]
-        self.z_indices = [
-            (j, b, k)
-            for j in self.J
-            for k in self.K[j]
-            for b in irange(1, self.B - self.P[j] + 1)
-        ]
+        self.Delta_delta = [self.Delta * D_ - d_ for D_, d_ in zip(self.D, self.d)]
 
     def _setup_slim(self):
         self.Delta_pi = [self.Delta * P_ - p_ for P_, p_ in zip(self.P, self.p)]
-        self.Delta_delta = [self.Delta * D_ - d_ for D_, d_ in zip(self.D, self.d)]
+
+    def _T_indices(self, jobs):
+        return [
+            (j, b, k)
+            for j in jobs
+            for _, b, k in self.z_indices.job(j)
+            if b >= self.D[j]
+        ]
+
+    def _due_jobs(self, jobs, k):
+        # jobs j for which z[j, D[j], k] exists
+        return [j for j in jobs if (j, self.D[j], k) in self.z_indices]
+
+    def _T_cost(self, j):
+        # objective coefficient of the T variables of job j
+        return self.c[j] * self.Delta
 
     @abstractmethod
     def _update(self):
@@ -64,62 +139,409 @@ class BI_2(ABC):
     def _create_u_upper_bound_constraints(self):
         pass
 
+    @abstractmethod
+    def _size(self):
+        # the rows, columns and nonzeros of the model
+        pass
+
+    def _stage(self, method, *args):
+        # runs a stage of the build, recording it in stats
+        with self.stats.stage(method.__name__.strip("_"), self._size):
+            method(*args)
+
     def _create_base_model(self):
-        self._create_z_u_variables()
-        self._update()
-        self._add_job_completion_constraints()
-        self._add_machine_capacity_constraints_1()
-        self._add_machine_capacity_constraints_2()
-        self._create_u_lower_bound_constraints()
-        self._create_u_upper_bound_constraints()
+        self._stage(self._create_z_u_variables)
+        self._stage(self._update)
+        self._stage(self._add_job_completion_constraints)
+        self._stage(self._add_machine_capacity_constraints_1)
+        self._stage(self._add_machine_capacity_constraints_2)
+        self._stage(self._create_u_lower_bound_constraints)
+        self._stage(self._create_u_upper_bound_constraints)
 
     @abstractmethod
-    def _create_T_variables(self):
+    def _create_T_variables(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_k0_lower_bound_constraints(self):
+    def _create_T_k0_lower_bound_constraints(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_k0_upper_bound_constraints(self):
+    def _create_T_k0_upper_bound_constraints(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_k1_equality_constraints(self):
+    def _create_T_k1_equality_constraints(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_k1_lower_bound_constraints(self):
+    def _create_T_k1_lower_bound_constraints(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_k1_upper_bound_constraints(self):
+    def _create_T_k1_upper_bound_constraints(self, jobs):
         pass
 
     @abstractmethod
-    def _create_T_equality_constraints(self):
+    def _create_T_equality_constraints(self, jobs):
         pass
 
-    def _create_tardy_vars_constraints(self):
-        self._create_T_variables()
+    def _create_tardy_vars_constraints(self, jobs=None):
+        jobs = self.J if jobs is None else jobs
+        self._stage(self._create_T_variables, jobs)
+        self._stage(self._update)
+        self._stage(self._create_T_k0_lower_bound_constraints, jobs)
+        self._stage(self._create_T_k0_upper_bound_constraints, jobs)
+        self._stage(self._create_T_k1_equality_constraints, jobs)
+        self._stage(self._create_T_k1_lower_bound_constraints, jobs)
+        self._stage(self._create_T_k1_upper_bound_constraints, jobs)
+        self._stage(self._create_T_equality_constraints, jobs)
+
+    @abstractmethod
+    def _remove_tardy_vars_constraints(self, jobs):
+        # removes the T variables of jobs and the constraints containing them
+        pass
+
+    @abstractmethod
+    def _update_costs(self, jobs):
+        # sets the objective coefficients of the T variables of jobs
+        pass
+
+    def update_instance(self, due_dates=None, cost=None):
+        # Changes due dates and/or costs without rebuilding the model.  The z/u
+        # variables and capacity constraints do not depend on either, so only
+        # the tardiness variables and constraints of jobs whose due date has
+        # changed are replaced, and the objective coefficients of jobs whose
+        # cost alone has changed are updated.
+        d = self.d if due_dates is None else np.array(due_dates)
+        c = self.c if cost is None else np.array(cost)
+        due_jobs = np.nonzero(d != self.d)[0]
+        cost_jobs = np.setdiff1d(np.nonzero(c != self.c)[0], due_jobs)
+        if self.before is not None:
+            raise NotImplementedError(
+                "models with preprocessing or precedences can not be updated"
+            )
+        self._remove_tardy_vars_constraints(due_jobs)
+        self.d, self.c = d, c
+        self.smsp = SMSP(
+            self.p, self.d, self.c, self.smsp._release_dates, self.smsp._deadlines
+        )
+        self._setup_due_dates()
+        self._create_tardy_vars_constraints(due_jobs)
+        self._update_costs(cost_jobs)
         self._update()
-        self._create_T_k0_lower_bound_constraints()
-        self._create_T_k0_upper_bound_constraints()
-        self._create_T_k1_equality_constraints()
-        self._create_T_k1_lower_bound_constraints()
-        self._create_T_k1_upper_bound_constraints()
-        self._create_T_equality_constraints()
+
+    def _start_time_coefficients(self):
+        # the start time of job j is the sum, over its indices, of these
+        # coefficients times the z and u variables
+        n = len(self.z_indices)
+        return self.Delta * self.z_indices.b, np.full(n, -self.Delta)
+
+    @abstractmethod
+    def _add_precedence_constraints(self, pairs):
+        # the start time of job i plus p[i] is at most that of job j, for each
+        # (i, j) in pairs
+        pass
 
     def _create_model(self):
         self._create_base_model()
         self._create_tardy_vars_constraints()
-        self._update()
+        if self.precedences:
+            self._stage(
+                self._add_precedence_constraints,
+                zip(*preprocessing.precedence_pairs(self.before)),
+            )
+        self._stage(self._update)
 
     @abstractmethod
     def optimize(self):
         pass
 
     @abstractmethod
+    def _solve_stats(self):
+        # the solver's status, runtime, node count and gap for stats
+        pass
+
+    @abstractmethod
+    def is_optimal(self):
+        # whether optimize found a solution and proved it optimal
+        pass
+
+    @abstractmethod
+    def set_limits(self, threads=None, time_limit=None):
+        # limits on solver threads and time (in seconds), None for no limit
+        pass
+
+    @abstractmethod
+    def get_bound(self):
+        # the objective of the LP relaxation, if relaxed, and otherwise the
+        # best bound on the objective found by optimize
+        pass
+
+    @abstractmethod
+    def _set_integrality(self, variables, integer):
+        pass
+
+    def set_relax(self, relax):
+        # Switches the z variables between continuous (relax=True), so that
+        # optimize solves the LP relaxation, and binary, for the MIP
+        self.relax = relax
+        self._set_integrality(self.z_vars, not relax)
+        self._update()
+
+    @abstractmethod
+    def _get_reduced_costs(self, variables):
+        # reduced costs of variables, as an array in the order of z_indices
+        pass
+
+    @abstractmethod
+    def _fix_to_zero(self, variables, fixed):
+        # fixes to zero the variables for which the boolean array fixed is True
+        pass
+
+    def fix_by_reduced_cost(self, upper_bound):
+        # After solving the LP relaxation, fixes to zero each z variable whose
+        # reduced cost shows that any solution in which it is one has an
+        # objective greater than upper_bound (eg that of a known schedule).
+        # Returns the number of variables fixed.
+        if not self.relax:
+            raise ValueError("reduced cost fixing needs the LP relaxation")
+        reduced_costs = self._get_reduced_costs(self.z_vars)
+        fixed = self.get_bound() + reduced_costs > upper_bound + 1e-6
+        self._fix_to_zero(self.z_vars, fixed)
+        self._update()
+        return int(fixed.sum())
+
+    @abstractmethod
+    def _set_start(self, z_values, u_values, T_values):
+        # sets a MIP start, given values in the order of z_indices
+        pass
+
+    def _start_values(self, schedule):
+        # the z, u and T values of a schedule, in the order of z_indices.  A
+        # job starting at s starts in bucket b = s // Delta + 1, with u the
+        # fraction of the bucket remaining, and spans an extra bucket (k = 1)
+        # if the remainder of the bucket is no more than p % Delta.
+        z = self.z_indices
+        s = np.asarray(schedule.start_times)[z.j]
+        b = s // self.Delta + 1
+        remainder = b * self.Delta - s
+        k = remainder <= self.p[z.j] % self.Delta
+        z_values = ((z.b == b) & (z.k == k)).astype(float)
+        u_values = z_values * remainder / self.Delta
+        T_values = z_values * np.maximum(s - self.d[z.j], 0) / self.Delta
+        return z_values, u_values, T_values
+
+    def set_start(self, start):
+        # start is a Schedule, or a sequence of jobs, to use as a MIP start
+        if not isinstance(start, Schedule):
+            start = self.smsp.get_schedule_from_sequence(start)
+        if not self.smsp.within_time_windows(start):
+            raise ValueError("start misses release dates or deadlines")
+        self._set_start(*self._start_values(start))
+
+    @abstractmethod
+    def _set_cutoff(self, value):
+        pass
+
+    def set_incumbent(self, start):
+        # start is a Schedule, or a sequence of jobs, to use as a MIP start
+        # and whose objective is used as a cutoff
+        if not isinstance(start, Schedule):
+            start = self.smsp.get_schedule_from_sequence(start)
+        self.set_start(start)
+        self._set_cutoff(float(self.smsp.get_objective_from_schedule(start)))
+
+    @abstractmethod
+    def _get_values(self, variables):
+        # solution values of variables, as an array in the order of z_indices
+        pass
+
     def get_schedule(self):
+        z = self.z_indices
+        start_times = np.bincount(
+            z.j,
+            weights=self.Delta
+            * (z.b * self._get_values(self.z_vars) - self._get_values(self.u_vars)),
+            minlength=len(self.J),
+        )
+        start_times = np.round(start_times).astype(int)
+
+        return Schedule(start_times=start_times, end_times=start_times + self.p)
+
+
+class BI_2_V(BI_2):
+    # BI_2 with buckets of varying length, given by bucket_lengths (set by the
+    # backends before _setup).  A job may not start and complete in the same
+    # bucket, so at most two jobs are processed in each, and bucket_lengths
+    # are rejected (ValueError) if a job could start and complete in a bucket,
+    # within its window, as the model would not be exact.  Buckets of length
+    # min(p), the default, are always accepted.  As the buckets differ in
+    # length, u and T are measured in time units.
+    _contained = False
+
+    def _setup(self):
+        T = self.smsp.horizon()
+        self.J = range(len(self.p))
+        lengths = self.bucket_lengths
+        if lengths is None:
+            Delta = self._default_bucket_length()
+            lengths = [Delta] * (T // Delta + 1)
+        if sum(lengths) <= T:
+            raise ValueError("buckets must cover the planning horizon")
+        self.B = len(lengths)
+        self.bounds = np.concatenate(([0], np.cumsum(lengths)))
+        earliest = np.zeros(len(self.p), dtype=int)
+        latest = np.full(len(self.p), self.bounds[-1])
+        if self.preprocess:
+            earliest, latest = preprocessing.start_windows(
+                self.smsp, before=self.before
+            )
+        if self.smsp.has_time_windows():
+            release, last_start = self.smsp.time_windows()
+            earliest = np.maximum(earliest, release)
+            latest = np.minimum(latest, last_start)
+        # jobs complete by the horizon in some optimal schedule
+        self._check_bucket_lengths(earliest, np.minimum(latest, T - self.p))
+        self.z_indices = BucketIndices.from_partition(
+            self.p, self.bounds, earliest, latest, contained=self._contained
+        )
+        z = self.z_indices
+        # the earliest and latest start of job j for each z[j, b, k], and
+        # the time it would use in the buckets it starts and completes in
+        p = self.p[z.j]
+        self.start_lb = np.maximum(self.bounds[z.b - 1], self.bounds[z.e - 1] - p)
+        self.start_lb = np.maximum(self.start_lb, earliest[z.j])
+        self.start_ub = np.minimum(self.bounds[z.b] - 1, self.bounds[z.e] - 1 - p)
+        self.start_ub = np.minimum(self.start_ub, latest[z.j])
+        self.u_lb = self.bounds[z.b] - self.start_ub
+        self.u_ub = self.bounds[z.b] - self.start_lb
+        self.end_usage = self.bounds[z.b] + p - self.bounds[z.e - 1]
+        self.L = np.diff(self.bounds, prepend=0)  # L[b] is the length of bucket b
+        self._setup_due_dates()
+
+    def _default_bucket_length(self):
+        return min(self.p)
+
+    def _containable(self, earliest, latest):
+        # (n, B) array, True where job j can start and complete in bucket b,
+        # starting between earliest[j] and latest[j]
+        start = np.maximum(self.bounds[:-1], earliest[:, None])
+        end = np.minimum(self.bounds[1:] - 1 - self.p[:, None], latest[:, None])
+        return start <= end
+
+    def _check_bucket_lengths(self, earliest, latest):
+        containable = self._containable(earliest, latest).any(axis=0)
+        if containable.any():
+            raise ValueError(
+                f"bucket {np.argmax(containable) + 1} is too long, as a job can "
+                "start and complete in it"
+            )
+
+    def _setup_due_dates(self):
+        # jobs may be tardy (and T variables exist) if started late in the
+        # range of z[j, b, k], and are certainly tardy if started early in it
+        d = self.d[self.z_indices.j]
+        self.tardy = self.start_ub > d
+        self.late = self.start_lb >= d
+
+    def _T_indices(self, jobs, late=None):
+        # late=True (False) selects only those which are (not) certainly tardy
+        selected = self.tardy & np.isin(self.z_indices.j, jobs)
+        if late is not None:
+            selected &= self.late == late
+        return [self.z_indices[col] for col in np.nonzero(selected)[0]]
+
+    def _T_cost(self, j):
+        return self.c[j]
+
+    def _start_time_coefficients(self):
+        z = self.z_indices
+        return self.bounds[z.b], np.full(len(z), -1)
+
+    @abstractmethod
+    def _create_T_lower_bound_constraints(self, jobs):
         pass
+
+    @abstractmethod
+    def _create_T_upper_bound_constraints(self, jobs):
+        pass
+
+    def _create_tardy_vars_constraints(self, jobs=None):
+        jobs = self.J if jobs is None else jobs
+        self._stage(self._create_T_variables, jobs)
+        self._stage(self._update)
+        self._stage(self._create_T_lower_bound_constraints, jobs)
+        self._stage(self._create_T_upper_bound_constraints, jobs)
+        self._stage(self._create_T_equality_constraints, jobs)
+
+    def _start_values(self, schedule):
+        z = self.z_indices
+        s = np.asarray(schedule.start_times)[z.j]
+        b = np.searchsorted(self.bounds, s, side="right")
+        e = np.searchsorted(self.bounds, s + self.p[z.j], side="right")
+        z_values = ((z.b == b) & (z.e == e)).astype(float)
+        u_values = z_values * (self.bounds[z.b] - s)
+        T_values = z_values * np.maximum(s - self.d[z.j], 0)
+        return z_values, u_values, T_values
+
+    def get_schedule(self):
+        z = self.z_indices
+        start_times = np.bincount(
+            z.j,
+            weights=self.bounds[z.b] * self._get_values(self.z_vars)
+            - self._get_values(self.u_vars),
+            minlength=len(self.J),
+        )
+        start_times = np.round(start_times).astype(int)
+
+        return Schedule(start_times=start_times, end_times=start_times + self.p)
+
+
+class BI_3(BI_2_V):
+    # At most three jobs are processed in each bucket: one completing in it, one
+    # starting and completing in it, and one starting in it, in that order.
+    # Buckets are of length p(1) + p(2), the sum of the two shortest processing
+    # times, by default, which ensures no two jobs start and complete in the
+    # same bucket.  bucket_lengths are rejected (ValueError) if two jobs could.
+    _contained = True
+
+    def _default_bucket_length(self):
+        return sum(sorted(self.p)[:2])
+
+    def _check_bucket_lengths(self, earliest, latest):
+        # Two jobs which can each start and complete in a bucket can both do
+        # so if their processing times fit in the time from the earliest of
+        # their starts to the latest of their completions, within the bucket.
+        # This is checked for the two shortest, over all such jobs.
+        containable = self._containable(earliest, latest)
+        for b in np.nonzero(containable.sum(axis=0) > 1)[0]:
+            jobs = np.nonzero(containable[:, b])[0]
+            first = max(self.bounds[b], earliest[jobs].min())
+            last = min(self.bounds[b + 1] - 1, (latest + self.p)[jobs].max())
+            if np.sort(self.p[jobs])[:2].sum() <= last - first:
+                raise ValueError(
+                    f"bucket {b + 1} is too long, as two jobs can start and "
+                    "complete in it"
+                )
+
+    @abstractmethod
+    def _add_machine_capacity_constraints_3(self):
+        # at most one job starts and completes in, or spans, each bucket
+        pass
+
+    @abstractmethod
+    def _add_machine_sequence_constraints_1(self):
+        # a job contained in a bucket starts after the job completing in it
+        pass
+
+    @abstractmethod
+    def _add_machine_sequence_constraints_2(self):
+        # a job contained in a bucket completes before the job starting in it
+        pass
+
+    def _create_base_model(self):
+        super()._create_base_model()
+        self._stage(self._add_machine_capacity_constraints_3)
+        self._stage(self._add_machine_sequence_constraints_1)
+        self._stage(self._add_machine_sequence_constraints_2)
@@ -0,0 +1,239 @@
+from functools import cached_property
+
+import numpy as np
+
+
+class Adjacency:
+    # CSR-style map from a row (eg a bucket) to an array of column ids
+    def __init__(self, rows, columns, n_rows):
+        order = np.argsort(rows, kind="stable")
+        self.columns = np.asarray(columns, dtype=int)[order]
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(rows, minlength=n_rows + 1)))
+        )
+
+    def __getitem__(self, row):
+        return self.columns[self.indptr[row] : self.indptr[row + 1]]
+
+    def rows(self):
+        # the row of each entry in columns
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+
+def _repeat_ranges(first, counts):
+    # concatenation of range(first[i], first[i] + counts[i]) over i
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(first, counts) + offsets
+
+
+class BucketIndices:
+    # The (j, b, k) indices of the z and u variables.  Each index is assigned a
+    # column id, in the order the indices are iterated (by job, then k, then
+    # bucket), so that variable values can be held in flat arrays.  The bucket
+    # in which a job completes is given by ends, and is used to build, for each
+    # bucket, the columns starting in, ending at, and spanning the bucket.
+    def __init__(self, jobs, buckets, ks, ends, n_jobs, n_buckets):
+        self.j = np.asarray(jobs, dtype=int)
+        self.b = np.asarray(buckets, dtype=int)
+        self.k = np.asarray(ks, dtype=int)
+        self.e = np.asarray(ends, dtype=int)
+        self.n_jobs = n_jobs
+        self.n_buckets = n_buckets
+
+        # dense (j, b, k) -> column id, -1 where no variable exists
+        n_k = max(2, self.k.max(initial=0) + 1)
+        self.column = np.full((n_jobs, n_buckets + 1, n_k), -1, dtype=int)
+        self.column[self.j, self.b, self.k] = np.arange(len(self.j))
+
+        self.job_ptr = np.searchsorted(self.j, np.arange(n_jobs + 1))
+
+        self._setup_adjacency()
+
+    @classmethod
+    def from_ranges(cls, first, last, spans, n_buckets):
+        # first[j, k] and last[j, k] give the (inclusive) range of buckets b for
+        # which z[j, b, k] exists and spans[j, k] the number of buckets spanned.
+        # Empty ranges (last < first) create no indices.
+        first = np.asarray(first, dtype=int)
+        last = np.asarray(last, dtype=int)
+        spans = np.asarray(spans, dtype=int)
+        counts = np.maximum(last - first + 1, 0).ravel()
+        jj, kk = np.indices(first.shape)
+        buckets = _repeat_ranges(first.ravel(), counts)
+        return cls(
+            jobs=np.repeat(jj.ravel(), counts),
+            buckets=buckets,
+            ks=np.repeat(kk.ravel(), counts),
+            ends=buckets + np.repeat(spans.ravel(), counts) - 1,
+            n_jobs=first.shape[0],
+            n_buckets=n_buckets,
+        )
+
+    @classmethod
+    def from_partition(cls, p, bounds, earliest, latest, contained=False):
+        # bucket b is [bounds[b - 1], bounds[b]).  z[j, b, k] exists for each
+        # bucket in which job j can complete if started in bucket b, between
+        # earliest[j] and latest[j], with k counting these buckets from the
+        # earliest.  Jobs must complete in the horizon, and may only start and
+        # complete in the same bucket if contained is True.
+        p = np.asarray(p, dtype=int)
+        bounds = np.asarray(bounds, dtype=int)
+        n_buckets = len(bounds) - 1
+        jobs = np.repeat(np.arange(len(p)), n_buckets)
+        buckets = np.tile(np.arange(1, n_buckets + 1), len(p))
+        first_start = np.maximum(bounds[buckets - 1], np.asarray(earliest)[jobs])
+        last_start = np.minimum(bounds[buckets] - 1, np.asarray(latest)[jobs])
+        first = np.searchsorted(bounds, first_start + p[jobs], side="right")
+        last = np.searchsorted(bounds, last_start + p[jobs], side="right")
+        counts = np.where(first_start <= last_start, np.maximum(last - first + 1, 0), 0)
+        ends = _repeat_ranges(first, counts)
+        ks = ends - np.repeat(first, counts)
+        jobs, buckets = np.repeat(jobs, counts), np.repeat(buckets, counts)
+        keep = ((ends > buckets) | contained) & (ends <= n_buckets)
+        order = np.lexsort((buckets[keep], ks[keep], jobs[keep]))
+        return cls(
+            jobs=jobs[keep][order],
+            buckets=buckets[keep][order],
+            ks=ks[keep][order],
+            ends=ends[keep][order],
+            n_jobs=len(p),
+            n_buckets=n_buckets,
+        )
+
+    def _setup_adjacency(self):
+        cols = np.arange(len(self.j))
+        contained = self.e == self.b
+        self.start_adj = Adjacency(self.b[~contained], cols[~contained], self.n_buckets)
+        ending = (self.e <= self.n_buckets) & ~contained
+        self.end_adj = Adjacency(self.e[ending], cols[ending], self.n_buckets)
+        self.contain_adj = Adjacency(self.b[contained], cols[contained], self.n_buckets)
+        counts = np.maximum(np.minimum(self.e, self.n_buckets + 1) - self.b - 1, 0)
+        self.span_adj = Adjacency(
+            _repeat_ranges(self.b + 1, counts),
+            np.repeat(cols, counts),
+            self.n_buckets,
+        )
+
+    @cached_property
+    def _indices(self):
+        return list(zip(self.j.tolist(), self.b.tolist(), self.k.tolist()))
+
+    @cached_property
+    def _lookup(self):
+        return {index: col for col, index in enumerate(self._indices)}
+
+    def __len__(self):
+        return len(self.j)
+
+    def __iter__(self):
+        return iter(self._indices)
+
+    def __getitem__(self, col):
+        return self._indices[col]
+
+    def __contains__(self, index):
+        return index in self._lookup
+
+    def get_column(self, index):
+        return self._lookup.get(index, -1)
+
+    def job(self, j):
+        return self._indices[self.job_ptr[j] : self.job_ptr[j + 1]]
+
+    def _select(self, cols):
+        return [self._indices[col] for col in cols]
+
+    def starting(self, b):
+        # indices of jobs which start in, and complete after, bucket b
+        return self._select(self.start_adj[b])
+
+    def contained(self, b):
+        # indices of jobs which start and complete in bucket b
+        return self._select(self.contain_adj[b])
+
+    def ending(self, b):
+        # indices of jobs which start before, and complete in, bucket b
+        return self._select(self.end_adj[b])
+
+    def spanning(self, b):
+        # indices of jobs which start before, and complete after, bucket b
+        return self._select(self.span_adj[b])
+
+
+class TimeIndices:
+    # The (j, t) indices of the x variables.  As for BucketIndices, each index is
+    # assigned a column id in the order the indices are iterated (by job, then
+    # period).  The periods during which a job would be processing, if started
+    # in period t, are used to build, for each period, the columns covering it.
+    def __init__(self, jobs, periods, durations, n_jobs, n_periods):
+        self.j = np.asarray(jobs, dtype=int)
+        self.t = np.asarray(periods, dtype=int)
+        self.n_jobs = n_jobs
+        self.n_periods = n_periods
+
+        # dense (j, t) -> column id, -1 where no variable exists
+        self.column = np.full((n_jobs, n_periods + 1), -1, dtype=int)
+        self.column[self.j, self.t] = np.arange(len(self.j))
+
+        self.durations = np.asarray(durations, dtype=int)
+        self.job_ptr = np.searchsorted(self.j, np.arange(n_jobs + 1))
+
+    @classmethod
+    def from_ranges(cls, first, last, p, n_periods):
+        # x[j, t] exists for periods t in [first[j], last[j]]
+        first = np.asarray(first, dtype=int)
+        last = np.asarray(last, dtype=int)
+        counts = np.maximum(last - first + 1, 0)
+        jobs = np.repeat(np.arange(len(first)), counts)
+        return cls(
+            jobs=jobs,
+            periods=_repeat_ranges(first, counts),
+            durations=np.asarray(p, dtype=int)[jobs],
+            n_jobs=len(first),
+            n_periods=n_periods,
+        )
+
+    @cached_property
+    def _indices(self):
+        return list(zip(self.j.tolist(), self.t.tolist()))
+
+    @cached_property
+    def _lookup(self):
+        return {index: col for col, index in enumerate(self._indices)}
+
+    def __len__(self):
+        return len(self.j)
+
+    def __iter__(self):
+        return iter(self._indices)
+
+    def __getitem__(self, col):
+        return self._indices[col]
+
+    def __contains__(self, index):
+        return index in self._lookup
+
+    def get_column(self, index):
+        return self._lookup.get(index, -1)
+
+    def job(self, j):
+        return self._indices[self.job_ptr[j] : self.job_ptr[j + 1]]
+
+    def covering_entries(self, first, last):
+        # (period, column) pairs, ordered by period, for the columns covering
+        # each period in [first, last]
+        cols = np.nonzero((self.t <= last) & (self.t + self.durations > first))[0]
+        start = np.maximum(self.t[cols], first)
+        counts = np.minimum(self.t[cols] + self.durations[cols] - 1, last) - start + 1
+        periods = _repeat_ranges(start, counts)
+        order = np.argsort(periods, kind="stable")
+        return periods[order], np.repeat(cols, counts)[order]
+
+    @cached_property
+    def cover_adj(self):
+        periods, cols = self.covering_entries(1, self.n_periods)
+        return Adjacency(periods, cols, self.n_periods)
+
+    def covering(self, t):
+        # indices of jobs which would be processing during period t
+        return [self._indices[col] for col in self.cover_adj[t]]
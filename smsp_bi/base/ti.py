@@ -1,16 +1,59 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from smsp_bi import preprocessing
+from smsp_bi.base.indices import TimeIndices
+from smsp_bi.stats import Stats
+from smsp_bi.utils import SMSP, Schedule
+
 
 class TI(ABC):
-    def __init__(self, smsp):
-        # smsp is SMSP object
+    def __init__(self, smsp, preprocess=False, precedences=False, relax=False):
+        # smsp is SMSP object.  If preprocess is True, variables are only
+        # created for start times within the windows given by start_windows.
+        # If precedences is True, the precedences between jobs given by
+        # preprocessing.precedences are added as constraints, or as lazy
+        # constraints, where supported, if precedences is "lazy".  If relax is
+        # True the LP relaxation is solved, see set_relax.  The build and solves
+        # are measured in stats.
+        self.stats = Stats(f"{type(self).__module__}.{type(self).__name__}")
         self.smsp = smsp.copy()
         self.p = smsp._processing_times
         self.d = smsp._due_dates
         self.c = smsp._cost
-        self.T = sum(self.p)
-        self.J = range(len(self.p))
+        self.preprocess = preprocess
+        self.precedences = precedences
+        self.before = None
+        if preprocess or precedences:
+            self.before = preprocessing.precedences(self.smsp)
+        self.relax = False
+        self._stage(self._setup)
         self._create_model()
+        if relax:
+            self.set_relax(True)
+
+    def _x_ranges(self):
+        # the first and last period in which each job may start, within its
+        # release date and deadline
+        if self.preprocess:
+            earliest, latest = preprocessing.start_windows(
+                self.smsp, before=self.before
+            )
+        else:
+            earliest, latest = self.smsp.time_windows()
+        return earliest + 1, latest + 1
+
+    def _setup(self):
+        self.T = self.smsp.horizon()
+        self.J = range(len(self.p))
+        first, last = self._x_ranges()
+        self.x_indices = TimeIndices.from_ranges(
+            first=first,
+            last=last,
+            p=self.p,
+            n_periods=self.T,
+        )
 
     def _make_cost(self, j, t):
         return self.c[j] * max(0, t - 1 - self.d[j])
@@ -19,6 +62,29 @@ class TI(ABC):
     def _update(self):
         pass
 
+    @abstractmethod
+    def _update_costs(self, jobs):
+        # sets the objective coefficients of the x variables of jobs
+        pass
+
+    def update_instance(self, due_dates=None, cost=None):
+        # Changes due dates and/or costs without rebuilding the model.  Both
+        # only appear in the objective, so just the objective coefficients of
+        # the x variables of changed jobs are updated.
+        d = self.d if due_dates is None else np.array(due_dates)
+        c = self.c if cost is None else np.array(cost)
+        if self.before is not None:
+            raise NotImplementedError(
+                "models with preprocessing or precedences can not be updated"
+            )
+        jobs = np.nonzero((d != self.d) | (c != self.c))[0]
+        self.d, self.c = d, c
+        self.smsp = SMSP(
+            self.p, self.d, self.c, self.smsp._release_dates, self.smsp._deadlines
+        )
+        self._update_costs(jobs)
+        self._update()
+
     @abstractmethod
     def _create_x_variables(self):
         pass
@@ -31,16 +97,131 @@ class TI(ABC):
     def _add_machine_capacity_constraints(self):
         pass
 
+    @abstractmethod
+    def _add_precedence_constraints(self, pairs):
+        # the start time of job i plus p[i] is at most that of job j, for each
+        # (i, j) in pairs
+        pass
+
+    @abstractmethod
+    def _size(self):
+        # the rows, columns and nonzeros of the model
+        pass
+
+    def _stage(self, method, *args):
+        # runs a stage of the build, recording it in stats
+        with self.stats.stage(method.__name__.strip("_"), self._size):
+            method(*args)
+
     def _create_model(self):
-        self._create_x_variables()
-        self._update()
-        self._add_job_completion_constraints()
-        self._add_machine_capacity_constraints()
+        self._stage(self._create_x_variables)
+        self._stage(self._update)
+        self._stage(self._add_job_completion_constraints)
+        self._stage(self._add_machine_capacity_constraints)
+        if self.precedences:
+            self._stage(
+                self._add_precedence_constraints,
+                zip(*preprocessing.precedence_pairs(self.before)),
+            )
+        self._stage(self._update)
 
     @abstractmethod
     def optimize(self):
         pass
 
     @abstractmethod
-    def get_schedule(self):
+    def _solve_stats(self):
+        # the solver's status, runtime, node count and gap for stats
+        pass
+
+    @abstractmethod
+    def is_optimal(self):
+        # whether optimize found a solution and proved it optimal
+        pass
+
+    @abstractmethod
+    def set_limits(self, threads=None, time_limit=None):
+        # limits on solver threads and time (in seconds), None for no limit
+        pass
+
+    @abstractmethod
+    def get_bound(self):
+        # the objective of the LP relaxation, if relaxed, and otherwise the
+        # best bound on the objective found by optimize
+        pass
+
+    @abstractmethod
+    def _set_integrality(self, variables, integer):
+        pass
+
+    def set_relax(self, relax):
+        # Switches the x variables between continuous (relax=True), so that
+        # optimize solves the LP relaxation, and binary, for the MIP
+        self.relax = relax
+        self._set_integrality(self.x_vars, not relax)
+        self._update()
+
+    @abstractmethod
+    def _get_reduced_costs(self, variables):
+        # reduced costs of variables, as an array in the order of x_indices
+        pass
+
+    @abstractmethod
+    def _fix_to_zero(self, variables, fixed):
+        # fixes to zero the variables for which the boolean array fixed is True
+        pass
+
+    def fix_by_reduced_cost(self, upper_bound):
+        # After solving the LP relaxation, fixes to zero each x variable whose
+        # reduced cost shows that any solution in which it is one has an
+        # objective greater than upper_bound (eg that of a known schedule).
+        # Returns the number of variables fixed.
+        if not self.relax:
+            raise ValueError("reduced cost fixing needs the LP relaxation")
+        reduced_costs = self._get_reduced_costs(self.x_vars)
+        fixed = self.get_bound() + reduced_costs > upper_bound + 1e-6
+        self._fix_to_zero(self.x_vars, fixed)
+        self._update()
+        return int(fixed.sum())
+
+    @abstractmethod
+    def _set_start(self, x_values):
+        # sets a MIP start, given values in the order of x_indices
+        pass
+
+    def set_start(self, start):
+        # start is a Schedule, or a sequence of jobs, to use as a MIP start
+        if not isinstance(start, Schedule):
+            start = self.smsp.get_schedule_from_sequence(start)
+        if not self.smsp.within_time_windows(start):
+            raise ValueError("start misses release dates or deadlines")
+        x = self.x_indices
+        self._set_start((x.t - 1 == np.asarray(start.start_times)[x.j]).astype(float))
+
+    @abstractmethod
+    def _set_cutoff(self, value):
         pass
+
+    def set_incumbent(self, start):
+        # start is a Schedule, or a sequence of jobs, to use as a MIP start
+        # and whose objective is used as a cutoff
+        if not isinstance(start, Schedule):
+            start = self.smsp.get_schedule_from_sequence(start)
+        self.set_start(start)
+        self._set_cutoff(float(self.smsp.get_objective_from_schedule(start)))
+
+    @abstractmethod
+    def _get_values(self, variables):
+        # solution values of variables, as an array in the order of x_indices
+        pass
+
+    def get_schedule(self):
+        x = self.x_indices
+        start_times = np.bincount(
+            x.j,
+            weights=(x.t - 1) * self._get_values(self.x_vars),
+            minlength=len(self.J),
+        )
+        start_times = np.round(start_times).astype(int)
+
+        return Schedule(start_times=start_times, end_times=start_times + self.p)
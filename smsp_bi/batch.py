@@ -0,0 +1,259 @@
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+from smsp_bi.heuristics import heuristic_sequence
+
+
+class Result:
+    # The outcome of a solve: index identifies the instance (solve_many) or
+    # formulation (race) solved.  schedule and objective are None if the solve
+    # failed, in which case error describes the failure.  stats is the
+    # to_dict() of the model's stats, as callbacks registered with
+    # stats.add_callback do not run in the worker processes.
+    def __init__(
+        self,
+        index,
+        schedule=None,
+        objective=None,
+        optimal=False,
+        error=None,
+        seconds=0,
+        stats=None,
+    ):
+        self.index = index
+        self.schedule = schedule
+        self.objective = objective
+        self.optimal = optimal
+        self.error = error
+        self.seconds = seconds
+        self.stats = stats
+
+    def __repr__(self):
+        outcome = self.objective if self.error is None else self.error
+        return f"Result({self.index}, {outcome}, {self.seconds:.2f}s)"
+
+
+def _solve(
+    index,
+    smsp,
+    formulation,
+    threads,
+    time_limit,
+    incumbent=None,
+    best=None,
+    bound=None,
+):
+    start = time.perf_counter()
+    try:
+        model = formulation(smsp)
+        model.set_limits(threads=threads, time_limit=time_limit)
+        if incumbent is not None:
+            model.set_incumbent(incumbent)
+        if best is not None and hasattr(getattr(model, "m", None), "cbGet"):
+            model.optimize(_shared_cutoff_callback(best, bound))
+        else:
+            model.optimize()
+        schedule = model.get_schedule()
+    except Exception as e:
+        return Result(index, error=repr(e), seconds=time.perf_counter() - start)
+    return Result(
+        index,
+        schedule=schedule,
+        objective=smsp.get_objective_from_schedule(schedule),
+        optimal=model.is_optimal(),
+        seconds=time.perf_counter() - start,
+        stats=model.stats.to_dict(),
+    )
+
+
+def _isolated(index, smsp, formulation, threads, time_limit, context):
+    # _solve in a process of its own, so that only this instance fails if the
+    # process dies
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        future = executor.submit(_solve, index, smsp, formulation, threads, time_limit)
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            return Result(index, error=repr(e))
+
+
+def solve_many(
+    instances,
+    formulation,
+    workers=None,
+    threads_per_solve=None,
+    time_limit=None,
+):
+    # Solves each SMSP in instances with formulation (eg smsp_bi.bi.gurobi.BI_2)
+    # in a pool of worker processes, yielding a Result for each instance as it
+    # finishes.  By default the cpus are shared evenly between the workers.
+    # time_limit (seconds) is passed to the solver, and a failed solve gives a
+    # Result with an error rather than stopping the batch.  If a worker process
+    # dies (eg the solver crashed) the pool is broken, so the instances in it,
+    # at most one per worker, are solved again each in its own process, to
+    # find those which fail, and the rest continue in a new pool.  Workers are
+    # spawned rather than forked, as solver environments (eg gurobi's) should
+    # not be shared across a fork, so the caller must be importable (guard
+    # scripts with if __name__ == "__main__").
+    cpus = os.cpu_count() or 1
+    workers = workers or cpus
+    threads_per_solve = threads_per_solve or max(1, cpus // workers)
+    context = multiprocessing.get_context("spawn")
+    args = (formulation, threads_per_solve, time_limit)
+    pending = enumerate(instances)
+    while True:
+        suspects = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {}
+
+            def submit(count):
+                for index, smsp in itertools.islice(pending, count):
+                    try:
+                        future = executor.submit(_solve, index, smsp, *args)
+                    except BrokenProcessPool:
+                        suspects.append((index, smsp))
+                        continue
+                    futures[future] = (index, smsp)
+
+            submit(workers)
+            while futures and not suspects:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    instance = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        suspects.append(instance)
+                        continue
+                    yield result
+                    if not suspects:
+                        submit(1)
+            suspects += futures.values()
+        if not suspects:
+            return
+        with ThreadPoolExecutor(max_workers=len(suspects)) as threads:
+            yield from threads.map(
+                lambda instance: _isolated(*instance, *args, context), suspects
+            )
+
+
+def _shared_cutoff_callback(best, bound):
+    # A gurobi callback sharing incumbent objectives and lower bounds between
+    # racers through best and bound, multiprocessing.Values.  A racer whose
+    # bound reaches the best objective found by any racer proves it optimal,
+    # so it raises bound to its own, and every racer stops once bound has
+    # reached best.  race then reports the racer holding best as optimal.
+    from gurobipy import GRB
+
+    def callback(m, where):
+        if where == GRB.Callback.MIPSOL:
+            objective = m.cbGet(GRB.Callback.MIPSOL_OBJ)
+            with best.get_lock():
+                best.value = min(best.value, objective)
+        elif where == GRB.Callback.MIP:
+            lower = m.cbGet(GRB.Callback.MIP_OBJBND)
+            if lower >= best.value - 1e-6:
+                with bound.get_lock():
+                    bound.value = max(bound.value, lower)
+            if bound.value >= best.value - 1e-6:
+                m.terminate()
+
+    return callback
+
+
+def _race(index, smsp, formulation, threads, time_limit, incumbent, shared, results):
+    # The racer leads a process group of its own, so that race can stop it
+    # together with any solver process it starts (eg pulp's cbc)
+    if hasattr(os, "setsid"):
+        os.setsid()
+    results.put(
+        _solve(index, smsp, formulation, threads, time_limit, incumbent, *shared)
+    )
+
+
+def _stop(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # no process group (eg on windows, or the racer has not started it)
+        process.terminate()
+    process.join()
+
+
+def race(smsp, formulations, threads_per_solve=1, time_limit=None):
+    # Solves smsp with each of formulations (eg TI, BI_2 and BI_2_slim from
+    # each backend) in its own process and returns the Result of the first to
+    # prove optimality, terminating the others.  If none does, the best Result
+    # is returned.  All racers start from the heuristic incumbent, as a MIP
+    # start and cutoff, unless it misses deadlines, and gurobi racers also
+    # share improved incumbent objectives and bounds while solving, so a
+    # Result is optimal if another racer's bound proves it.  Result.index is
+    # the index of the formulation.  If no racer finds a solution the Result
+    # has no index, and its error gives the error of each formulation.
+    sequence, objective = heuristic_sequence(smsp)
+    if math.isinf(objective):
+        sequence = None
+    context = multiprocessing.get_context("spawn")
+    best = context.Value("d", objective)
+    bound = context.Value("d", -math.inf)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_race,
+            args=(
+                index,
+                smsp,
+                formulation,
+                threads_per_solve,
+                time_limit,
+                sequence,
+                (best, bound),
+                results,
+            ),
+        )
+        for index, formulation in enumerate(formulations)
+    ]
+    for process in processes:
+        process.start()
+    finished = []
+    try:
+        while len(finished) < len(processes):
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                # stop waiting if racers died without reporting
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if result.error is None and result.objective <= bound.value + 1e-6:
+                result.optimal = True
+            if result.optimal:
+                return result
+            finished.append(result)
+    finally:
+        for process in processes:
+            _stop(process)
+    solved = [result for result in finished if result.error is None]
+    if solved:
+        result = min(solved, key=lambda result: result.objective)
+        result.optimal = result.optimal or result.objective <= bound.value + 1e-6
+        return result
+    # the error of each formulation, or the exit code of its racer if it died
+    # without reporting
+    errors = {result.index: result.error for result in finished}
+    for index, process in enumerate(processes):
+        errors.setdefault(index, f"racer exited with code {process.exitcode}")
+    errors = "; ".join(f"{index}: {error}" for index, error in sorted(errors.items()))
+    return Result(None, error=f"no formulation found a solution ({errors})")
@@ -1,21 +1,51 @@
 import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
-from smsp_bi import base
-from smsp_bi.utils import Schedule, irange
+from smsp_bi import base, gurobi_utils
+from smsp_bi.bi import matrix
+from smsp_bi.utils import irange
 
 
 class BI_2(base.BI_2):
-    def __init__(self, smsp, name="BI_2"):
+    def __init__(
+        self, smsp, name="BI_2", preprocess=False, precedences=False, relax=False
+    ):
         self.m = gp.Model(name)
         self.m.setAttr("ModelSense", GRB.MINIMIZE)
-        super().__init__(smsp)
+        self.T_vars = gp.tupledict()
+        super().__init__(smsp, preprocess, precedences, relax)
 
     def _update(self):
         self.m.update()
 
-    def optimize(self):
-        self.m.optimize()
+    def _size(self):
+        return gurobi_utils.size(self.m)
+
+    def optimize(self, callback=None):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize(callback)
+
+    def _solve_stats(self):
+        return gurobi_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.Status == GRB.OPTIMAL
+
+    def set_limits(self, threads=None, time_limit=None):
+        gurobi_utils.set_limits(self.m, threads, time_limit)
+
+    def get_bound(self):
+        return gurobi_utils.get_bound(self.m, self.relax)
+
+    def _set_integrality(self, variables, integer):
+        gurobi_utils.set_integrality(self.m, list(variables.values()), integer)
+
+    def _get_reduced_costs(self, variables):
+        return np.array(self.m.getAttr("RC", list(variables.values())))
+
+    def _fix_to_zero(self, variables, fixed):
+        gurobi_utils.fix_to_zero(self.m, list(variables.values()), fixed)
 
     def _create_z_u_variables(self):
         self.z_vars = self.m.addVars(self.z_indices, obj=0, vtype=GRB.BINARY, name="z")
@@ -29,11 +59,8 @@ class BI_2(base.BI_2):
     def _add_machine_capacity_constraints_1(self):
         self.m.addConstrs(
             gp.quicksum(
-                self.z_vars[(j, a, k)]
-                for j in self.J
-                for k in self.K[j]
-                for a in irange(max(1, b - self.P[j] - k + 2), b)
-                if (j, a, k) in self.z_indices
+                self.z_vars[ind]
+                for ind in self.z_indices.starting(b) + self.z_indices.spanning(b)
             )
             <= 1
             for b in irange(1, self.B)
@@ -41,135 +68,147 @@ class BI_2(base.BI_2):
 
     def _add_machine_capacity_constraints_2(self):
         self.m.addConstrs(
-            self.u_vars.sum("*", b, "*")
-            - gp.quicksum(
-                self.u_vars[(j, b - self.P[j] - k + 1, k)]
-                for j in self.J
-                for k in self.K[j]
-                if (j, b - self.P[j] - k + 1, k) in self.z_indices
-            )
+            gp.quicksum(self.u_vars[ind] for ind in self.z_indices.starting(b))
+            - gp.quicksum(self.u_vars[ind] for ind in self.z_indices.ending(b))
             + gp.quicksum(
-                (2 - k - self.pi[j]) * self.z_vars[(j, b - self.P[j] - k + 1, k)]
-                for j in self.J
-                for k in self.K[j]
-                if (j, b - self.P[j] - k + 1, k) in self.z_indices
-            )
-            + gp.quicksum(
-                self.z_vars[(j, a, k)]
-                for j in self.J
-                for k in self.K[j]
-                for a in irange(max(1, b - self.P[j] - k + 2), b - 1)
-                if (j, a, k) in self.z_indices
+                (2 - k - self.pi[j]) * self.z_vars[(j, a, k)]
+                for j, a, k in self.z_indices.ending(b)
             )
+            + gp.quicksum(self.z_vars[ind] for ind in self.z_indices.spanning(b))
             <= 1
             for b in irange(1, self.B)
         )
 
     def _create_u_lower_bound_constraints(self):
         self.m.addConstrs(
-            ((1 - k) * (1 - self.pi[j]) + 1 / self.Delta) * self.z_vars[(j, b, k)]
-            - self.u_vars[(j, b, k)]
-            <= 0
-            for j, b, k in self.z_indices
+            lb / self.Delta * self.z_vars[(j, b, k)] - self.u_vars[(j, b, k)] <= 0
+            for (j, b, k), lb in zip(self.z_indices, self.remainder_lb.tolist())
         )
 
     def _create_u_upper_bound_constraints(self):
         self.m.addConstrs(
-            self.u_vars[(j, b, k)] - (1 - k * self.pi[j]) * self.z_vars[(j, b, k)] <= 0
-            for j, b, k in self.z_indices
+            self.u_vars[(j, b, k)] - ub / self.Delta * self.z_vars[(j, b, k)] <= 0
+            for (j, b, k), ub in zip(self.z_indices, self.remainder_ub.tolist())
         )
 
-    def _create_T_variables(self):
-        T_indices, cost = gp.multidict(
-            {
-                (j, b, k): self.c[j] * self.Delta
-                for j in self.J
-                for k in self.K[j]
-                for b in irange(self.D[j], self.B - self.P[j] + 1)
-            }
+    def _create_T_variables(self, jobs):
+        T_indices = self._T_indices(jobs)
+        self.T_vars.update(
+            self.m.addVars(
+                T_indices,
+                obj=[self._T_cost(j) for j, _, _ in T_indices],
+                vtype=GRB.CONTINUOUS,
+                name="T",
+            )
+        )
+
+    def _remove_tardy_vars_constraints(self, jobs):
+        # every tardiness constraint of a job contains one of its T variables
+        T_vars = [self.T_vars.pop(ind) for ind in self._T_indices(jobs)]
+        columns = [self.m.getCol(var) for var in T_vars]
+        self.m.remove(
+            list({col.getConstr(i) for col in columns for i in range(col.size())})
         )
-        self.T_vars = self.m.addVars(
-            T_indices, obj=cost, vtype=GRB.CONTINUOUS, name="T"
+        self.m.remove(T_vars)
+
+    def _update_costs(self, jobs):
+        T_indices = self._T_indices(jobs)
+        self.m.setAttr(
+            "Obj",
+            [self.T_vars[ind] for ind in T_indices],
+            [self._T_cost(j) for j, _, _ in T_indices],
         )
 
-    def _create_T_k0_lower_bound_constraints(self):
+    def _add_precedence_constraints(self, pairs):
+        z_coef, u_coef = self._start_time_coefficients()
+        z_vars, u_vars = list(self.z_vars.values()), list(self.u_vars.values())
+        ptr = self.z_indices.job_ptr
+        start = [
+            gp.LinExpr(
+                z_coef[ptr[j] : ptr[j + 1]].tolist()
+                + u_coef[ptr[j] : ptr[j + 1]].tolist(),
+                z_vars[ptr[j] : ptr[j + 1]] + u_vars[ptr[j] : ptr[j + 1]],
+            )
+            for j in self.J
+        ]
+        constrs = self.m.addConstrs(start[i] + self.p[i] <= start[j] for i, j in pairs)
+        if self.precedences == "lazy":
+            self.m.setAttr("Lazy", list(constrs.values()), [1] * len(constrs))
+
+    def _create_T_k0_lower_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.delta[j] * self.z_vars[(j, self.D[j], 0)]
             - self.u_vars[(j, self.D[j], 0)]
             - self.T_vars[(j, self.D[j], 0)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 0)
             if 1 - self.pi[j] < self.delta[j]
         )
 
-    def _create_T_k0_upper_bound_constraints(self):
+    def _create_T_k0_upper_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.T_vars[(j, self.D[j], 0)]
             - (self.delta[j] - 1 + self.pi[j]) * self.z_vars[(j, self.D[j], 0)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 0)
             if 1 - self.pi[j] < self.delta[j]
         )
 
-    def _create_T_k1_equality_constraints(self):
+    def _create_T_k1_equality_constraints(self, jobs):
         self.m.addConstrs(
             self.T_vars[(j, self.D[j], 1)]
             - self.delta[j] * self.z_vars[(j, self.D[j], 1)]
             + self.u_vars[(j, self.D[j], 1)]
             == 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and 1 - self.pi[j] < self.delta[j]
         )
 
-    def _create_T_k1_lower_bound_constraints(self):
+    def _create_T_k1_lower_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.delta[j] * self.z_vars[(j, self.D[j], 1)]
             - self.u_vars[(j, self.D[j], 1)]
             - self.T_vars[(j, self.D[j], 1)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and self.delta[j] <= 1 - self.pi[j]
         )
 
-    def _create_T_k1_upper_bound_constraints(self):
+    def _create_T_k1_upper_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.T_vars[(j, self.D[j], 1)]
             - self.delta[j] * self.z_vars[(j, self.D[j], 1)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and self.delta[j] <= 1 - self.pi[j]
         )
 
-    def _create_T_equality_constraints(self):
+    def _create_T_equality_constraints(self, jobs):
         self.m.addConstrs(
             self.T_vars[(j, b, k)]
             - (b - self.D[j] + self.delta[j]) * self.z_vars[(j, b, k)]
             + self.u_vars[(j, b, k)]
             == 0
-            for j in self.J
+            for j in jobs
             for k in self.K[j]
             for b in irange(self.D[j] + 1, self.B)
             if (j, b, k) in self.z_indices
         )
 
-    def _make_start_time(self, job):
-        return int(
-            round(
-                gp.quicksum(
-                    self.Delta * (b * self.z_vars[(j, b, k)] - self.u_vars[(j, b, k)])
-                    for j, b, k in self.z_indices
-                    if j == job
-                ).getValue()
-            )
-        )
+    def _set_start(self, z_values, u_values, T_values):
+        T_cols = [self.z_indices.get_column(ind) for ind in self.T_vars]
+        for variables, values in (
+            (self.z_vars, z_values),
+            (self.u_vars, u_values),
+            (self.T_vars, T_values[T_cols]),
+        ):
+            self.m.setAttr("Start", list(variables.values()), values.tolist())
 
-    def get_schedule(self):
-        start_times = [self._make_start_time(j) for j in self.J]
+    def _set_cutoff(self, value):
+        self.m.setParam("Cutoff", value)
 
-        return Schedule(
-            start_times=start_times,
-            end_times=[s + p for s, p in zip(start_times, self.p)],
-        )
+    def _get_values(self, variables):
+        return np.array(self.m.getAttr("X", list(variables.values())))
 
 
 class BI_2_slim(BI_2):
@@ -179,26 +218,19 @@ class BI_2_slim(BI_2):
 
     def _add_machine_capacity_constraints_2(self):
         self.m.addConstrs(
-            self.Delta * self.u_vars.sum("*", b, "*")
+            gp.quicksum(
+                self.Delta * self.u_vars[ind] for ind in self.z_indices.starting(b)
+            )
             - gp.quicksum(
-                self.Delta * self.u_vars[(j, b - self.P[j] - k + 1, k)]
-                for j in self.J
-                for k in self.K[j]
-                if (j, b - self.P[j] - k + 1, k) in self.z_indices
+                self.Delta * self.u_vars[ind] for ind in self.z_indices.ending(b)
             )
             + gp.quicksum(
                 (2 * self.Delta - self.Delta * k - self.Delta_pi[j])
-                * self.z_vars[(j, b - self.P[j] - k + 1, k)]
-                for j in self.J
-                for k in self.K[j]
-                if (j, b - self.P[j] - k + 1, k) in self.z_indices
+                * self.z_vars[(j, a, k)]
+                for j, a, k in self.z_indices.ending(b)
             )
             + gp.quicksum(
-                self.Delta * self.z_vars[(j, a, k)]
-                for j in self.J
-                for k in self.K[j]
-                for a in irange(max(1, b - self.P[j] - k + 2), b - 1)
-                if (j, a, k) in self.z_indices
+                self.Delta * self.z_vars[ind] for ind in self.z_indices.spanning(b)
             )
             <= self.Delta
             for b in range(1, self.B + 1)
@@ -206,78 +238,258 @@ class BI_2_slim(BI_2):
 
     def _create_u_lower_bound_constraints(self):
         self.m.addConstrs(
-            ((1 - k) * (self.Delta - self.Delta_pi[j]) + 1) * self.z_vars[(j, b, k)]
-            - self.Delta * self.u_vars[(j, b, k)]
-            <= 0
-            for j, b, k in self.z_indices
+            lb * self.z_vars[(j, b, k)] - self.Delta * self.u_vars[(j, b, k)] <= 0
+            for (j, b, k), lb in zip(self.z_indices, self.remainder_lb.tolist())
         )
 
     def _create_u_upper_bound_constraints(self):
         self.m.addConstrs(
-            self.Delta * self.u_vars[(j, b, k)]
-            - (self.Delta - k * self.Delta_pi[j]) * self.z_vars[(j, b, k)]
-            <= 0
-            for j, b, k in self.z_indices
+            self.Delta * self.u_vars[(j, b, k)] - ub * self.z_vars[(j, b, k)] <= 0
+            for (j, b, k), ub in zip(self.z_indices, self.remainder_ub.tolist())
         )
 
-    def _create_T_k0_lower_bound_constraints(self):
+    def _create_T_k0_lower_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta_delta[j] * self.z_vars[(j, self.D[j], 0)]
             - self.Delta * self.u_vars[(j, self.D[j], 0)]
             - self.Delta * self.T_vars[(j, self.D[j], 0)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 0)
             if self.Delta - self.Delta_pi[j] < self.Delta_delta[j]
         )
 
-    def _create_T_k0_upper_bound_constraints(self):
+    def _create_T_k0_upper_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta * self.T_vars[(j, self.D[j], 0)]
             - (self.Delta_delta[j] - self.Delta + self.Delta_pi[j])
             * self.z_vars[(j, self.D[j], 0)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 0)
             if self.Delta - self.Delta_pi[j] < self.Delta_delta[j]
         )
 
-    def _create_T_k1_equality_constraints(self):
+    def _create_T_k1_equality_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta * self.T_vars[(j, self.D[j], 1)]
             - self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
             + self.Delta * self.u_vars[(j, self.D[j], 1)]
             == 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and self.Delta - self.Delta_pi[j] < self.Delta_delta[j]
         )
 
-    def _create_T_k1_lower_bound_constraints(self):
+    def _create_T_k1_lower_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
             - self.Delta * self.u_vars[(j, self.D[j], 1)]
             - self.Delta * self.T_vars[(j, self.D[j], 1)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and self.Delta_delta[j] <= self.Delta - self.Delta_pi[j]
         )
 
-    def _create_T_k1_upper_bound_constraints(self):
+    def _create_T_k1_upper_bound_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta * self.T_vars[(j, self.D[j], 1)]
             - self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
             <= 0
-            for j in self.J
+            for j in self._due_jobs(jobs, 1)
             if 1 in self.K[j] and self.Delta_delta[j] <= self.Delta - self.Delta_pi[j]
         )
 
-    def _create_T_equality_constraints(self):
+    def _create_T_equality_constraints(self, jobs):
         self.m.addConstrs(
             self.Delta * self.T_vars[(j, b, k)]
             - (self.Delta * b - self.Delta * self.D[j] + self.Delta_delta[j])
             * self.z_vars[(j, b, k)]
             + self.Delta * self.u_vars[(j, b, k)]
             == 0
-            for j in self.J
+            for j in jobs
             for k in self.K[j]
             for b in irange(self.D[j] + 1, self.B)
             if (j, b, k) in self.z_indices
         )
+
+
+class BI_2_V(BI_2, base.BI_2_V):
+    # bucket_lengths gives the length of each bucket, by default min(p)
+    def __init__(
+        self,
+        smsp,
+        bucket_lengths=None,
+        name="BI_2_V",
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        self.bucket_lengths = bucket_lengths
+        super().__init__(smsp, name, preprocess, precedences, relax)
+
+    def _add_machine_capacity_constraints_2(self):
+        z = self.z_indices
+        self.m.addConstrs(
+            gp.quicksum(self.u_vars[ind] for ind in z.starting(b))
+            - gp.quicksum(self.u_vars[ind] for ind in z.ending(b))
+            + gp.quicksum(
+                self.end_usage[col] * self.z_vars[z[col]] for col in z.end_adj[b]
+            )
+            + gp.quicksum(
+                self.p[j] * self.z_vars[(j, a, k)] for j, a, k in z.contained(b)
+            )
+            + gp.quicksum(self.L[b] * self.z_vars[ind] for ind in z.spanning(b))
+            <= self.L[b]
+            for b in irange(1, self.B)
+        )
+
+    def _create_u_lower_bound_constraints(self):
+        self.m.addConstrs(
+            u_lb * self.z_vars[(j, b, k)] - self.u_vars[(j, b, k)] <= 0
+            for (j, b, k), u_lb in zip(self.z_indices, self.u_lb)
+        )
+
+    def _create_u_upper_bound_constraints(self):
+        self.m.addConstrs(
+            self.u_vars[(j, b, k)] - u_ub * self.z_vars[(j, b, k)] <= 0
+            for (j, b, k), u_ub in zip(self.z_indices, self.u_ub)
+        )
+
+    def _create_T_lower_bound_constraints(self, jobs):
+        self.m.addConstrs(
+            (self.bounds[b] - self.d[j]) * self.z_vars[(j, b, k)]
+            - self.u_vars[(j, b, k)]
+            - self.T_vars[(j, b, k)]
+            <= 0
+            for j, b, k in self._T_indices(jobs, late=False)
+        )
+
+    def _create_T_upper_bound_constraints(self, jobs):
+        z = self.z_indices
+        self.m.addConstrs(
+            self.T_vars[(j, b, k)]
+            - (self.start_ub[z.column[j, b, k]] - self.d[j]) * self.z_vars[(j, b, k)]
+            <= 0
+            for j, b, k in self._T_indices(jobs, late=False)
+        )
+
+    def _create_T_equality_constraints(self, jobs):
+        self.m.addConstrs(
+            self.T_vars[(j, b, k)]
+            - (self.bounds[b] - self.d[j]) * self.z_vars[(j, b, k)]
+            + self.u_vars[(j, b, k)]
+            == 0
+            for j, b, k in self._T_indices(jobs, late=True)
+        )
+
+
+class BI_3(BI_2_V, base.BI_3):
+    # bucket_lengths gives the length of each bucket, by default p(1) + p(2)
+    def __init__(
+        self,
+        smsp,
+        bucket_lengths=None,
+        name="BI_3",
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        super().__init__(smsp, bucket_lengths, name, preprocess, precedences, relax)
+
+    def _add_machine_capacity_constraints_3(self):
+        z = self.z_indices
+        self.m.addConstrs(
+            gp.quicksum(self.z_vars[ind] for ind in z.contained(b) + z.spanning(b)) <= 1
+            for b in irange(1, self.B)
+            if z.contained(b)
+        )
+
+    def _add_machine_sequence_constraints_1(self):
+        z = self.z_indices
+        self.m.addConstrs(
+            gp.quicksum(self.u_vars[ind] for ind in z.contained(b))
+            - gp.quicksum(self.u_vars[ind] for ind in z.ending(b))
+            + gp.quicksum(
+                self.end_usage[col] * self.z_vars[z[col]] for col in z.end_adj[b]
+            )
+            <= self.L[b]
+            for b in irange(1, self.B)
+            if z.contained(b)
+        )
+
+    def _add_machine_sequence_constraints_2(self):
+        z = self.z_indices
+        self.m.addConstrs(
+            gp.quicksum(self.u_vars[ind] for ind in z.starting(b))
+            - gp.quicksum(self.u_vars[ind] for ind in z.contained(b))
+            + gp.quicksum(
+                (self.p[j] + self.L[b]) * self.z_vars[(j, a, k)]
+                for j, a, k in z.contained(b)
+            )
+            <= self.L[b]
+            for b in irange(1, self.B)
+            if z.contained(b)
+        )
+
+
+class BI_2_matrix(matrix.BI_2):
+    # Builds the BI_2 model as arrays, then adds it to gurobi with the matrix API
+    def __init__(
+        self, smsp, name="BI_2", preprocess=False, precedences=False, relax=False
+    ):
+        super().__init__(smsp, name, preprocess=preprocess, precedences=precedences)
+        self.matrix = self.m
+        self.m = gp.Model(name)
+        self.m.setAttr("ModelSense", GRB.MINIMIZE)
+        with self.stats.stage("add_matrix_model", lambda: gurobi_utils.size(self.m)):
+            self.x, self.constrs = gurobi_utils.add_matrix_model(self.m, self.matrix)
+        if relax:
+            self.set_relax(True)
+
+    def update_instance(self, due_dates=None, cost=None):
+        # the arrays of self.matrix are updated, as by matrix.BI_2, and the
+        # changes are then made to the gurobi model
+        self.m, self.matrix = self.matrix, self.m
+        try:
+            super().update_instance(due_dates, cost)
+        finally:
+            self.m, self.matrix = self.matrix, self.m
+        self.x, self.constrs = gurobi_utils.update_matrix_model(
+            self.m, self.matrix, self.x, self.constrs
+        )
+
+    def optimize(self, callback=None):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize(callback)
+
+    def _solve_stats(self):
+        return gurobi_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.Status == GRB.OPTIMAL
+
+    def set_limits(self, threads=None, time_limit=None):
+        gurobi_utils.set_limits(self.m, threads, time_limit)
+
+    def get_bound(self):
+        return gurobi_utils.get_bound(self.m, self.relax)
+
+    def _set_integrality(self, cols, integer):
+        gurobi_utils.set_integrality(self.m, self.x[cols].tolist(), integer)
+
+    def _get_reduced_costs(self, cols):
+        return self.x.RC[cols]
+
+    def _fix_to_zero(self, cols, fixed):
+        gurobi_utils.fix_to_zero(self.m, self.x[cols].tolist(), fixed)
+
+    def _set_start_values(self, cols, values):
+        self.m.setAttr("Start", self.x[cols].tolist(), values.tolist())
+
+    def _set_cutoff(self, value):
+        self.m.setParam("Cutoff", value)
+
+    def _get_values(self, cols):
+        return self.x.X[cols]
+
+
+class BI_2_slim_matrix(BI_2_matrix, matrix.BI_2_slim):
+    pass
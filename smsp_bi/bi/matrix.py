@@ -0,0 +1,367 @@
+import numpy as np
+
+from smsp_bi import base
+from smsp_bi.matrix_model import MatrixModel
+
+
+class BI_2(base.BI_2):
+    def __init__(
+        self,
+        smsp,
+        name="BI_2",
+        model=None,
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        self.m = MatrixModel(name) if model is None else model
+        super().__init__(smsp, preprocess, precedences, relax)
+
+    def _setup(self):
+        super()._setup()
+        self._pi = np.asarray(self.pi)
+
+    def _setup_due_dates(self):
+        super()._setup_due_dates()
+        self._D = np.asarray(self.D)
+        self._delta = np.asarray(self.delta)
+
+    def _update(self):
+        self.m.update()
+
+    def _size(self):
+        return self.m.num_constrs, self.m.num_vars, self.m.num_nz
+
+    def optimize(self):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize()
+
+    def _solve_stats(self):
+        return {
+            "status": self.m.status,
+            "solver_seconds": self.m.runtime,
+            "nodes": self.m.nodes,
+            "gap": self.m.gap,
+        }
+
+    def is_optimal(self):
+        return self.m.status == 0
+
+    def set_limits(self, threads=None, time_limit=None):
+        # scipy's milp is single threaded
+        self.m.time_limit = time_limit
+
+    def get_bound(self):
+        return self.m.obj_bound
+
+    def _set_integrality(self, cols, integer):
+        self.m.set_vtype(cols, "B" if integer else "C")
+
+    def _get_reduced_costs(self, cols):
+        return self.m.reduced_costs[cols]
+
+    def _fix_to_zero(self, cols, fixed):
+        self.m.set_ub(cols[fixed], 0)
+
+    def _set_start(self, z_values, u_values, T_values):
+        has_T = self.T_vars >= 0
+        self._set_start_values(
+            np.concatenate((self.z_vars, self.u_vars, self.T_vars[has_T])),
+            np.concatenate((z_values, u_values, T_values[has_T])),
+        )
+
+    def _set_start_values(self, cols, values):
+        self.m.set_start(cols, values)
+
+    def _set_cutoff(self, value):
+        self.m.cutoff = value
+
+    def _get_values(self, cols):
+        return self.m.x[cols]
+
+    def _create_z_u_variables(self):
+        self.z_vars = self.m.add_vars(len(self.z_indices), ub=1, vtype="B", name="z")
+        self.u_vars = self.m.add_vars(len(self.z_indices), vtype="C", name="u")
+        # T variables are indexed like z, with -1 where there is no T variable
+        self.T_vars = np.full(len(self.z_indices), -1)
+
+    def _add_job_completion_constraints(self):
+        self.m.add_constrs(
+            rows=self.z_indices.j,
+            cols=self.z_vars,
+            vals=1,
+            sense="=",
+            rhs=np.ones(len(self.J)),
+        )
+
+    def _add_precedence_constraints(self, pairs):
+        # lazy constraints are not supported, so are added as constraints
+        z_coef, u_coef = self._start_time_coefficients()
+        ptr = self.z_indices.job_ptr
+        start = [
+            (
+                np.concatenate((self.z_vars[part], self.u_vars[part])),
+                np.concatenate((z_coef[part], u_coef[part])),
+            )
+            for part in (slice(ptr[j], ptr[j + 1]) for j in self.J)
+        ]
+        pairs = list(pairs)
+        self.m.add_constrs_from_rows(
+            [
+                (
+                    np.concatenate((start[i][0], start[j][0])),
+                    np.concatenate((start[i][1], -start[j][1])),
+                )
+                for i, j in pairs
+            ],
+            sense="<",
+            rhs=[-self.p[i] for i, _ in pairs],
+        )
+
+    def _add_machine_capacity_constraints_1(self):
+        start, span = self.z_indices.start_adj, self.z_indices.span_adj
+        self.m.add_constrs(
+            rows=np.concatenate((start.rows(), span.rows())) - 1,
+            cols=self.z_vars[np.concatenate((start.columns, span.columns))],
+            vals=1,
+            sense="<",
+            rhs=np.ones(self.B),
+        )
+
+    def _add_capacity_rows(self, u_coef, end_coef, span_coef, rhs):
+        z = self.z_indices
+        start, end, span = z.start_adj, z.end_adj, z.span_adj
+        self.m.add_constrs(
+            rows=np.concatenate((start.rows(), end.rows(), end.rows(), span.rows()))
+            - 1,
+            cols=np.concatenate(
+                (
+                    self.u_vars[start.columns],
+                    self.u_vars[end.columns],
+                    self.z_vars[end.columns],
+                    self.z_vars[span.columns],
+                )
+            ),
+            vals=np.concatenate(
+                (
+                    np.full(len(start.columns), u_coef),
+                    np.full(len(end.columns), -u_coef),
+                    end_coef[end.columns],
+                    np.full(len(span.columns), span_coef),
+                )
+            ),
+            sense="<",
+            rhs=np.full(self.B, rhs),
+        )
+
+    def _add_machine_capacity_constraints_2(self):
+        self._add_capacity_rows(
+            u_coef=1,
+            end_coef=2 - self.z_indices.k - self._pi[self.z_indices.j],
+            span_coef=1,
+            rhs=1,
+        )
+
+    def _create_u_lower_bound_constraints(self):
+        z = self.z_indices
+        self.m.add_constrs_from_terms(
+            [(self.z_vars, self.remainder_lb / self.Delta), (self.u_vars, -1)],
+            sense="<",
+            rhs=np.zeros(len(z)),
+        )
+
+    def _create_u_upper_bound_constraints(self):
+        z = self.z_indices
+        self.m.add_constrs_from_terms(
+            [(self.u_vars, 1), (self.z_vars, -self.remainder_ub / self.Delta)],
+            sense="<",
+            rhs=np.zeros(len(z)),
+        )
+
+    def _create_T_variables(self, jobs):
+        z = self.z_indices
+        has_T = (z.b >= self._D[z.j]) & np.isin(z.j, jobs)
+        self.T_vars[has_T] = self.m.add_vars(
+            has_T.sum(), obj=(self.c * self.Delta)[z.j[has_T]], vtype="C", name="T"
+        )
+
+    def _remove_tardy_vars_constraints(self, jobs):
+        # every tardiness constraint of a job contains one of its T variables.
+        # The constraints are left empty, and the T variables fixed to zero,
+        # so that the rows and columns after them keep their numbers.
+        has_T = np.isin(self.z_indices.j, jobs) & (self.T_vars >= 0)
+        cols = self.T_vars[has_T]
+        self.m.update()
+        self.m.remove_constrs(np.unique(self.m.A[:, cols].nonzero()[0]))
+        self.m.set_ub(cols, 0)
+        self.m.set_obj(cols, 0)
+        self.T_vars[has_T] = -1
+
+    def _update_costs(self, jobs):
+        z = self.z_indices
+        has_T = np.isin(z.j, jobs) & (self.T_vars >= 0)
+        self.m.set_obj(self.T_vars[has_T], (self.c * self.Delta)[z.j[has_T]])
+
+    def _due_columns(self, jobs, k, condition):
+        # jobs j satisfying condition, and the columns of z[j, D[j], k]
+        jobs = np.intersect1d(jobs, np.nonzero(condition & (self._D <= self.B))[0])
+        cols = self.z_indices.column[jobs, self._D[jobs], k]
+        return jobs[cols >= 0], cols[cols >= 0]
+
+    def _add_due_rows(self, jobs, k, condition, z_coef, u_coef, T_coef, sense):
+        # one row per job, over the variables with index (j, D[j], k)
+        jobs, cols = self._due_columns(jobs, k, condition)
+        terms = [(self.z_vars[cols], z_coef[jobs]), (self.T_vars[cols], T_coef)]
+        if u_coef:
+            terms.append((self.u_vars[cols], u_coef))
+        self.m.add_constrs_from_terms(terms, sense=sense, rhs=np.zeros(len(jobs)))
+
+    def _k0_condition(self):
+        return 1 - self._pi < self._delta
+
+    def _create_T_k0_lower_bound_constraints(self, jobs):
+        self._add_due_rows(jobs, 0, self._k0_condition(), self._delta, -1, -1, "<")
+
+    def _create_T_k0_upper_bound_constraints(self, jobs):
+        self._add_due_rows(
+            jobs,
+            0,
+            self._k0_condition(),
+            -(self._delta - 1 + self._pi),
+            0,
+            1,
+            "<",
+        )
+
+    def _create_T_k1_equality_constraints(self, jobs):
+        self._add_due_rows(jobs, 1, self._k0_condition(), -self._delta, 1, 1, "=")
+
+    def _create_T_k1_lower_bound_constraints(self, jobs):
+        self._add_due_rows(jobs, 1, ~self._k0_condition(), self._delta, -1, -1, "<")
+
+    def _create_T_k1_upper_bound_constraints(self, jobs):
+        self._add_due_rows(jobs, 1, ~self._k0_condition(), -self._delta, 0, 1, "<")
+
+    def _create_T_equality_constraints(self, jobs):
+        z = self.z_indices
+        cols = np.nonzero((z.b >= self._D[z.j] + 1) & np.isin(z.j, jobs))[0]
+        j = z.j[cols]
+        self.m.add_constrs_from_terms(
+            [
+                (self.T_vars[cols], 1),
+                (self.z_vars[cols], -(z.b[cols] - self._D[j] + self._delta[j])),
+                (self.u_vars[cols], 1),
+            ],
+            sense="=",
+            rhs=np.zeros(len(cols)),
+        )
+
+
+class BI_2_slim(BI_2):
+    def _setup(self):
+        super()._setup()
+        self._setup_slim()
+        self._Delta_pi = np.asarray(self.Delta_pi)
+
+    def _setup_due_dates(self):
+        super()._setup_due_dates()
+        self._Delta_delta = np.asarray(self.Delta_delta)
+
+    def _add_machine_capacity_constraints_2(self):
+        self._add_capacity_rows(
+            u_coef=self.Delta,
+            end_coef=2 * self.Delta
+            - self.Delta * self.z_indices.k
+            - self._Delta_pi[self.z_indices.j],
+            span_coef=self.Delta,
+            rhs=self.Delta,
+        )
+
+    def _create_u_lower_bound_constraints(self):
+        z = self.z_indices
+        self.m.add_constrs_from_terms(
+            [(self.z_vars, self.remainder_lb), (self.u_vars, -self.Delta)],
+            sense="<",
+            rhs=np.zeros(len(z)),
+        )
+
+    def _create_u_upper_bound_constraints(self):
+        z = self.z_indices
+        self.m.add_constrs_from_terms(
+            [(self.u_vars, self.Delta), (self.z_vars, -self.remainder_ub)],
+            sense="<",
+            rhs=np.zeros(len(z)),
+        )
+
+    def _k0_condition(self):
+        return self.Delta - self._Delta_pi < self._Delta_delta
+
+    def _create_T_k0_lower_bound_constraints(self, jobs):
+        self._add_due_rows(
+            jobs,
+            0,
+            self._k0_condition(),
+            self._Delta_delta,
+            -self.Delta,
+            -self.Delta,
+            "<",
+        )
+
+    def _create_T_k0_upper_bound_constraints(self, jobs):
+        self._add_due_rows(
+            jobs,
+            0,
+            self._k0_condition(),
+            -(self._Delta_delta - self.Delta + self._Delta_pi),
+            0,
+            self.Delta,
+            "<",
+        )
+
+    def _create_T_k1_equality_constraints(self, jobs):
+        self._add_due_rows(
+            jobs,
+            1,
+            self._k0_condition(),
+            -self._Delta_delta,
+            self.Delta,
+            self.Delta,
+            "=",
+        )
+
+    def _create_T_k1_lower_bound_constraints(self, jobs):
+        self._add_due_rows(
+            jobs,
+            1,
+            ~self._k0_condition(),
+            self._Delta_delta,
+            -self.Delta,
+            -self.Delta,
+            "<",
+        )
+
+    def _create_T_k1_upper_bound_constraints(self, jobs):
+        self._add_due_rows(
+            jobs, 1, ~self._k0_condition(), -self._Delta_delta, 0, self.Delta, "<"
+        )
+
+    def _create_T_equality_constraints(self, jobs):
+        z = self.z_indices
+        cols = np.nonzero((z.b >= self._D[z.j] + 1) & np.isin(z.j, jobs))[0]
+        j = z.j[cols]
+        self.m.add_constrs_from_terms(
+            [
+                (self.T_vars[cols], self.Delta),
+                (
+                    self.z_vars[cols],
+                    -(
+                        self.Delta * z.b[cols]
+                        - self.Delta * self._D[j]
+                        + self._Delta_delta[j]
+                    ),
+                ),
+                (self.u_vars[cols], self.Delta),
+            ],
+            sense="=",
+            rhs=np.zeros(len(cols)),
+        )
@@ -1,19 +1,63 @@
+import numpy as np
 import pulp
 
-from smsp_bi import base
-from smsp_bi.utils import Schedule, irange
+from smsp_bi import base, pulp_utils
+from smsp_bi.utils import irange
 
 
 class BI_2(base.BI_2):
-    def __init__(self, smsp, name="BI_2"):
+    _cbc_options = ()
+
+    def __init__(
+        self, smsp, name="BI_2", preprocess=False, precedences=False, relax=False
+    ):
         self.m = pulp.LpProblem(name, pulp.LpMinimize)
-        super().__init__(smsp)
+        self.warm_start = False
+        self.cutoff = None
+        self.threads = None
+        self.time_limit = None
+        self.m.setObjective(pulp.LpAffineExpression())
+        self.z_vars = {}
+        self.u_vars = {}
+        self.T_vars = {}
+        self.T_constraints = {}
+        super().__init__(smsp, preprocess, precedences, relax)
 
     def _update(self):
         pass
 
+    def _size(self):
+        columns = len(self.z_vars) + len(self.u_vars) + len(self.T_vars)
+        return pulp_utils.size(self.m, columns)
+
     def optimize(self):
-        self.m.solve()
+        with self.stats.solve(self._solve_stats):
+            self.m.solve(pulp_utils.solver(self))
+
+    def _solve_stats(self):
+        return pulp_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.sol_status == pulp.LpSolutionOptimal
+
+    def set_limits(self, threads=None, time_limit=None):
+        self.threads = threads
+        self.time_limit = time_limit
+
+    def get_bound(self):
+        # CBC's bound on an unfinished MIP is not reported by pulp
+        if self.relax or self.is_optimal():
+            return pulp.value(self.m.objective)
+        return None
+
+    def _set_integrality(self, variables, integer):
+        pulp_utils.set_integrality(variables, integer)
+
+    def _get_reduced_costs(self, variables):
+        return np.array([var.dj for var in variables.values()], dtype=float)
+
+    def _fix_to_zero(self, variables, fixed):
+        pulp_utils.fix_to_zero(variables, fixed)
 
     def _create_z_u_variables(self):
         self.z_vars = pulp.LpVariable.dicts(
@@ -26,10 +70,7 @@ class BI_2(base.BI_2):
     def _add_job_completion_constraints(self):
         for job in self.J:
             self.m += (
-                pulp.lpSum(
-                    self.z_vars[(j, b, k)] for j, b, k in self.z_indices if j == job
-                )
-                == 1,
+                pulp.lpSum(self.z_vars[ind] for ind in self.z_indices.job(job)) == 1,
                 f"Completion Constraint[{job}]",
             )
 
@@ -37,11 +78,8 @@ class BI_2(base.BI_2):
         for b in irange(1, self.B):
             self.m += (
                 pulp.lpSum(
-                    self.z_vars[(j, a, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    for a in irange(max(1, b - self.P[j] - k + 2), b)
-                    if (j, a, k) in self.z_indices
+                    self.z_vars[ind]
+                    for ind in self.z_indices.starting(b) + self.z_indices.spanning(b)
                 )
                 <= 1,
                 f"Completion Constraints1 [{b}]",
@@ -50,69 +88,88 @@ class BI_2(base.BI_2):
     def _add_machine_capacity_constraints_2(self):
         for b in irange(1, self.B):
             self.m += (
-                pulp.lpSum(
-                    self.u_vars[(j, a, k)] for (j, a, k) in self.z_indices if a == b
-                )
-                - pulp.lpSum(
-                    self.u_vars[(j, b - self.P[j] - k + 1, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    if (j, b - self.P[j] - k + 1, k) in self.z_indices
-                )
+                pulp.lpSum(self.u_vars[ind] for ind in self.z_indices.starting(b))
+                - pulp.lpSum(self.u_vars[ind] for ind in self.z_indices.ending(b))
                 + pulp.lpSum(
-                    (2 - k - self.pi[j]) * self.z_vars[(j, b - self.P[j] - k + 1, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    if (j, b - self.P[j] - k + 1, k) in self.z_indices
-                )
-                + pulp.lpSum(
-                    self.z_vars[(j, a, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    for a in irange(max(1, b - self.P[j] - k + 2), b - 1)
-                    if (j, a, k) in self.z_indices
+                    (2 - k - self.pi[j]) * self.z_vars[(j, a, k)]
+                    for j, a, k in self.z_indices.ending(b)
                 )
+                + pulp.lpSum(self.z_vars[ind] for ind in self.z_indices.spanning(b))
                 <= 1,
                 f"Completion Constraints2 [{b}]",
             )
 
     def _create_u_lower_bound_constraints(self):
-        for j, b, k in self.z_indices:
+        for (j, b, k), lb in zip(self.z_indices, self.remainder_lb.tolist()):
             self.m += (
-                ((1 - k) * (1 - self.pi[j]) + 1 / self.Delta) * self.z_vars[(j, b, k)]
-                - self.u_vars[(j, b, k)]
-                <= 0,
+                lb / self.Delta * self.z_vars[(j, b, k)] - self.u_vars[(j, b, k)] <= 0,
                 f"u lower bound constraints [{j, b, k}]",
             )
 
     def _create_u_upper_bound_constraints(self):
-        for j, b, k in self.z_indices:
+        for (j, b, k), ub in zip(self.z_indices, self.remainder_ub.tolist()):
             self.m += (
-                self.u_vars[(j, b, k)] - (1 - k * self.pi[j]) * self.z_vars[(j, b, k)]
-                <= 0,
+                self.u_vars[(j, b, k)] - ub / self.Delta * self.z_vars[(j, b, k)] <= 0,
                 f"u upper bound constraints [{j, b, k}]",
             )
 
-    def _create_T_variables(self):
-        self.T_indices = [
-            (j, b, k)
-            for j in self.J
-            for k in self.K[j]
-            for b in irange(self.D[j], self.B - self.P[j] + 1)
-        ]
-        self.T_vars = pulp.LpVariable.dicts(
-            "T", self.T_indices, lowBound=0, cat=pulp.LpContinuous
+    def _create_T_variables(self, jobs):
+        # T variables dropped by update_instance are kept, fixed to zero, so
+        # that they are reused if their index is needed again
+        T_indices = self._T_indices(jobs)
+        self.T_vars.update(
+            pulp.LpVariable.dicts(
+                "T",
+                [ind for ind in T_indices if ind not in self.T_vars],
+                lowBound=0,
+                cat=pulp.LpContinuous,
+            )
         )
-
-        self.m += pulp.lpSum(
-            self.c[j] * self.Delta * self.T_vars[(j, b, k)]
-            for j, b, k in self.T_indices
+        for ind in T_indices:
+            self.T_vars[ind].upBound = None
+        self._update_costs(jobs)
+
+    def _add_T_constraint(self, j, constraint, name):
+        self.m += (constraint, name)
+        self.T_constraints.setdefault(j, []).append(constraint)
+
+    def _remove_tardy_vars_constraints(self, jobs):
+        # pulp can not remove variables, so T variables are kept in the model
+        # fixed to zero, with zero cost
+        for ind in self._T_indices(jobs):
+            self.m.objective[self.T_vars[ind]] = 0
+            self.T_vars[ind].upBound = 0
+        self.m = pulp_utils.remove_constraints(
+            self.m, [c for j in jobs for c in self.T_constraints.pop(j, [])]
         )
 
-    def _create_T_k0_lower_bound_constraints(self):
-        for j in self.J:
+    def _update_costs(self, jobs):
+        for j, b, k in self._T_indices(jobs):
+            self.m.objective[self.T_vars[(j, b, k)]] = self._T_cost(j)
+
+    def _add_precedence_constraints(self, pairs):
+        # lazy constraints are not supported, so are added as constraints
+        z_coef, u_coef = self._start_time_coefficients()
+        z_vars, u_vars = list(self.z_vars.values()), list(self.u_vars.values())
+        ptr = self.z_indices.job_ptr
+        start = [
+            pulp.LpAffineExpression(
+                list(zip(z_vars[ptr[j] : ptr[j + 1]], z_coef[ptr[j] : ptr[j + 1]]))
+                + list(zip(u_vars[ptr[j] : ptr[j + 1]], u_coef[ptr[j] : ptr[j + 1]]))
+            )
+            for j in self.J
+        ]
+        for i, j in pairs:
+            self.m += (
+                start[i] + self.p[i] <= start[j],
+                f"Precedence Constraint[{i},{j}]",
+            )
+
+    def _create_T_k0_lower_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 0):
             if 1 - self.pi[j] < self.delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.delta[j] * self.z_vars[(j, self.D[j], 0)]
                     - self.u_vars[(j, self.D[j], 0)]
                     - self.T_vars[(j, self.D[j], 0)]
@@ -120,20 +177,22 @@ class BI_2(base.BI_2):
                     f"T_k0 lower bound constraints [{j}]",
                 )
 
-    def _create_T_k0_upper_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k0_upper_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 0):
             if 1 - self.pi[j] < self.delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.T_vars[(j, self.D[j], 0)]
                     - (self.delta[j] - 1 + self.pi[j]) * self.z_vars[(j, self.D[j], 0)]
                     <= 0,
                     f"T_k0 upper bound constraints [{j}]",
                 )
 
-    def _create_T_k1_equality_constraints(self):
-        for j in self.J:
+    def _create_T_k1_equality_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and 1 - self.pi[j] < self.delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.T_vars[(j, self.D[j], 1)]
                     - self.delta[j] * self.z_vars[(j, self.D[j], 1)]
                     + self.u_vars[(j, self.D[j], 1)]
@@ -141,10 +200,11 @@ class BI_2(base.BI_2):
                     f"T_k1 equality constraints [{j}]",
                 )
 
-    def _create_T_k1_lower_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k1_lower_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and self.delta[j] <= 1 - self.pi[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.delta[j] * self.z_vars[(j, self.D[j], 1)]
                     - self.u_vars[(j, self.D[j], 1)]
                     - self.T_vars[(j, self.D[j], 1)]
@@ -152,20 +212,22 @@ class BI_2(base.BI_2):
                     f"T_k1 lower bound constraints [{j}]",
                 )
 
-    def _create_T_k1_upper_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k1_upper_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and self.delta[j] <= 1 - self.pi[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.T_vars[(j, self.D[j], 1)]
                     - self.delta[j] * self.z_vars[(j, self.D[j], 1)]
                     <= 0,
                     f"T_k1 upper bound constraints [{j}]",
                 )
 
-    def _create_T_equality_constraints(self):
-        for j, b, k in self.T_indices:
+    def _create_T_equality_constraints(self, jobs):
+        for j, b, k in self._T_indices(jobs):
             if b >= self.D[j] + 1:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.T_vars[(j, b, k)]
                     - (b - self.D[j] + self.delta[j]) * self.z_vars[(j, b, k)]
                     + self.u_vars[(j, b, k)]
@@ -173,30 +235,22 @@ class BI_2(base.BI_2):
                     f"T_equality constraints [{j,b,k}]",
                 )
 
-    def _make_start_time(self, job):
-        return int(
-            round(
-                sum(
-                    [
-                        self.Delta
-                        * (
-                            b * self.z_vars[(j, b, k)].value()
-                            - self.u_vars[(j, b, k)].value()
-                        )
-                        for j, b, k in self.z_indices
-                        if j == job
-                    ]
-                )
-            )
-        )
+    def _set_start(self, z_values, u_values, T_values):
+        T_cols = [self.z_indices.get_column(ind) for ind in self.T_vars]
+        for variables, values in (
+            (self.z_vars, z_values),
+            (self.u_vars, u_values),
+            (self.T_vars, T_values[T_cols]),
+        ):
+            for var, value in zip(variables.values(), values.tolist()):
+                var.setInitialValue(value)
+        self.warm_start = True
 
-    def get_schedule(self):
-        start_times = [self._make_start_time(j) for j in self.J]
+    def _set_cutoff(self, value):
+        self.cutoff = value
 
-        return Schedule(
-            start_times=start_times,
-            end_times=[s + p for s, p in zip(start_times, self.p)],
-        )
+    def _get_values(self, variables):
+        return np.array([v.varValue for v in variables.values()], dtype=float)
 
 
 class BI_2_slim(BI_2):
@@ -208,56 +262,42 @@ class BI_2_slim(BI_2):
         for b in irange(1, self.B):
             self.m += (
                 pulp.lpSum(
-                    self.Delta * self.u_vars[(j, a, k)]
-                    for (j, a, k) in self.z_indices
-                    if a == b
+                    self.Delta * self.u_vars[ind] for ind in self.z_indices.starting(b)
                 )
                 - pulp.lpSum(
-                    self.Delta * self.u_vars[(j, b - self.P[j] - k + 1, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    if (j, b - self.P[j] - k + 1, k) in self.z_indices
+                    self.Delta * self.u_vars[ind] for ind in self.z_indices.ending(b)
                 )
                 + pulp.lpSum(
                     (2 * self.Delta - self.Delta * k - self.Delta_pi[j])
-                    * self.z_vars[(j, b - self.P[j] - k + 1, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    if (j, b - self.P[j] - k + 1, k) in self.z_indices
+                    * self.z_vars[(j, a, k)]
+                    for j, a, k in self.z_indices.ending(b)
                 )
                 + pulp.lpSum(
-                    self.Delta * self.z_vars[(j, a, k)]
-                    for j in self.J
-                    for k in self.K[j]
-                    for a in irange(max(1, b - self.P[j] - k + 2), b - 1)
-                    if (j, a, k) in self.z_indices
+                    self.Delta * self.z_vars[ind] for ind in self.z_indices.spanning(b)
                 )
                 <= self.Delta,
                 f"Completion Constraints2 [{b}]",
             )
 
     def _create_u_lower_bound_constraints(self):
-        for j, b, k in self.z_indices:
+        for (j, b, k), lb in zip(self.z_indices, self.remainder_lb.tolist()):
             self.m += (
-                ((1 - k) * (self.Delta - self.Delta_pi[j]) + 1) * self.z_vars[(j, b, k)]
-                - self.Delta * self.u_vars[(j, b, k)]
-                <= 0,
+                lb * self.z_vars[(j, b, k)] - self.Delta * self.u_vars[(j, b, k)] <= 0,
                 f"u lower bound constraints [{j, b, k}]",
             )
 
     def _create_u_upper_bound_constraints(self):
-        for j, b, k in self.z_indices:
+        for (j, b, k), ub in zip(self.z_indices, self.remainder_ub.tolist()):
             self.m += (
-                self.Delta * self.u_vars[(j, b, k)]
-                - (self.Delta - k * self.Delta_pi[j]) * self.z_vars[(j, b, k)]
-                <= 0,
+                self.Delta * self.u_vars[(j, b, k)] - ub * self.z_vars[(j, b, k)] <= 0,
                 f"u upper bound constraints [{j, b, k}]",
             )
 
-    def _create_T_k0_lower_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k0_lower_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 0):
             if self.Delta - self.Delta_pi[j] < self.Delta_delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta_delta[j] * self.z_vars[(j, self.D[j], 0)]
                     - self.Delta * self.u_vars[(j, self.D[j], 0)]
                     - self.Delta * self.T_vars[(j, self.D[j], 0)]
@@ -265,10 +305,11 @@ class BI_2_slim(BI_2):
                     f"T_k0 lower bound constraints [{j}]",
                 )
 
-    def _create_T_k0_upper_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k0_upper_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 0):
             if self.Delta - self.Delta_pi[j] < self.Delta_delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta * self.T_vars[(j, self.D[j], 0)]
                     - (self.Delta_delta[j] - self.Delta + self.Delta_pi[j])
                     * self.z_vars[(j, self.D[j], 0)]
@@ -276,10 +317,11 @@ class BI_2_slim(BI_2):
                     f"T_k0 upper bound constraints [{j}]",
                 )
 
-    def _create_T_k1_equality_constraints(self):
-        for j in self.J:
+    def _create_T_k1_equality_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and self.Delta - self.Delta_pi[j] < self.Delta_delta[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta * self.T_vars[(j, self.D[j], 1)]
                     - self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
                     + self.Delta * self.u_vars[(j, self.D[j], 1)]
@@ -287,10 +329,11 @@ class BI_2_slim(BI_2):
                     f"T_k1 equality constraints [{j}]",
                 )
 
-    def _create_T_k1_lower_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k1_lower_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and self.Delta_delta[j] <= self.Delta - self.Delta_pi[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
                     - self.Delta * self.u_vars[(j, self.D[j], 1)]
                     - self.Delta * self.T_vars[(j, self.D[j], 1)]
@@ -298,20 +341,22 @@ class BI_2_slim(BI_2):
                     f"T_k1 lower bound constraints [{j}]",
                 )
 
-    def _create_T_k1_upper_bound_constraints(self):
-        for j in self.J:
+    def _create_T_k1_upper_bound_constraints(self, jobs):
+        for j in self._due_jobs(jobs, 1):
             if 1 in self.K[j] and self.Delta_delta[j] <= self.Delta - self.Delta_pi[j]:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta * self.T_vars[(j, self.D[j], 1)]
                     - self.Delta_delta[j] * self.z_vars[(j, self.D[j], 1)]
                     <= 0,
                     f"T_k1 upper bound constraints [{j}]",
                 )
 
-    def _create_T_equality_constraints(self):
-        for j, b, k in self.T_indices:
+    def _create_T_equality_constraints(self, jobs):
+        for j, b, k in self._T_indices(jobs):
             if b >= self.D[j] + 1:
-                self.m += (
+                self._add_T_constraint(
+                    j,
                     self.Delta * self.T_vars[(j, b, k)]
                     - (self.Delta * b - self.Delta * self.D[j] + self.Delta_delta[j])
                     * self.z_vars[(j, b, k)]
@@ -319,3 +364,143 @@ class BI_2_slim(BI_2):
                     == 0,
                     f"T_equality constraints [{j,b,k}]",
                 )
+
+
+class BI_2_V(BI_2, base.BI_2_V):
+    # bucket_lengths gives the length of each bucket, by default min(p)
+    def __init__(
+        self,
+        smsp,
+        bucket_lengths=None,
+        name="BI_2_V",
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        self.bucket_lengths = bucket_lengths
+        super().__init__(smsp, name, preprocess, precedences, relax)
+
+    def _add_machine_capacity_constraints_2(self):
+        z = self.z_indices
+        for b in irange(1, self.B):
+            self.m += (
+                pulp.lpSum(self.u_vars[ind] for ind in z.starting(b))
+                - pulp.lpSum(self.u_vars[ind] for ind in z.ending(b))
+                + pulp.lpSum(
+                    self.end_usage[col] * self.z_vars[z[col]] for col in z.end_adj[b]
+                )
+                + pulp.lpSum(
+                    self.p[j] * self.z_vars[(j, a, k)] for j, a, k in z.contained(b)
+                )
+                + pulp.lpSum(self.L[b] * self.z_vars[ind] for ind in z.spanning(b))
+                <= self.L[b],
+                f"Completion Constraints2 [{b}]",
+            )
+
+    def _create_u_lower_bound_constraints(self):
+        for (j, b, k), u_lb in zip(self.z_indices, self.u_lb):
+            self.m += (
+                u_lb * self.z_vars[(j, b, k)] - self.u_vars[(j, b, k)] <= 0,
+                f"u lower bound constraints [{j, b, k}]",
+            )
+
+    def _create_u_upper_bound_constraints(self):
+        for (j, b, k), u_ub in zip(self.z_indices, self.u_ub):
+            self.m += (
+                self.u_vars[(j, b, k)] - u_ub * self.z_vars[(j, b, k)] <= 0,
+                f"u upper bound constraints [{j, b, k}]",
+            )
+
+    def _create_T_lower_bound_constraints(self, jobs):
+        for j, b, k in self._T_indices(jobs, late=False):
+            self._add_T_constraint(
+                j,
+                (self.bounds[b] - self.d[j]) * self.z_vars[(j, b, k)]
+                - self.u_vars[(j, b, k)]
+                - self.T_vars[(j, b, k)]
+                <= 0,
+                f"T lower bound constraints [{j, b, k}]",
+            )
+
+    def _create_T_upper_bound_constraints(self, jobs):
+        z = self.z_indices
+        for j, b, k in self._T_indices(jobs, late=False):
+            self._add_T_constraint(
+                j,
+                self.T_vars[(j, b, k)]
+                - (self.start_ub[z.column[j, b, k]] - self.d[j])
+                * self.z_vars[(j, b, k)]
+                <= 0,
+                f"T upper bound constraints [{j, b, k}]",
+            )
+
+    def _create_T_equality_constraints(self, jobs):
+        for j, b, k in self._T_indices(jobs, late=True):
+            self._add_T_constraint(
+                j,
+                self.T_vars[(j, b, k)]
+                - (self.bounds[b] - self.d[j]) * self.z_vars[(j, b, k)]
+                + self.u_vars[(j, b, k)]
+                == 0,
+                f"T_equality constraints [{j, b, k}]",
+            )
+
+
+class BI_3(BI_2_V, base.BI_3):
+    # bucket_lengths gives the length of each bucket, by default p(1) + p(2).
+    # CBC's integer preprocessing (as of 2.10.3) can cut off the optimal
+    # solutions of this model, so is turned off.
+    _cbc_options = ("preprocess off",)
+
+    def __init__(
+        self,
+        smsp,
+        bucket_lengths=None,
+        name="BI_3",
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        super().__init__(smsp, bucket_lengths, name, preprocess, precedences, relax)
+
+    def _add_machine_capacity_constraints_3(self):
+        z = self.z_indices
+        for b in irange(1, self.B):
+            if z.contained(b):
+                self.m += (
+                    pulp.lpSum(
+                        self.z_vars[ind] for ind in z.contained(b) + z.spanning(b)
+                    )
+                    <= 1,
+                    f"Completion Constraints3 [{b}]",
+                )
+
+    def _add_machine_sequence_constraints_1(self):
+        z = self.z_indices
+        for b in irange(1, self.B):
+            if z.contained(b):
+                self.m += (
+                    pulp.lpSum(self.u_vars[ind] for ind in z.contained(b))
+                    - pulp.lpSum(self.u_vars[ind] for ind in z.ending(b))
+                    + pulp.lpSum(
+                        self.end_usage[col] * self.z_vars[z[col]]
+                        for col in z.end_adj[b]
+                    )
+                    <= self.L[b],
+                    f"Sequence Constraints1 [{b}]",
+                )
+
+    def _add_machine_sequence_constraints_2(self):
+        z = self.z_indices
+        for b in irange(1, self.B):
+            if z.contained(b):
+                self.m += (
+                    pulp.lpSum(self.u_vars[ind] for ind in z.starting(b))
+                    - pulp.lpSum(self.u_vars[ind] for ind in z.contained(b))
+                    + pulp.lpSum(
+                        (self.p[j] + self.L[b]) * self.z_vars[(j, a, k)]
+                        for j, a, k in z.contained(b)
+                    )
+                    <= self.L[b],
+                    f"Sequence Constraints2 [{b}]",
+                )
@@ -0,0 +1,174 @@
+import math
+import time
+
+import numpy as np
+
+from smsp_bi import preprocessing
+from smsp_bi.bi.matrix import BI_2
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.stats import Stats
+from smsp_bi.utils import SMSP, Schedule
+
+
+class _TimeLimit(Exception):
+    pass
+
+
+class BranchAndBound:
+    # Branch and bound over sequences, which fixes the next job at each node,
+    # so a node is a set S of jobs scheduled first, completing at the sum of
+    # their processing times.  The jobs left are bounded by the LP relaxation
+    # of formulation (by default the BI_2 matrix backend, solved with HiGHS)
+    # for them started at that completion time, which depends only on S and
+    # so is cached by its bitmask.  A node is pruned if S was reached at no
+    # greater cost by another sequence, if it schedules a job before one that
+    # precedes it (preprocessing.precedences), or if its bound shows it can
+    # not improve on the incumbent.  Sets of jobs are Python int bitmasks, so
+    # are not limited to 64 jobs.  Has the interface of the formulations used
+    # by batch.  The time limit also limits the node LPs, which are measured
+    # in the stats of their models.  Raises NotImplementedError if smsp has
+    # release dates or deadlines.
+    def __init__(self, smsp, formulation=BI_2):
+        if smsp.has_time_windows():
+            raise NotImplementedError(
+                "BranchAndBound does not support release dates or deadlines"
+            )
+        self.stats = Stats(f"{type(self).__module__}.{type(self).__name__}")
+        self.smsp = smsp.copy()
+        self.p = smsp._processing_times
+        self.d = smsp._due_dates
+        self.c = smsp._cost
+        self.formulation = formulation
+        self.integer_objective = self.smsp.has_integer_objective()
+        self.before = preprocessing.precedences(self.smsp)
+        # bitmask of the jobs preceding each job
+        self.predecessors = [
+            sum(1 << i for i in np.nonzero(before)[0].tolist())
+            for before in self.before.T
+        ]
+        self.sequence, self.objective = heuristic_sequence(self.smsp)
+        self.time_limit = None
+        self.nodes = 0
+        self.optimal = False
+        self.root_bound = None
+        self._bounds = {}
+        self._reached = {}
+
+    def set_limits(self, threads=None, time_limit=None):
+        # the node LPs are solved single threaded
+        self.time_limit = time_limit
+
+    def set_incumbent(self, start):
+        # start is a Schedule, or a sequence of jobs, used if better than the
+        # heuristic sequence
+        if isinstance(start, Schedule):
+            start = np.argsort(start.start_times, kind="stable")
+        objective = self.smsp.evaluate_sequences(start)[0]
+        if objective < self.objective:
+            self.sequence, self.objective = np.asarray(start), objective
+
+    def _left(self, scheduled):
+        # whether each job is not in the bitmask scheduled
+        n = len(self.p)
+        bits = np.frombuffer(scheduled.to_bytes(n // 8 + 1, "little"), dtype=np.uint8)
+        return np.unpackbits(bits, bitorder="little")[:n] == 0
+
+    def _late_cost(self, scheduled, completion):
+        # the cost of the jobs not in scheduled which are late if started at
+        # completion, as c * (s + completion - d) is c * s plus this constant
+        left = self._left(scheduled)
+        return self.c[left] @ np.maximum(0, completion - self.d[left]), left
+
+    def _bound(self, scheduled, completion):
+        # lower bound on the cost of the jobs not in scheduled
+        if scheduled in self._bounds:
+            return self._bounds[scheduled]
+        bound, left = self._late_cost(scheduled, completion)
+        if left.sum() > 1:
+            p, d, c = self.p[left], self.d[left], self.c[left]
+            model = self.formulation(
+                SMSP(p, np.maximum(d - completion, 0), c), relax=True
+            )
+            if self.time_limit is not None:
+                model.set_limits(threads=1, time_limit=self._time_left())
+            model.optimize()
+            if model.is_optimal():
+                bound += model.get_bound()
+            elif self.time_limit is not None:
+                self._time_left()
+        self._bounds[scheduled] = bound
+        return bound
+
+    def _prunable(self, bound):
+        # if the objective is integer, a bound within one of the incumbent can
+        # not lead to an improvement
+        if self.integer_objective:
+            return math.ceil(bound - 1e-6) >= self.objective
+        return bound >= self.objective - 1e-9
+
+    def _time_left(self):
+        left = self._deadline - time.perf_counter()
+        if left <= 0:
+            raise _TimeLimit
+        return left
+
+    def _search(self, sequence, scheduled, completion, cost):
+        if self.time_limit is not None:
+            self._time_left()
+        self.nodes += 1
+        if len(sequence) == len(self.p):
+            if cost < self.objective:
+                self.sequence, self.objective = np.array(sequence), cost
+            return
+        children = []
+        for j in range(len(self.p)):
+            if scheduled >> j & 1 or self.predecessors[j] & ~scheduled:
+                continue
+            child = scheduled | 1 << j
+            child_cost = cost + self.c[j] * max(0, completion - self.d[j])
+            if child_cost >= self._reached.get(child, math.inf):
+                continue
+            self._reached[child] = child_cost
+            completed = completion + self.p[j]
+            bound = child_cost + self._late_cost(child, completed)[0]
+            if not self._prunable(bound):
+                children.append((bound, j, child, child_cost))
+        # the LP bound is only computed for children which are expanded
+        for bound, j, child, child_cost in sorted(children):
+            # skipped if a cheaper sequence has since reached the same set
+            if child_cost > self._reached[child] or self._prunable(bound):
+                continue
+            completed = completion + self.p[j]
+            if not self._prunable(child_cost + self._bound(child, completed)):
+                self._search(sequence + [j], child, completed, child_cost)
+
+    def optimize(self):
+        with self.stats.solve(self._solve_stats):
+            self._deadline = time.perf_counter() + (self.time_limit or 0)
+            try:
+                self.root_bound = self._bound(0, 0)
+                self._search([], 0, 0, 0)
+                self.optimal = True
+            except _TimeLimit:
+                self.optimal = False
+
+    def _solve_stats(self):
+        bound = self.get_bound()
+        gap = None if bound is None else float(self.objective - bound)
+        if gap is not None and gap > 0:
+            gap = gap / abs(self.objective) if self.objective else math.inf
+        return {
+            "status": "optimal" if self.optimal else "time limit",
+            "solver_seconds": None,
+            "nodes": self.nodes,
+            "gap": gap,
+        }
+
+    def is_optimal(self):
+        return self.optimal
+
+    def get_bound(self):
+        return self.objective if self.optimal else self.root_bound
+
+    def get_schedule(self):
+        return self.smsp.get_schedule_from_sequence(self.sequence)
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def _popcounts(n):
+    # the number of jobs in each subset, indexed by bitmask
+    counts = np.zeros(1, dtype=np.uint8)
+    for _ in range(n):
+        counts = np.concatenate((counts, counts + 1))
+    return counts
+
+
+def solve(smsp, upper_bound=None, chunk_size=2**16):
+    # Solves smsp exactly by dynamic programming over subsets of jobs.  best[S]
+    # is the least cost of scheduling the jobs in the subset S (a bitmask)
+    # first, which complete at the sum of their processing times, so the last
+    # of them, j, starts at that sum less p[j] and best[S] is the minimum over
+    # j in S of best[S - j] plus the cost of j.  Subsets are solved in order
+    # of size, chunk_size at a time, so temporaries are (chunk_size, n) arrays
+    # and memory is about 10 * 2^n bytes.  Given upper_bound, eg the objective
+    # of heuristic_sequence, subsets which can only lead to schedules costing
+    # more are pruned, bounding the cost of each remaining job by its cost if
+    # started when the subset completes.  Returns an optimal Schedule.  Raises
+    # NotImplementedError if smsp has release dates or deadlines, and
+    # ValueError if it has more than 30 jobs or no schedule costs at most
+    # upper_bound.
+    if smsp.has_time_windows():
+        raise NotImplementedError("dp does not support release dates or deadlines")
+    p, d, c = smsp._processing_times, smsp._due_dates, smsp._cost
+    n = len(p)
+    if n > 30:
+        raise ValueError(f"too many jobs ({n}) for the subset DP")
+    jobs = np.arange(n)
+    bits = np.int64(1) << jobs
+    # costs may be fractional, and inf marks pruned subsets
+    best = np.full(2**n, np.inf)
+    best[0] = 0
+    last = np.zeros(2**n, dtype=np.int8)
+    popcounts = _popcounts(n)
+    for size in range(1, n + 1):
+        subsets = np.flatnonzero(popcounts == size)
+        for chunk in np.array_split(subsets, -(-len(subsets) // chunk_size)):
+            included = (chunk[:, None] & bits) != 0
+            completion = included @ p
+            cost = c * np.maximum(0, completion[:, None] - p - d)
+            values = np.where(included, best[chunk[:, None] ^ bits] + cost, np.inf)
+            last[chunk] = np.argmin(values, axis=1)
+            value = values[np.arange(len(chunk)), last[chunk]]
+            if upper_bound is not None:
+                remaining = np.where(
+                    included, 0, c * np.maximum(0, completion[:, None] - d)
+                ).sum(axis=1)
+                value[value + remaining > upper_bound + 1e-6] = np.inf
+            best[chunk] = value
+    subset = 2**n - 1
+    if np.isinf(best[subset]):
+        raise ValueError(f"no schedule costs at most {upper_bound}")
+    sequence = []
+    while subset:
+        sequence.append(last[subset])
+        subset ^= 1 << int(last[subset])
+    return smsp.get_schedule_from_sequence(sequence[::-1])
@@ -0,0 +1,89 @@
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+# Helpers shared by the gurobi models of smsp_bi.bi and smsp_bi.ti
+
+
+def add_matrix_model(m, matrix_model):
+    # the variables, as an MVar, and the list of constraints added to m
+    x = m.addMVar(
+        matrix_model.num_vars,
+        lb=matrix_model.lb,
+        ub=matrix_model.ub,
+        obj=matrix_model.obj,
+        vtype=matrix_model.vtype,
+        name="x",
+    )
+    constrs = m.addMConstr(matrix_model.A, x, matrix_model.sense, matrix_model.rhs)
+    m.update()
+    return x, constrs.tolist()
+
+
+def update_matrix_model(m, matrix_model, x, constrs):
+    # Makes the changes to matrix_model since x and constrs were added to m:
+    # the columns and rows added to it are added to m, the rows it removed
+    # are removed from m, variables fixed to zero are fixed in m, and the
+    # objective of m is set to that of matrix_model.
+    matrix_model.update()
+    n_vars = x.shape[0]
+    if matrix_model.num_vars > n_vars:
+        added = m.addMVar(
+            matrix_model.num_vars - n_vars,
+            lb=matrix_model.lb[n_vars:],
+            ub=matrix_model.ub[n_vars:],
+            obj=matrix_model.obj[n_vars:],
+            vtype=matrix_model.vtype[n_vars:],
+        )
+        x = gp.MVar(x.tolist() + added.tolist())
+    for row in matrix_model.removed_constrs.tolist():
+        if constrs[row] is not None:
+            m.remove(constrs[row])
+            constrs[row] = None
+    n_constrs = len(constrs)
+    if matrix_model.num_constrs > n_constrs:
+        constrs += m.addMConstr(
+            matrix_model.A[n_constrs:],
+            x,
+            matrix_model.sense[n_constrs:],
+            matrix_model.rhs[n_constrs:],
+        ).tolist()
+    variables = x.tolist()
+    m.setAttr("Obj", variables, matrix_model.obj.tolist())
+    fixed = np.nonzero(matrix_model.ub == 0)[0]
+    m.setAttr("UB", [variables[col] for col in fixed], [0.0] * len(fixed))
+    m.update()
+    return x, constrs
+
+
+def set_limits(m, threads, time_limit):
+    m.setParam("Threads", 0 if threads is None else threads)
+    m.setParam("TimeLimit", GRB.INFINITY if time_limit is None else time_limit)
+
+
+def get_bound(m, relax):
+    return m.ObjVal if relax else m.ObjBound
+
+
+def size(m):
+    m.update()
+    return m.NumConstrs, m.NumVars, m.NumNZs
+
+
+def solve_stats(m):
+    return {
+        "status": m.Status,
+        "solver_seconds": m.Runtime,
+        "nodes": int(m.NodeCount) if m.IsMIP else None,
+        "gap": m.MIPGap if m.IsMIP and m.SolCount else None,
+    }
+
+
+def set_integrality(m, variables, integer):
+    vtype = GRB.BINARY if integer else GRB.CONTINUOUS
+    m.setAttr("VType", variables, [vtype] * len(variables))
+
+
+def fix_to_zero(m, variables, fixed):
+    variables = [var for var, fix in zip(variables, fixed) if fix]
+    m.setAttr("UB", variables, [0.0] * len(variables))
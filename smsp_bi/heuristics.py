@@ -0,0 +1,190 @@
+import numpy as np
+
+
+def edd(smsp):
+    # earliest due date sequence
+    return np.argsort(smsp._due_dates, kind="stable")
+
+
+def edf(smsp):
+    # earliest deadline sequence, by latest start time without deadlines
+    return np.argsort(smsp.time_windows()[1], kind="stable")
+
+
+def atc(smsp, k=2.0):
+    # apparent tardiness cost dispatching, for the scaling parameter k.  As
+    # tardiness is measured from the start time, the rule is applied with
+    # due dates d + p, for which the slack of a job at time t is d - t.
+    p, d, c = smsp._processing_times, smsp._due_dates, smsp._cost
+    scale = k * p.mean()
+    with np.errstate(divide="ignore"):
+        log_ratio = np.log(c / p)
+    scheduled = np.zeros(len(p), dtype=bool)
+    sequence = []
+    t = 0
+    for _ in range(len(p)):
+        # priorities are compared in log space to avoid underflow
+        priority = log_ratio - np.maximum(d - t, 0) / scale
+        priority[scheduled] = -np.inf
+        j = np.argmax(priority)
+        sequence.append(j)
+        scheduled[j] = True
+        t += p[j]
+    return np.array(sequence)
+
+
+def _tardiness_costs(smsp, sequence, start_times):
+    # cost of the job at each position of sequence, for each row of start times
+    return smsp._cost[sequence] * np.maximum(start_times - smsp._due_dates[sequence], 0)
+
+
+def _swap_neighbours(sequence):
+    # the sequences with the jobs at positions i and i + 1 swapped, by row i
+    i = np.arange(len(sequence) - 1)
+    neighbours = np.tile(sequence, (len(i), 1))
+    neighbours[i, i], neighbours[i, i + 1] = sequence[1:], sequence[:-1]
+    return neighbours
+
+
+def _insertion_neighbours(sequence, i):
+    # the sequences with the job at position i moved to position r, by row r
+    n = len(sequence)
+    r, position = np.indices((n, n))
+    source = np.where(
+        position == r,
+        i,
+        position
+        + ((i <= position) & (position < r))
+        - ((r < position) & (position <= i)),
+    )
+    return sequence[source]
+
+
+def _window_deltas(smsp, sequence, neighbours):
+    # the change in the time by which deadlines are missed, and in objective,
+    # from sequence to each row of neighbours, found by evaluating them, as
+    # with release dates the start times do not shift by processing times
+    return (
+        smsp._deadline_excess(neighbours) - smsp._deadline_excess(sequence)[0],
+        smsp.evaluate_sequences(neighbours) - smsp.evaluate_sequences(sequence)[0],
+    )
+
+
+def adjacent_swap_deltas(smsp, sequence):
+    # the change in objective from swapping the jobs at positions i and i + 1
+    sequence = np.asarray(sequence)
+    if smsp.has_time_windows():
+        return _window_deltas(smsp, sequence, _swap_neighbours(sequence))[1]
+    p = smsp._processing_times[sequence]
+    start_times = np.cumsum(p) - p
+    first, second = sequence[:-1], sequence[1:]
+    before = _tardiness_costs(smsp, first, start_times[:-1]) + _tardiness_costs(
+        smsp, second, start_times[1:]
+    )
+    after = _tardiness_costs(smsp, second, start_times[:-1]) + _tardiness_costs(
+        smsp, first, start_times[:-1] + p[1:]
+    )
+    return after - before
+
+
+def insertion_deltas(smsp, sequence):
+    # the change in objective, as an (n, n) array, from moving the job at
+    # position i to position r.  Moving it later shifts the jobs at positions
+    # i + 1, ..., r earlier by p_i, and moving it earlier shifts the jobs at
+    # positions r, ..., i - 1 later by p_i, so the change over the shifted jobs
+    # is a difference of prefix sums of the cost changes of shifting each job.
+    sequence = np.asarray(sequence)
+    n = len(sequence)
+    if smsp.has_time_windows():
+        return np.array(
+            [
+                _window_deltas(smsp, sequence, _insertion_neighbours(sequence, i))[1]
+                for i in range(n)
+            ]
+        )
+    p = smsp._processing_times[sequence]
+    start_times = np.cumsum(p) - p
+    costs = _tardiness_costs(smsp, sequence, start_times)
+
+    def shifted(shift):
+        changes = _tardiness_costs(smsp, sequence, start_times + shift) - costs
+        return np.concatenate((np.zeros((n, 1)), np.cumsum(changes, axis=1)), axis=1)
+
+    earlier, later = shifted(-p[:, None]), shifted(p[:, None])
+    i, r = np.indices((n, n))
+    shifted_change = np.where(
+        r > i,
+        earlier[i, r + 1] - earlier[i, i + 1],
+        later[i, i] - later[i, r],
+    )
+    moved_start = np.where(
+        r > i, start_times[r] + p[r] - p[i], np.minimum(start_times[r], start_times[i])
+    )
+    moved_change = (
+        _tardiness_costs(smsp, sequence[:, None], moved_start) - costs[:, None]
+    )
+    return shifted_change + moved_change
+
+
+def _move(sequence, i, r):
+    # sequence with the job at position i moved to position r
+    return np.insert(np.delete(sequence, i), r, sequence[i])
+
+
+def _window_local_search(smsp, sequence):
+    # local_search for release dates and deadlines, where a move improves if
+    # it reduces the time by which deadlines are missed, or keeps it and
+    # reduces the objective
+    n = len(sequence)
+    while n > 1:
+        swaps = _swap_neighbours(sequence)
+        insertions = np.concatenate(
+            [_insertion_neighbours(sequence, i) for i in range(n)]
+        )
+        for neighbours in (swaps, insertions):
+            excess, objective = _window_deltas(smsp, sequence, neighbours)
+            best = np.lexsort((objective, excess))[0]
+            if excess[best] < 0 or (excess[best] == 0 and objective[best] < -1e-9):
+                sequence = neighbours[best]
+                break
+        else:
+            break
+    return sequence
+
+
+def local_search(smsp, sequence):
+    # descent with adjacent swap moves, which are cheap to evaluate, and then
+    # insertion moves, taking the best improving move of each neighbourhood.
+    # The objective returned is inf if the sequence misses a deadline.
+    sequence = np.asarray(sequence)
+    if smsp.has_time_windows():
+        sequence = _window_local_search(smsp, sequence)
+        objective = smsp.evaluate_sequences(sequence)[0]
+        if smsp._deadline_excess(sequence)[0] > 0:
+            objective = np.inf
+        return sequence, objective
+    while len(sequence) > 1:
+        deltas = adjacent_swap_deltas(smsp, sequence)
+        i = np.argmin(deltas)
+        if deltas[i] < 0:
+            sequence = _move(sequence, i, i + 1)
+            continue
+        deltas = insertion_deltas(smsp, sequence)
+        i, r = np.unravel_index(np.argmin(deltas), deltas.shape)
+        if deltas[i, r] < 0:
+            sequence = _move(sequence, i, r)
+            continue
+        break
+    return sequence, smsp.evaluate_sequences(sequence)[0]
+
+
+def heuristic_sequence(smsp, rules=(edd, atc)):
+    # the best sequence, and its objective, found by local search from the
+    # sequences given by the dispatching rules, and by edf if there are
+    # deadlines.  The objective is inf if no sequence found meets them.
+    if smsp._deadlines is not None:
+        rules = tuple(rules) + (edf,)
+    return min(
+        (local_search(smsp, rule(smsp)) for rule in rules),
+        key=lambda result: result[1],
+    )
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+
+from smsp_bi.heuristics import heuristic_sequence
+
+
+def _coverage(starts, p, T):
+    # the number of jobs processing in each period, for the given start times
+    changes = np.zeros(T + 1)
+    np.add.at(changes, starts, 1)
+    np.add.at(changes, starts + p, -1)
+    return np.cumsum(changes[:-1])
+
+
+def lower_bound(smsp, incumbent=None, iterations=1000, theta=2.0, patience=20):
+    # A lower bound on the objective from the Lagrangian relaxation of the
+    # machine capacity constraints of the TI model.  With multipliers l[t] >= 0
+    # on the periods, each job starts independently, at the period minimising
+    # its cost plus the sum of l over the periods it covers, which is found for
+    # all jobs and periods at once with prefix sums of l.  The multipliers are
+    # updated by subgradient steps towards the objective of incumbent (a
+    # sequence, by default that of heuristic_sequence), halving the step size
+    # theta when the bound has not improved in patience iterations.  The
+    # subproblem solutions, ordered by start time, give schedules that may
+    # improve on incumbent.  Returns the bound, which is at most the TI LP
+    # bound, and the best sequence found with its objective.  Raises
+    # NotImplementedError if smsp has release dates or deadlines.
+    if smsp.has_time_windows():
+        raise NotImplementedError(
+            "lower_bound does not support release dates or deadlines"
+        )
+    p, d, c = smsp._processing_times, smsp._due_dates, smsp._cost
+    if incumbent is None:
+        incumbent = heuristic_sequence(smsp)[0]
+    sequence = np.asarray(incumbent)
+    objective = smsp.evaluate_sequences(sequence)[0]
+    n, T = len(p), p.sum()
+    jobs = np.arange(n)
+    t = np.arange(T)  # start times
+    cost = np.where(
+        t <= T - p[:, None],
+        c[:, None] * np.maximum(0, t - d[:, None]),
+        np.inf,
+    )
+    end = np.minimum(t + p[:, None], T)
+    multipliers = np.zeros(T)
+    integer_objective = smsp.has_integer_objective()
+    bound = -np.inf
+    stalled = 0
+    for _ in range(iterations):
+        covered = np.concatenate(([0], np.cumsum(multipliers)))
+        reduced = cost + covered[end] - covered[t]
+        starts = np.argmin(reduced, axis=1)
+        value = reduced[jobs, starts].sum() - multipliers.sum()
+        if value > bound + 1e-9:
+            bound, stalled = value, 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                theta, stalled = theta / 2, 0
+
+        order = np.argsort(starts, kind="stable")
+        order_objective = smsp.evaluate_sequences(order)[0]
+        if order_objective < objective:
+            sequence, objective = order, order_objective
+
+        # the incumbent is optimal once the bound reaches it, or is within
+        # one of it if the objective is integer
+        if integer_objective:
+            proved = math.ceil(bound - 1e-6) >= objective
+        else:
+            proved = bound >= objective - 1e-9
+        if proved or theta < 1e-4:
+            break
+        subgradient = _coverage(starts, p, T) - 1
+        subgradient[(multipliers <= 0) & (subgradient < 0)] = 0
+        norm = subgradient @ subgradient
+        if norm == 0:
+            # the relaxed solution is a feasible schedule, and so optimal
+            break
+        step = theta * (objective - value) / norm
+        multipliers = np.maximum(0, multipliers + step * subgradient)
+    return bound, sequence, objective
@@ -0,0 +1,222 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+
+class ModelBuilder(ABC):
+    # A minimisation model held as arrays: objective vector c, column bounds
+    # and types ("B", "I", "C"), and row senses ("<", "=", ">") and right hand
+    # sides.  Variables and constraints are added in blocks, which are
+    # assembled into the arrays by update().  Subclasses say what is done
+    # with the coefficients of each block of constraints, by _add_block.
+    def __init__(self, name):
+        self.name = name
+        self.num_vars = 0
+        self.num_constrs = 0
+        self._num_nz = 0
+        self.var_blocks = {}
+        self.constr_blocks = {}
+        self._var_parts = []
+        self._constr_parts = []
+        self.start = None
+        self.update()
+
+    def add_vars(self, n, obj=0, lb=0, ub=np.inf, vtype="C", name=None):
+        cols = np.arange(self.num_vars, self.num_vars + n)
+        self._var_parts.append(
+            tuple(
+                np.broadcast_to(np.asarray(value, dtype=dtype), n)
+                for value, dtype in (
+                    (obj, float),
+                    (lb, float),
+                    (ub, float),
+                    (vtype, "U1"),
+                )
+            )
+        )
+        self.num_vars += n
+        if name is not None:
+            self.var_blocks[name] = cols
+        return cols
+
+    def _set_var_attr(self, i, cols, value):
+        # the variable parts are merged so that attribute i of cols can be set
+        self._update_vars()
+        parts = [part.copy() for part in (self.obj, self.lb, self.ub, self.vtype)]
+        parts[i][cols] = value
+        self._var_parts = [tuple(parts)]
+
+    def set_obj(self, cols, obj):
+        self._set_var_attr(0, cols, obj)
+
+    def set_ub(self, cols, ub):
+        self._set_var_attr(2, cols, ub)
+
+    def set_vtype(self, cols, vtype):
+        self._set_var_attr(3, cols, vtype)
+
+    def set_start(self, cols, values):
+        # records a (partial) MIP start, nan where no value is given.  Like
+        # MatrixModel.cutoff it is kept for use by other solvers, as scipy's
+        # milp does not accept one.
+        if self.start is None or len(self.start) != self.num_vars:
+            self.start = np.full(self.num_vars, np.nan)
+        self.start[cols] = values
+
+    def add_constrs(self, rows, cols, vals, sense, rhs, name=None):
+        # rows are numbered from zero within the block, one row per entry in rhs
+        rhs = np.asarray(rhs, dtype=float)
+        cols = np.asarray(cols, dtype=int)
+        vals = np.broadcast_to(np.asarray(vals, dtype=float), cols.shape)
+        first = self.num_constrs
+        self._constr_parts.append((np.full(len(rhs), sense), rhs))
+        self.num_constrs += len(rhs)
+        self._num_nz += len(cols)
+        block = np.arange(first, self.num_constrs)
+        if name is not None:
+            self.constr_blocks[name] = block
+        self._add_block(first, np.asarray(rows, dtype=int) + first, cols, vals)
+        return block
+
+    @abstractmethod
+    def _add_block(self, first, rows, cols, vals):
+        # the coefficients of the block of constraints numbered from first,
+        # with rows numbered within the model
+        pass
+
+    def add_constrs_from_terms(self, terms, sense, rhs, name=None):
+        # terms is a sequence of (cols, vals) pairs, aligned with rhs, so that
+        # row i is the sum over terms of vals[i] * x[cols[i]]
+        rhs = np.asarray(rhs, dtype=float)
+        rows = np.arange(len(rhs))
+        return self.add_constrs(
+            rows=np.concatenate([rows for _ in terms]),
+            cols=np.concatenate([cols for cols, _ in terms]),
+            vals=np.concatenate(
+                [
+                    np.broadcast_to(np.asarray(vals, dtype=float), rows.shape)
+                    for _, vals in terms
+                ]
+            ),
+            sense=sense,
+            rhs=rhs,
+            name=name,
+        )
+
+    def add_constrs_from_rows(self, rows, sense, rhs, name=None):
+        # rows is a sequence of (cols, vals) pairs, aligned with rhs, so that
+        # row i is vals @ x[cols] for the pair rows[i]
+        return self.add_constrs(
+            rows=np.repeat(np.arange(len(rows)), [len(cols) for cols, _ in rows]),
+            cols=np.concatenate([cols for cols, _ in rows] or [np.zeros(0, int)]),
+            vals=np.concatenate([vals for _, vals in rows] or [np.zeros(0)]),
+            sense=sense,
+            rhs=rhs,
+            name=name,
+        )
+
+    def _update_vars(self):
+        var_parts = list(zip(*self._var_parts)) or [[np.zeros(0)]] * 4
+        self.obj, self.lb, self.ub, self.vtype = (
+            np.concatenate(part) for part in var_parts
+        )
+
+    def update(self):
+        self._update_vars()
+        constr_parts = list(zip(*self._constr_parts)) or [[np.zeros(0)]] * 2
+        self.sense, self.rhs = (np.concatenate(part) for part in constr_parts)
+
+    @property
+    def num_nz(self):
+        # counted as constraints are added, so is known before update
+        return self._num_nz
+
+
+class MatrixModel(ModelBuilder):
+    # A ModelBuilder which assembles the constraint matrix A (CSR) on update(),
+    # and solves the model with scipy (HiGHS)
+    def __init__(self, name):
+        self._coef_parts = []
+        self.removed_constrs = np.zeros(0, dtype=int)
+        self.cutoff = None
+        self.time_limit = None
+        self.x = None
+        self.obj_val = None
+        self.obj_bound = None
+        self.reduced_costs = None
+        self.status = None
+        self.runtime = None
+        self.nodes = None
+        self.gap = None
+        super().__init__(name)
+
+    def _add_block(self, first, rows, cols, vals):
+        self._coef_parts.append((rows, cols, vals))
+
+    def remove_constrs(self, rows):
+        # the rows are left empty, as 0 <= 0, so that the rows after them keep
+        # their numbers
+        self.removed_constrs = np.union1d(self.removed_constrs, rows)
+
+    def update(self):
+        super().update()
+        coef_parts = list(zip(*self._coef_parts)) or [[np.zeros(0, dtype=int)]] * 3
+        rows, cols, vals = (np.concatenate(part) for part in coef_parts)
+        if len(self.removed_constrs):
+            self.sense[self.removed_constrs] = "<"
+            self.rhs[self.removed_constrs] = 0
+            keep = ~np.isin(rows, self.removed_constrs)
+            rows, cols, vals = rows[keep], cols[keep], vals[keep]
+            self._coef_parts = [(rows, cols, vals)]
+            self._num_nz = len(cols)
+        self.A = sp.csr_matrix(
+            (vals, (rows, cols)), shape=(self.num_constrs, self.num_vars)
+        )
+
+    def _optimize_lp(self, options):
+        # linprog, unlike milp, gives the reduced costs
+        sign = np.where(self.sense == ">", -1.0, 1.0)
+        inequality, equality = self.sense != "=", self.sense == "="
+        A = sp.diags(sign) @ self.A
+        result = linprog(
+            c=self.obj,
+            A_ub=A[inequality],
+            b_ub=(sign * self.rhs)[inequality],
+            A_eq=A[equality],
+            b_eq=self.rhs[equality],
+            bounds=np.column_stack((self.lb, self.ub)),
+            method="highs",
+            options=options,
+        )
+        if result.x is not None:
+            self.reduced_costs = result.lower.marginals + result.upper.marginals
+        return result
+
+    def optimize(self):
+        self.update()
+        options = {} if self.time_limit is None else {"time_limit": self.time_limit}
+        self.reduced_costs = None
+        start = time.perf_counter()
+        if np.all(self.vtype == "C"):
+            result = self._optimize_lp(options)
+            self.obj_bound = result.fun
+        else:
+            lower = np.where(self.sense == "<", -np.inf, self.rhs)
+            upper = np.where(self.sense == ">", np.inf, self.rhs)
+            result = milp(
+                c=self.obj,
+                integrality=(self.vtype != "C").astype(int),
+                bounds=Bounds(self.lb, self.ub),
+                constraints=LinearConstraint(self.A, lower, upper),
+                options=options,
+            )
+            self.obj_bound = getattr(result, "mip_dual_bound", None)
+        self.runtime = time.perf_counter() - start
+        self.nodes = getattr(result, "mip_node_count", None)
+        self.gap = getattr(result, "mip_gap", None)
+        self.status = result.status
+        self.x = result.x
+        self.obj_val = result.fun
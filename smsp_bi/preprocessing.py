@@ -0,0 +1,77 @@
+import numpy as np
+
+from smsp_bi.heuristics import heuristic_sequence
+
+
+def _check_no_time_windows(smsp):
+    # the rules assume schedules without idle time
+    if smsp.has_time_windows():
+        raise NotImplementedError(
+            "preprocessing does not support release dates or deadlines"
+        )
+
+
+def _transitive_closure(before):
+    before = before.copy()
+    for k in range(len(before)):
+        before |= before[:, k, None] & before[k, None, :]
+    return before
+
+
+def precedences(smsp):
+    # An (n, n) boolean array, before[i, j] True if job i precedes job j in
+    # some optimal schedule, such that one optimal schedule satisfies them all.
+    # As tardiness is measured from the start time, the dominance rules for
+    # weighted tardiness are applied with due dates d + p:
+    #  - i precedes j if p_i <= p_j, d_i + p_i <= d_j + p_j and c_i >= c_j,
+    #    with ties broken by index
+    #  - jobs which can not be tardy, in any position after the other jobs,
+    #    follow the other jobs
+    # Raises NotImplementedError if smsp has release dates or deadlines, as
+    # the rules assume schedules without idle time.
+    _check_no_time_windows(smsp)
+    p, c = smsp._processing_times, smsp._cost
+    due = smsp._due_dates + p
+    n = len(p)
+    i, j = np.indices((n, n))
+    weakly = (p[:, None] <= p) & (due[:, None] <= due) & (c[:, None] >= c)
+    strictly = (p[:, None] < p) | (due[:, None] < due) | (c[:, None] > c)
+    before = weakly & (strictly | (i < j))
+
+    remaining = np.ones(n, dtype=bool)
+    horizon = p.sum()
+    while remaining.any():
+        never_tardy = remaining & (due >= horizon)
+        if not never_tardy.any() or never_tardy.all():
+            break
+        remaining &= ~never_tardy
+        before |= remaining[:, None] & never_tardy
+        horizon -= p[never_tardy].sum()
+    return _transitive_closure(before)
+
+
+def precedence_pairs(before):
+    # the (i, j) pairs of precedences which are not implied by the others
+    implied = (before.astype(int) @ before.astype(int)) > 0
+    return np.nonzero(before & ~implied)
+
+
+def start_windows(smsp, upper_bound=None, before=None):
+    # The earliest and latest start time of each job in some optimal schedule,
+    # which has no idle time and satisfies the precedences (before, by default
+    # those given by precedences).  A job can not start so late that its cost
+    # exceeds upper_bound, by default the objective of heuristic_sequence.
+    # Raises NotImplementedError if smsp has release dates or deadlines.
+    _check_no_time_windows(smsp)
+    p, d, c = smsp._processing_times, smsp._due_dates, smsp._cost
+    if before is None:
+        before = precedences(smsp)
+    if upper_bound is None:
+        upper_bound = heuristic_sequence(smsp)[1]
+    earliest = p @ before
+    latest = p.sum() - p - before @ p
+    costly = c > 0
+    latest[costly] = np.minimum(
+        latest[costly], d[costly] + np.floor(upper_bound / c[costly])
+    )
+    return earliest, latest
@@ -0,0 +1,76 @@
+import pulp
+
+# Helpers shared by the pulp models of smsp_bi.bi and smsp_bi.ti
+
+
+def solver(model):
+    # the default solver, unless a MIP start, cutoff, limits or the model's
+    # options (model._cbc_options) are to be passed to CBC
+    options = list(model._cbc_options)
+    if model.cutoff is not None:
+        options.append(f"cutoff {_cutoff(model)}")
+    settings = (model.warm_start, options, model.threads, model.time_limit)
+    if settings == (False, [], None, None):
+        return None
+    return pulp.PULP_CBC_CMD(
+        warmStart=model.warm_start,
+        threads=model.threads,
+        timeLimit=model.time_limit,
+        options=options,
+    )
+
+
+def _cutoff(model):
+    # CBC discards solutions which do not improve on its cutoff, including
+    # the MIP start if its objective is the cutoff, so the incumbent's
+    # objective is padded, by less than the least improvement on it if the
+    # objective is integer and by a relative tolerance otherwise
+    if model.smsp.has_integer_objective():
+        return model.cutoff + 1 - 1e-6
+    return model.cutoff + 1e-6 * max(1, abs(model.cutoff))
+
+
+def constraints(m):
+    # the constraints of m, which recent versions of pulp give by
+    # prob.constraints(), and older ones as the dict prob.constraints
+    if callable(m.constraints):
+        return m.constraints()
+    return list(m.constraints.values())
+
+
+def remove_constraints(m, removed):
+    # pulp can not remove constraints, so a copy of m without those in removed
+    # is returned, which shares the objective and the constraints kept
+    removed = {constraint.name for constraint in removed}
+    copy = pulp.LpProblem(m.name, m.sense)
+    copy.setObjective(m.objective)
+    for constraint in constraints(m):
+        if constraint.name not in removed:
+            copy.addConstraint(constraint)
+    return copy
+
+
+def size(m, columns):
+    nonzeros = sum(len(constraint) for constraint in constraints(m))
+    return m.numConstraints(), columns, nonzeros
+
+
+def solve_stats(m):
+    # CBC's node count and gap are not reported by pulp
+    return {
+        "status": m.sol_status,
+        "solver_seconds": m.solutionTime,
+        "nodes": None,
+        "gap": None,
+    }
+
+
+def set_integrality(variables, integer):
+    for var in variables.values():
+        var.cat = pulp.LpInteger if integer else pulp.LpContinuous
+
+
+def fix_to_zero(variables, fixed):
+    for var, fix in zip(variables.values(), fixed):
+        if fix:
+            var.upBound = 0
@@ -0,0 +1,89 @@
+import numpy as np
+
+from smsp_bi.batch import _solve, solve_many
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.utils import SMSP
+
+
+def _shifted(smsp, jobs, completion):
+    # the instance of jobs started at completion, which costs a constant more
+    # for jobs already late then
+    return SMSP(
+        smsp._processing_times[jobs],
+        np.maximum(smsp._due_dates[jobs] - completion, 0),
+        smsp._cost[jobs],
+    )
+
+
+def rolling_horizon(
+    smsp,
+    formulation,
+    window=20,
+    overlap=5,
+    sequence=None,
+    rules=(),
+    workers=None,
+    threads_per_solve=None,
+    time_limit=None,
+):
+    # Solves smsp by windows of jobs, for instances too big for formulation
+    # (eg smsp_bi.bi.gurobi.BI_2) to solve whole.  Jobs are taken in the order
+    # of sequence (by default that of heuristic_sequence) and the first window
+    # jobs left are solved with formulation, as an instance starting when the
+    # fixed jobs complete.  The first window - overlap jobs of the solved
+    # window are fixed, and the windows slide forward.  A solved window is only
+    # kept if the whole sequence, with the jobs left in order, costs less, so
+    # the schedule is no worse than sequence.  Alternative windows, of the
+    # jobs left ordered by each of rules (eg heuristics.atc), are solved in
+    # parallel (see batch.solve_many) and the best is kept.  time_limit
+    # (seconds) applies to each window.  Returns the Schedule and the
+    # batch.Result of each window, in order, with the window number as index.
+    # Raises NotImplementedError if smsp has release dates or deadlines.
+    if smsp.has_time_windows():
+        raise NotImplementedError(
+            "rolling_horizon does not support release dates or deadlines"
+        )
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be at least 0 and less than window")
+    if sequence is None:
+        sequence = heuristic_sequence(smsp)[0]
+    p = smsp._processing_times
+    left = np.asarray(sequence)
+    sequence = np.zeros(0, dtype=int)
+    results = []
+    while len(left):
+        completion = p[sequence].sum()
+        orders = [left] + [
+            left[rule(_shifted(smsp, left, completion))] for rule in rules
+        ]
+        instances = [_shifted(smsp, order[:window], completion) for order in orders]
+        if len(instances) == 1 or workers == 1:
+            solved = [
+                _solve(index, instance, formulation, threads_per_solve, time_limit)
+                for index, instance in enumerate(instances)
+            ]
+        else:
+            solved = sorted(
+                solve_many(
+                    instances, formulation, workers, threads_per_solve, time_limit
+                ),
+                key=lambda result: result.index,
+            )
+        n_fixed = len(left) if len(left) <= window else window - overlap
+        objective = smsp.evaluate_sequences(np.concatenate((sequence, left)))[0]
+        best = (objective, left, solved[0])
+        for order, result in zip(orders, solved):
+            if result.error is not None:
+                continue
+            jobs = order[:window]
+            jobs = jobs[np.argsort(result.schedule.start_times, kind="stable")]
+            order = np.concatenate((jobs, order[window:]))
+            objective = smsp.evaluate_sequences(np.concatenate((sequence, order)))[0]
+            if objective < best[0]:
+                best = (objective, order, result)
+        _, order, result = best
+        result.index = len(results)
+        results.append(result)
+        sequence = np.concatenate((sequence, order[:n_fixed]))
+        left = order[n_fixed:]
+    return smsp.get_schedule_from_sequence(sequence), results
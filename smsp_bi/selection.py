@@ -0,0 +1,122 @@
+import importlib
+import math
+
+import numpy as np
+
+
+def _ti_sizes(smsp):
+    p = smsp._processing_times
+    T = smsp.horizon()
+    earliest, latest = smsp.time_windows()
+    starts = np.maximum(latest - earliest + 1, 0)
+    return {
+        "num_vars": starts.sum(),
+        "num_constrs": len(p) + T,
+        "num_nz": (starts * (1 + p)).sum(),
+    }
+
+
+def _bi_2_sizes(smsp, slim):
+    # mirrors base.BI_2._setup and the constraints of the BI_2 backends, with
+    # arrays of shape (2, n) for k = 0, 1
+    p, d = smsp._processing_times, smsp._due_dates
+    Delta = p.min()
+    B = smsp.horizon() // Delta + 1
+    P = p // Delta + 1
+    pi = P - p / Delta
+    has_k1 = p % Delta != 0
+    D = d // Delta + 1
+    delta = D - d / Delta
+    k = np.arange(2)[:, None]
+    # the first and last bucket of the z[j, b, k]
+    first = np.ones((2, len(p)), dtype=int)
+    last = np.broadcast_to(B - P + 1, first.shape)
+    if smsp.has_time_windows():
+        # as base.BI_2._setup_remainders drops buckets in which the remainder
+        # can not fit the window, which are at the ends of the range
+        earliest, latest = smsp.time_windows()
+        remainder_lb = np.where(k == 0, p % Delta + 1, 1)
+        remainder_ub = np.where(k == 0, Delta, p % Delta)
+        first = np.maximum(
+            earliest // Delta + 1, -(-(remainder_lb + earliest) // Delta)
+        )
+        last = np.minimum(
+            np.minimum(last, latest // Delta + 1), (remainder_ub + latest) // Delta
+        )
+    last = np.where((k == 1) & ~has_k1, 0, last)
+    n_z = np.maximum(last - first + 1, 0)
+    n_T = np.maximum(last - np.maximum(first, D) + 1, 0)
+    n_T_eq = np.maximum(last - np.maximum(first, D + 1) + 1, 0)
+    # z[j, b, k] completing within the horizon
+    n_ending = np.maximum(np.minimum(last, B - P - k + 1) - first + 1, 0)
+    due = (first <= D) & (D <= last)  # z[j, D[j], k] exists
+    if slim:
+        # BI_2_slim compares the scaled, integer, quantities
+        k0_condition = Delta - (Delta * P - p) < Delta * D - d
+    else:
+        k0_condition = 1 - pi < delta
+    k0 = k0_condition & due[0]
+    k1_eq = k0_condition & due[1]
+    k1_bounds = ~k0_condition & due[1]
+    return {
+        "num_vars": 2 * n_z.sum() + n_T.sum(),
+        "num_constrs": len(p)
+        + 2 * B
+        + 2 * n_z.sum()
+        + 2 * k0.sum()
+        + k1_eq.sum()
+        + 2 * k1_bounds.sum()
+        + n_T_eq.sum(),
+        "num_nz": (
+            n_z  # job completion
+            + 2 * n_z * (P - 1 + k)  # capacity 1, and starting u and spanning z
+            + 2 * n_ending  # capacity 2, ending u and z
+            + 4 * n_z  # u bounds
+            + 3 * n_T_eq
+        ).sum()
+        + (5 * k0 + 3 * k1_eq + 5 * k1_bounds).sum(),
+    }
+
+
+def formulation_sizes(smsp):
+    # the number of variables, constraints and nonzeros of each formulation,
+    # computed from the instance without building the models
+    return {
+        "TI": _ti_sizes(smsp),
+        "BI_2": _bi_2_sizes(smsp, slim=False),
+        "BI_2_slim": _bi_2_sizes(smsp, slim=True),
+    }
+
+
+# log(seconds) ~ intercept + coef * log(num_nz), by formulation, fitted by least
+# squares to build and solve times of the matrix backends (HiGHS) on random
+# instances (10 to 40 jobs, processing times from 1-10 to 10-200).  The fit is
+# rough, within a factor of about 2.5, but the formulations differ in size by
+# far more than that on the instances where the choice matters.
+_COST_MODEL = {
+    "TI": {"intercept": -11.147, "num_nz": 1.066},
+    "BI_2": {"intercept": -9.871, "num_nz": 1.159},
+    "BI_2_slim": {"intercept": -8.77, "num_nz": 1.058},
+}
+
+
+def predicted_seconds(smsp):
+    # predicted build and solve time of each formulation
+    return {
+        name: math.exp(
+            sum(
+                coef * (1 if term == "intercept" else math.log(max(size[term], 1)))
+                for term, coef in _COST_MODEL[name].items()
+            )
+        )
+        for name, size in formulation_sizes(smsp).items()
+    }
+
+
+def choose_formulation(smsp, backend="gurobi"):
+    # the formulation class, from the given backend ("gurobi", "pulp" or
+    # "matrix"), predicted to be cheapest to build and solve
+    seconds = predicted_seconds(smsp)
+    name = min(seconds, key=seconds.get)
+    package = "ti" if name == "TI" else "bi"
+    return getattr(importlib.import_module(f"smsp_bi.{package}.{backend}"), name)
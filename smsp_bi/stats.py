@@ -0,0 +1,85 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_callbacks = []
+
+
+def add_callback(callback):
+    # callback(stats, record) is called with each record added to the Stats of
+    # any model in this process, eg to send it to a metrics pipeline
+    _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    _callbacks.remove(callback)
+
+
+def _tracing():
+    # tracemalloc.reset_peak is new in python 3.9
+    return tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak")
+
+
+class Stats:
+    # Measurements of a model, as a record (a dict) for each stage of its build
+    # and each call of optimize, in order.  Every record gives the wall time in
+    # seconds and the peak memory in bytes above that at the start.  Stage
+    # records give the rows, columns and nonzeros added to the model, and solve
+    # records the solver's status, runtime, node count and relative gap, None
+    # where the solver does not report them.  Peak memory counts allocations
+    # made by python (numpy arrays included, solver libraries not), and is only
+    # measured while tracemalloc is tracing (eg python -X tracemalloc), as
+    # tracing slows the build.  It is None otherwise.
+    def __init__(self, name):
+        self.name = name
+        self.stages = []
+        self.solves = []
+
+    def _add(self, records, record):
+        records.append(record)
+        for callback in _callbacks:
+            callback(self, record)
+
+    @contextmanager
+    def _measure(self, name):
+        tracing = _tracing()
+        if tracing:
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        record = {"stage": name}
+        start = time.perf_counter()
+        yield record
+        record["seconds"] = time.perf_counter() - start
+        record["peak_memory"] = (
+            tracemalloc.get_traced_memory()[1] - memory if tracing else None
+        )
+
+    @contextmanager
+    def stage(self, name, size):
+        # Records the build stage run in the with block.  size() gives the rows,
+        # columns and nonzeros of the model, and is included in the time as it
+        # may apply pending changes to the model (eg gurobi's update).
+        with self._measure(name) as record:
+            before = size()
+            yield
+            after = size()
+        for key, first, last in zip(("rows", "columns", "nonzeros"), before, after):
+            record[key] = int(last - first)
+        self._add(self.stages, record)
+
+    @contextmanager
+    def solve(self, report):
+        # Records the solve run in the with block, with the dict of the
+        # solver's measurements given by report()
+        with self._measure("optimize") as record:
+            yield
+        record.update(report())
+        self._add(self.solves, record)
+
+    def to_dict(self):
+        return {"name": self.name, "stages": self.stages, "solves": self.solves}
+
+    def to_json(self, **kwargs):
+        # kwargs are passed to json.dumps, eg indent
+        return json.dumps(self.to_dict(), default=lambda value: value.item(), **kwargs)
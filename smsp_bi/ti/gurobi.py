@@ -1,62 +1,279 @@
 import gurobipy as gp
+import numpy as np
 from gurobipy import GRB
 
-from smsp_bi import base
-from smsp_bi.utils import Schedule
+from smsp_bi import base, gurobi_utils
+from smsp_bi.base.indices import TimeIndices
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import matrix
 
 
 class TI(base.TI):
-    def __init__(self, smsp, name="TI"):
+    def __init__(
+        self, smsp, name="TI", preprocess=False, precedences=False, relax=False
+    ):
         self.m = gp.Model(name)
         self.m.setAttr("ModelSense", GRB.MINIMIZE)
-        super().__init__(smsp)
+        super().__init__(smsp, preprocess, precedences, relax)
 
     def _update(self):
         self.m.update()
 
-    def optimize(self):
-        self.m.optimize()
+    def _size(self):
+        return gurobi_utils.size(self.m)
+
+    def optimize(self, callback=None):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize(callback)
+
+    def _solve_stats(self):
+        return gurobi_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.Status == GRB.OPTIMAL
+
+    def set_limits(self, threads=None, time_limit=None):
+        gurobi_utils.set_limits(self.m, threads, time_limit)
+
+    def get_bound(self):
+        return gurobi_utils.get_bound(self.m, self.relax)
+
+    def _set_integrality(self, variables, integer):
+        gurobi_utils.set_integrality(self.m, list(variables.values()), integer)
+
+    def _get_reduced_costs(self, variables):
+        return np.array(self.m.getAttr("RC", list(variables.values())))
+
+    def _fix_to_zero(self, variables, fixed):
+        gurobi_utils.fix_to_zero(self.m, list(variables.values()), fixed)
 
     def _create_x_variables(self):
-        self.x_indices, cost = gp.multidict(
-            {
-                (j, t): self._make_cost(j, t)
-                for j in self.J
-                for t in range(1, self.T - self.p[j] + 2)
-            }
-        )
         self.x_vars = self.m.addVars(
-            self.x_indices, obj=cost, vtype=GRB.BINARY, name="x"
+            self.x_indices,
+            obj=[self._make_cost(j, t) for j, t in self.x_indices],
+            vtype=GRB.BINARY,
+            name="x",
         )
 
+    def _update_costs(self, jobs):
+        x_indices = [ind for j in jobs for ind in self.x_indices.job(j)]
+        self.m.setAttr(
+            "Obj",
+            [self.x_vars[ind] for ind in x_indices],
+            [self._make_cost(j, t) for j, t in x_indices],
+        )
+
+    def _add_precedence_constraints(self, pairs):
+        start = [
+            gp.LinExpr(
+                [t - 1 for _, t in self.x_indices.job(j)],
+                [self.x_vars[ind] for ind in self.x_indices.job(j)],
+            )
+            for j in self.J
+        ]
+        constrs = self.m.addConstrs(start[i] + self.p[i] <= start[j] for i, j in pairs)
+        if self.precedences == "lazy":
+            self.m.setAttr("Lazy", list(constrs.values()), [1] * len(constrs))
+
     def _add_job_completion_constraints(self):
-        self.m.addConstrs(self.x_vars.sum(j, "*") == 1 for j in self.J)
+        self.completion_constrs = self.m.addConstrs(
+            self.x_vars.sum(j, "*") == 1 for j in self.J
+        )
 
     def _add_machine_capacity_constraints(self):
-        self.m.addConstrs(
-            gp.quicksum(
-                self.x_vars[(j, s)]
-                for j in self.J
-                for s in range(max(1, t - self.p[j] + 1), t + 1)
-                if (j, s) in self.x_indices
-            )
-            <= 1
+        self.capacity_constrs = self.m.addConstrs(
+            gp.quicksum(self.x_vars[ind] for ind in self.x_indices.covering(t)) <= 1
             for t in range(1, self.T + 1)
         )
 
-    def _make_start_time(self, job):
-        return int(
-            round(
-                gp.quicksum(
-                    (t - 1) * self.x_vars[(j, t)] for j, t in self.x_indices if j == job
-                ).getValue()
+    def _set_start(self, x_values):
+        self.m.setAttr("Start", list(self.x_vars.values()), x_values.tolist())
+
+    def _set_cutoff(self, value):
+        self.m.setParam("Cutoff", value)
+
+    def _get_values(self, variables):
+        return np.array(self.m.getAttr("X", list(variables.values())))
+
+
+class TI_matrix(matrix.TI):
+    # Builds the TI model as arrays, then adds it to gurobi with the matrix API
+    def __init__(
+        self, smsp, name="TI", preprocess=False, precedences=False, relax=False
+    ):
+        super().__init__(smsp, name, preprocess=preprocess, precedences=precedences)
+        self.matrix = self.m
+        self.m = gp.Model(name)
+        self.m.setAttr("ModelSense", GRB.MINIMIZE)
+        with self.stats.stage("add_matrix_model", lambda: gurobi_utils.size(self.m)):
+            self.x, self.constrs = gurobi_utils.add_matrix_model(self.m, self.matrix)
+        if relax:
+            self.set_relax(True)
+
+    def update_instance(self, due_dates=None, cost=None):
+        # the arrays of self.matrix are updated, as by matrix.TI, and the
+        # changes are then made to the gurobi model
+        self.m, self.matrix = self.matrix, self.m
+        try:
+            super().update_instance(due_dates, cost)
+        finally:
+            self.m, self.matrix = self.matrix, self.m
+        self.x, self.constrs = gurobi_utils.update_matrix_model(
+            self.m, self.matrix, self.x, self.constrs
+        )
+
+    def optimize(self, callback=None):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize(callback)
+
+    def _solve_stats(self):
+        return gurobi_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.Status == GRB.OPTIMAL
+
+    def set_limits(self, threads=None, time_limit=None):
+        gurobi_utils.set_limits(self.m, threads, time_limit)
+
+    def get_bound(self):
+        return gurobi_utils.get_bound(self.m, self.relax)
+
+    def _set_integrality(self, cols, integer):
+        gurobi_utils.set_integrality(self.m, self.x[cols].tolist(), integer)
+
+    def _get_reduced_costs(self, cols):
+        return self.x.RC[cols]
+
+    def _fix_to_zero(self, cols, fixed):
+        gurobi_utils.fix_to_zero(self.m, self.x[cols].tolist(), fixed)
+
+    def _set_start_values(self, cols, values):
+        self.m.setAttr("Start", self.x[cols].tolist(), values.tolist())
+
+    def _set_cutoff(self, value):
+        self.m.setParam("Cutoff", value)
+
+    def _get_values(self, cols):
+        return self.x.X[cols]
+
+
+class TI_colgen(TI):
+    # The LP relaxation of the TI model solved by column generation.  The
+    # restricted master problem starts from the x variables within window
+    # periods of the start times of the heuristic schedule, and optimize adds,
+    # for each job, the columns_per_job x variables of most negative reduced
+    # cost, priced over all (j, t) at once, until none is negative.  The full
+    # model is never built, so get_bound gives the TI bound on horizons where
+    # it could not be.  Raises NotImplementedError if smsp has deadlines, as
+    # the heuristic schedule may miss them.
+    def __init__(self, smsp, name="TI_colgen", window=0, columns_per_job=10):
+        if smsp._deadlines is not None:
+            raise NotImplementedError("TI_colgen does not support deadlines")
+        self.window = window
+        self.columns_per_job = columns_per_job
+        self.iterations = 0
+        self.lower_bound = -np.inf
+        super().__init__(smsp, name, relax=True)
+
+    def _setup(self):
+        self.T = self.smsp.horizon()
+        self.J = range(len(self.p))
+        self.first, self.last = self._x_ranges()
+        sequence = heuristic_sequence(self.smsp)[0]
+        start_times = self.smsp.get_schedule_from_sequence(sequence).start_times
+        periods = np.clip(
+            start_times[:, None] + 1 + np.arange(-self.window, self.window + 1),
+            self.first[:, None],
+            self.last[:, None],
+        )
+        jobs = np.broadcast_to(np.arange(len(self.p))[:, None], periods.shape)
+        self.x_indices = self._time_indices(jobs.ravel(), periods.ravel())
+
+    def _time_indices(self, jobs, periods):
+        # TimeIndices for the (j, t) pairs given, in any order and with repeats
+        jobs, periods = np.unique(np.column_stack((jobs, periods)), axis=0).T
+        return TimeIndices(jobs, periods, self.p[jobs], len(self.p), self.T)
+
+    def reduced_costs(self):
+        # The reduced cost of every x[j, t] of the full TI model, from the duals
+        # of the restricted master problem, as an (n, T) array (periods from 1)
+        # with inf where x[j, t] does not exist
+        alpha = np.array(
+            self.m.getAttr("Pi", [self.completion_constrs[j] for j in self.J])
+        )
+        beta = np.array(
+            self.m.getAttr(
+                "Pi", [self.capacity_constrs[t] for t in range(1, self.T + 1)]
             )
         )
+        covered = np.concatenate(([0], np.cumsum(beta)))
+        t = np.arange(1, self.T + 1)
+        end = np.minimum(t + self.p[:, None] - 1, self.T)
+        cost = self.c[:, None] * np.maximum(0, t - 1 - self.d[:, None])
+        rc = cost - alpha[:, None] - (covered[end] - covered[t - 1])
+        exists = (t >= self.first[:, None]) & (t <= self.last[:, None])
+        return np.where(exists, rc, np.inf)
 
-    def get_schedule(self):
-        start_times = [self._make_start_time(j) for j in self.J]
+    def _add_columns(self, jobs, periods):
+        vtype = GRB.CONTINUOUS if self.relax else GRB.BINARY
+        x_vars = dict(self.x_vars)
+        for j, t in zip(jobs.tolist(), periods.tolist()):
+            covered = range(t, t + self.p[j])
+            x_vars[j, t] = self.m.addVar(
+                obj=self._make_cost(j, t),
+                ub=1,
+                vtype=vtype,
+                name=f"x[{j},{t}]",
+                column=gp.Column(
+                    [1] * (len(covered) + 1),
+                    [self.completion_constrs[j]]
+                    + [self.capacity_constrs[s] for s in covered],
+                ),
+            )
+        x = self.x_indices
+        self.x_indices = self._time_indices(
+            np.concatenate((x.j, jobs)), np.concatenate((x.t, periods))
+        )
+        self.x_vars = gp.tupledict((ind, x_vars[ind]) for ind in self.x_indices)
+        self._update()
 
-        return Schedule(
-            start_times=start_times,
-            end_times=[s + p for s, p in zip(start_times, self.p)],
+    def _price(self):
+        # adds the columns of negative reduced cost, returning how many
+        rc = self.reduced_costs()
+        rc[self.x_indices.j, self.x_indices.t - 1] = np.inf
+        # each job starts once, so this Lagrangian bound holds at every iteration
+        self.lower_bound = max(
+            self.lower_bound,
+            self.m.ObjVal + np.minimum(rc.min(axis=1), 0).sum(),
         )
+        k = min(self.columns_per_job, self.T)
+        periods = np.argpartition(rc, k - 1, axis=1)[:, :k]
+        jobs = np.broadcast_to(np.arange(len(self.p))[:, None], periods.shape)
+        negative = rc[jobs, periods] < -1e-6
+        self._add_columns(jobs[negative], periods[negative] + 1)
+        return int(negative.sum())
+
+    def optimize(self, callback=None):
+        # Column generation while relaxed, otherwise the MIP over the columns
+        # generated so far, which gives a schedule but proves optimality only
+        # after add_columns_by_reduced_cost
+        if not self.relax:
+            return super().optimize(callback)
+        while True:
+            super().optimize(callback)
+            self.iterations += 1
+            if not self.is_optimal() or self._price() == 0:
+                break
+
+    def add_columns_by_reduced_cost(self, upper_bound):
+        # After optimize has solved the LP relaxation, adds every x[j, t] which
+        # could be one in a schedule with objective at most upper_bound, so that
+        # the MIP over the columns (after set_relax(False)) is exact.  Returns
+        # the number of columns added.
+        if not (self.relax and self.is_optimal()):
+            raise ValueError("adding columns needs the solved LP relaxation")
+        rc = self.reduced_costs()
+        rc[self.x_indices.j, self.x_indices.t - 1] = np.inf
+        jobs, periods = np.nonzero(self.m.ObjVal + rc <= upper_bound + 1e-6)
+        self._add_columns(jobs, periods + 1)
+        return len(jobs)
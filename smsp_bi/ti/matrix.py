@@ -0,0 +1,124 @@
+import numpy as np
+
+from smsp_bi import base
+from smsp_bi.matrix_model import MatrixModel
+
+
+class TI(base.TI):
+    periods_per_block = 1000
+
+    def __init__(
+        self,
+        smsp,
+        name="TI",
+        model=None,
+        preprocess=False,
+        precedences=False,
+        relax=False,
+    ):
+        self.m = MatrixModel(name) if model is None else model
+        super().__init__(smsp, preprocess, precedences, relax)
+
+    def _update(self):
+        self.m.update()
+
+    def _size(self):
+        return self.m.num_constrs, self.m.num_vars, self.m.num_nz
+
+    def optimize(self):
+        with self.stats.solve(self._solve_stats):
+            self.m.optimize()
+
+    def _solve_stats(self):
+        return {
+            "status": self.m.status,
+            "solver_seconds": self.m.runtime,
+            "nodes": self.m.nodes,
+            "gap": self.m.gap,
+        }
+
+    def is_optimal(self):
+        return self.m.status == 0
+
+    def set_limits(self, threads=None, time_limit=None):
+        # scipy's milp is single threaded
+        self.m.time_limit = time_limit
+
+    def get_bound(self):
+        return self.m.obj_bound
+
+    def _set_integrality(self, cols, integer):
+        self.m.set_vtype(cols, "B" if integer else "C")
+
+    def _get_reduced_costs(self, cols):
+        return self.m.reduced_costs[cols]
+
+    def _fix_to_zero(self, cols, fixed):
+        self.m.set_ub(cols[fixed], 0)
+
+    def _set_start(self, x_values):
+        self._set_start_values(self.x_vars, x_values)
+
+    def _set_start_values(self, cols, values):
+        self.m.set_start(cols, values)
+
+    def _set_cutoff(self, value):
+        self.m.cutoff = value
+
+    def _get_values(self, cols):
+        return self.m.x[cols]
+
+    def _make_costs(self):
+        x = self.x_indices
+        return self.c[x.j] * np.maximum(0, x.t - 1 - self.d[x.j])
+
+    def _update_costs(self, jobs):
+        cols = np.nonzero(np.isin(self.x_indices.j, jobs))[0]
+        self.m.set_obj(self.x_vars[cols], self._make_costs()[cols])
+
+    def _create_x_variables(self):
+        self.x_vars = self.m.add_vars(
+            len(self.x_indices), obj=self._make_costs(), ub=1, vtype="B", name="x"
+        )
+
+    def _add_job_completion_constraints(self):
+        self.m.add_constrs(
+            rows=self.x_indices.j,
+            cols=self.x_vars,
+            vals=1,
+            sense="=",
+            rhs=np.ones(len(self.J)),
+        )
+
+    def _add_precedence_constraints(self, pairs):
+        # lazy constraints are not supported, so are added as constraints
+        x = self.x_indices
+        start = [
+            (self.x_vars[part], x.t[part] - 1)
+            for part in (slice(x.job_ptr[j], x.job_ptr[j + 1]) for j in self.J)
+        ]
+        pairs = list(pairs)
+        self.m.add_constrs_from_rows(
+            [
+                (
+                    np.concatenate((start[i][0], start[j][0])),
+                    np.concatenate((start[i][1], -start[j][1])),
+                )
+                for i, j in pairs
+            ],
+            sense="<",
+            rhs=[-self.p[i] for i, _ in pairs],
+        )
+
+    def _add_machine_capacity_constraints(self):
+        # added in blocks of periods to bound the size of each block
+        for first in range(1, self.T + 1, self.periods_per_block):
+            last = min(first + self.periods_per_block - 1, self.T)
+            periods, cols = self.x_indices.covering_entries(first, last)
+            self.m.add_constrs(
+                rows=periods - first,
+                cols=self.x_vars[cols],
+                vals=1,
+                sense="<",
+                rhs=np.ones(last - first + 1),
+            )
@@ -1,24 +1,59 @@
+import numpy as np
 import pulp
 
-from smsp_bi import base
-from smsp_bi.utils import Schedule
+from smsp_bi import base, pulp_utils
 
 
 class TI(base.TI):
-    def __init__(self, smsp, name="TI"):
+    _cbc_options = ()
+
+    def __init__(
+        self, smsp, name="TI", preprocess=False, precedences=False, relax=False
+    ):
         self.m = pulp.LpProblem(name, pulp.LpMinimize)
-        super().__init__(smsp)
+        self.warm_start = False
+        self.cutoff = None
+        self.threads = None
+        self.time_limit = None
+        self.x_vars = {}
+        super().__init__(smsp, preprocess, precedences, relax)
 
     def _update(self):
         pass
 
+    def _size(self):
+        return pulp_utils.size(self.m, len(self.x_vars))
+
     def optimize(self):
-        self.m.solve()
+        with self.stats.solve(self._solve_stats):
+            self.m.solve(pulp_utils.solver(self))
+
+    def _solve_stats(self):
+        return pulp_utils.solve_stats(self.m)
+
+    def is_optimal(self):
+        return self.m.sol_status == pulp.LpSolutionOptimal
+
+    def set_limits(self, threads=None, time_limit=None):
+        self.threads = threads
+        self.time_limit = time_limit
+
+    def get_bound(self):
+        # CBC's bound on an unfinished MIP is not reported by pulp
+        if self.relax or self.is_optimal():
+            return pulp.value(self.m.objective)
+        return None
+
+    def _set_integrality(self, variables, integer):
+        pulp_utils.set_integrality(variables, integer)
+
+    def _get_reduced_costs(self, variables):
+        return np.array([var.dj for var in variables.values()], dtype=float)
+
+    def _fix_to_zero(self, variables, fixed):
+        pulp_utils.fix_to_zero(variables, fixed)
 
     def _create_x_variables(self):
-        self.x_indices = [
-            (j, t) for j in self.J for t in range(1, self.T - self.p[j] + 2)
-        ]
         self.x_vars = pulp.LpVariable.dicts(
             "x", self.x_indices, lowBound=0, upBound=1, cat=pulp.LpInteger
         )
@@ -26,44 +61,44 @@ class TI(base.TI):
             [self._make_cost(*ind) * self.x_vars[ind] for ind in self.x_indices]
         )
 
+    def _update_costs(self, jobs):
+        for j in jobs:
+            for ind in self.x_indices.job(j):
+                self.m.objective[self.x_vars[ind]] = self._make_cost(*ind)
+
+    def _add_precedence_constraints(self, pairs):
+        # lazy constraints are not supported, so are added as constraints
+        start = [
+            pulp.lpSum((t - 1) * self.x_vars[(j, t)] for j, t in self.x_indices.job(j))
+            for j in self.J
+        ]
+        for i, j in pairs:
+            self.m += (
+                start[i] + self.p[i] <= start[j],
+                f"Precedence Constraint[{i},{j}]",
+            )
+
     def _add_job_completion_constraints(self):
         for job in self.J:
             self.m += (
-                pulp.lpSum(self.x_vars[(j, t)] for j, t in self.x_indices if j == job)
-                == 1,
+                pulp.lpSum(self.x_vars[ind] for ind in self.x_indices.job(job)) == 1,
                 f"Completion Constraint[{job}]",
             )
 
     def _add_machine_capacity_constraints(self):
         for t in range(1, self.T + 1):
             self.m += (
-                pulp.lpSum(
-                    self.x_vars[(j, s)]
-                    for j in self.J
-                    for s in range(max(1, t - self.p[j] + 1), t + 1)
-                    if (j, s) in self.x_indices
-                )
-                <= 1,
+                pulp.lpSum(self.x_vars[ind] for ind in self.x_indices.covering(t)) <= 1,
                 f"Cardinality Constraint[{t}]",
             )
 
-    def _make_start_time(self, job):
-        return int(
-            round(
-                sum(
-                    [
-                        (t - 1) * self.x_vars[(j, t)].value()
-                        for j, t in self.x_indices
-                        if j == job
-                    ]
-                )
-            )
-        )
+    def _set_start(self, x_values):
+        for var, value in zip(self.x_vars.values(), x_values.tolist()):
+            var.setInitialValue(value)
+        self.warm_start = True
 
-    def get_schedule(self):
-        start_times = [self._make_start_time(j) for j in self.J]
+    def _set_cutoff(self, value):
+        self.cutoff = value
 
-        return Schedule(
-            start_times=start_times,
-            end_times=[s + p for s, p in zip(start_times, self.p)],
-        )
+    def _get_values(self, variables):
+        return np.array([v.varValue for v in variables.values()], dtype=float)
@@ -17,26 +17,102 @@ class Schedule:
 
 
 class SMSP:
-    def __init__(self, processing_times, due_dates=None, cost=None):
-
+    def __init__(
+        self,
+        processing_times,
+        due_dates=None,
+        cost=None,
+        release_dates=None,
+        deadlines=None,
+    ):
+        # jobs may not start before their release dates, which default to 0,
+        # and must complete by their deadlines, if given
         if due_dates is None:
             due_dates = [0] * len(processing_times)
         if cost is None:
             cost = [1] * len(processing_times)
+        if release_dates is None:
+            release_dates = [0] * len(processing_times)
 
         self._processing_times = np.array(processing_times)
         self._due_dates = np.array(due_dates)
         self._cost = np.array(cost)
+        self._release_dates = np.array(release_dates)
+        self._deadlines = None if deadlines is None else np.array(deadlines)
+
+    def has_time_windows(self):
+        return bool(self._release_dates.any()) or self._deadlines is not None
+
+    def has_integer_objective(self):
+        # whether the objective of every schedule is an integer, as it is if
+        # the processing times, due dates and costs are
+        return all(
+            np.array_equal(values, np.round(values))
+            for values in (self._processing_times, self._due_dates, self._cost)
+        )
+
+    def horizon(self):
+        # the time by which some optimal schedule completes, as a schedule
+        # idling only until release dates completes by the last release date
+        # plus the sum of processing times
+        horizon = self._release_dates.max(initial=0) + self._processing_times.sum()
+        if self._deadlines is not None:
+            horizon = min(horizon, self._deadlines.max(initial=0))
+        return horizon
+
+    def time_windows(self):
+        # the earliest and latest start time of each job
+        latest = self.horizon() - self._processing_times
+        if self._deadlines is not None:
+            latest = np.minimum(latest, self._deadlines - self._processing_times)
+        return self._release_dates, latest
+
+    def _end_times(self, sequences):
+        # the end time of the job at each position of each row of sequences,
+        # started as early as possible.  Each end is the sum of processing
+        # times so far plus the idle time, which grows where a job is released
+        # after that sum.
+        p = self._processing_times[sequences]
+        end_times = np.cumsum(p, axis=-1)
+        idle = np.maximum.accumulate(
+            self._release_dates[sequences] - (end_times - p), axis=-1
+        )
+        return end_times + np.maximum(idle, 0)
+
+    def within_time_windows(self, schedule):
+        # whether schedule starts no job before its release date and completes
+        # every job by its deadline
+        released = (schedule.start_times >= self._release_dates).all()
+        if self._deadlines is None:
+            return bool(released)
+        return bool(released and (schedule.end_times <= self._deadlines).all())
 
     def get_schedule_from_sequence(self, sequence):
-        start_times = np.cumsum([p[j] for j in sequence])[np.argsort(sequence)]
-        end_times = start_times + self._processing_times
+        sequence = np.asarray(sequence)
+        end_times = self._end_times(sequence)[np.argsort(sequence)]
+        start_times = end_times - self._processing_times
         return Schedule(start_times, end_times)
 
     def get_objective_from_schedule(self, schedule):
         due_delta = schedule.start_times - self._due_dates
         return np.where(due_delta > 0, due_delta, 0) @ self._cost
 
+    def evaluate_sequences(self, sequences):
+        # the objective of each row of sequences, a 2D array of jobs
+        sequences = np.atleast_2d(sequences)
+        p = self._processing_times[sequences]
+        due_delta = self._end_times(sequences) - p - self._due_dates[sequences]
+        return (np.maximum(due_delta, 0) * self._cost[sequences]).sum(axis=1)
+
+    def _deadline_excess(self, sequences):
+        # the total time by which the jobs of each row of sequences complete
+        # after their deadlines
+        sequences = np.atleast_2d(sequences)
+        if self._deadlines is None:
+            return np.zeros(len(sequences))
+        excess = self._end_times(sequences) - self._deadlines[sequences]
+        return np.maximum(excess, 0).sum(axis=1)
+
     def get_objective_from_sequence(self, sequence):
         return self.get_objective_from_schedule(
             self.get_schedule_from_sequence(sequence)
@@ -47,12 +123,18 @@ class SMSP:
         print(f"Processing times: {list(self._processing_times)}")
         print(f"Due dates: {list(self._due_dates)}")
         print(f"Tardy Cost: {list(self._cost)}")
+        if self.has_time_windows():
+            print(f"Release dates: {list(self._release_dates)}")
+            if self._deadlines is not None:
+                print(f"Deadlines: {list(self._deadlines)}")
 
     def copy(self):
         return SMSP(
             self._processing_times,
             self._due_dates,
-            self._processing_times,
+            self._cost,
+            self._release_dates,
+            self._deadlines,
         )
 
 
@@ -0,0 +1,315 @@
+import os
+import shutil
+import tempfile
+from abc import abstractmethod
+
+import numpy as np
+import scipy.sparse as sp
+
+from smsp_bi.matrix_model import ModelBuilder
+
+_LP_SENSES = {"<": "<=", "=": "=", ">": ">="}
+_MPS_SENSES = {"<": "L", "=": "E", ">": "G"}
+
+
+def _names(blocks, default, indices):
+    # names of columns (or rows) given by index, using the block names where
+    # available, eg z12 for the 13th column in the block named "z"
+    names = np.array([f"{default}{i}" for i in indices.tolist()], dtype=object)
+    for block, members in blocks.items():
+        if len(members) == 0:
+            continue
+        inside = (indices >= members[0]) & (indices <= members[-1])
+        names[inside] = [f"{block}{i - members[0]}" for i in indices[inside].tolist()]
+    return names
+
+
+def _format_terms(vals, names):
+    return " ".join(f"{v:+.17g} {name}" for v, name in zip(vals.tolist(), names))
+
+
+def _write_lp_rows(f, A, sense, rhs, row_names, col_blocks, max_nz=50000):
+    # A holds the rows to write, in CSR format.  Rows are formatted in slices of
+    # about max_nz nonzeros to bound the memory used by the text.  LP format
+    # does not allow empty rows, so they are given the first column with a
+    # zero coefficient.
+    empty = f"0 {_names(col_blocks, 'x', np.zeros(1, dtype=int))[0]}"
+    first = 0
+    while first < A.shape[0]:
+        last = max(np.searchsorted(A.indptr, A.indptr[first] + max_nz), first + 1)
+        last = min(last, A.shape[0])
+        offset = A.indptr[first]
+        col_names = _names(col_blocks, "x", A.indices[offset : A.indptr[last]])
+        lines = []
+        for i in range(first, last):
+            start, stop = A.indptr[i] - offset, A.indptr[i + 1] - offset
+            terms = _format_terms(
+                A.data[start + offset : stop + offset], col_names[start:stop]
+            )
+            constraint = f"{_LP_SENSES[sense[i]]} {rhs[i]:.17g}"
+            lines.append(f" {row_names[i]}: {terms or empty} {constraint}")
+        f.write("\n".join(lines) + "\n")
+        first = last
+
+
+def _write_lp_objective(f, model):
+    cols = np.nonzero(model.obj)[0]
+    f.write(f"\\ {model.name}\nMinimize\n obj:")
+    for start in range(0, len(cols), 10):
+        chunk = cols[start : start + 10]
+        f.write(
+            " " + _format_terms(model.obj[chunk], _names(model.var_blocks, "x", chunk))
+        )
+        f.write("\n")
+    f.write("\nSubject To\n")
+
+
+def _write_lp_bounds_and_types(f, model):
+    f.write("Bounds\n")
+    continuous = model.vtype != "B"
+    free = continuous & np.isneginf(model.lb) & np.isposinf(model.ub)
+    bounded = continuous & ~free & ((model.lb != 0) | ~np.isposinf(model.ub))
+    for col, name in zip(
+        np.nonzero(free)[0], _names(model.var_blocks, "x", np.nonzero(free)[0])
+    ):
+        f.write(f" {name} free\n")
+    cols = np.nonzero(bounded)[0]
+    for lb, ub, name in zip(
+        model.lb[cols], model.ub[cols], _names(model.var_blocks, "x", cols)
+    ):
+        f.write(f" {lb:.17g} <= {name} <= {ub:.17g}\n".replace("inf", "Inf"))
+    for vtype, section in (("B", "Binaries"), ("I", "Generals")):
+        cols = np.nonzero(model.vtype == vtype)[0]
+        if len(cols):
+            f.write(f"{section}\n")
+            names = _names(model.var_blocks, "x", cols)
+            for start in range(0, len(cols), 10):
+                f.write(" " + " ".join(names[start : start + 10]) + "\n")
+    f.write("End\n")
+
+
+def write_lp(model, f, chunk_size=10000):
+    # Writes a MatrixModel in (CPLEX) LP format, chunk_size rows at a time
+    model.update()
+    _write_lp_objective(f, model)
+    for start in range(0, model.num_constrs, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, model.num_constrs))
+        _write_lp_rows(
+            f,
+            model.A[rows[0] : rows[-1] + 1],
+            model.sense[rows],
+            model.rhs[rows],
+            _names(model.constr_blocks, "R", rows),
+            model.var_blocks,
+        )
+    _write_lp_bounds_and_types(f, model)
+
+
+class _ColumnSpool:
+    # Spools the entries of a constraint matrix to a temporary file for each
+    # chunk of chunk_size columns, so that the matrix can be written column
+    # by column, as MPS requires, holding only one chunk in memory
+    _dtype = np.dtype([("col", np.int64), ("row", np.int64), ("val", np.float64)])
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self._dir = tempfile.TemporaryDirectory()
+
+    def _path(self, chunk):
+        return os.path.join(self._dir.name, f"{chunk}.bin")
+
+    def add(self, rows, cols, vals):
+        entries = np.empty(len(cols), dtype=self._dtype)
+        entries["col"], entries["row"], entries["val"] = cols, rows, vals
+        chunks = entries["col"] // self.chunk_size
+        order = np.argsort(chunks, kind="stable")
+        entries, chunks = entries[order], chunks[order]
+        for part in np.split(entries, np.flatnonzero(np.diff(chunks)) + 1):
+            if len(part):
+                with open(self._path(part["col"][0] // self.chunk_size), "ab") as f:
+                    part.tofile(f)
+
+    def chunk(self, chunk):
+        # the entries of the columns in chunk, ordered by column and row
+        path = self._path(chunk)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self._dtype)
+        entries = np.fromfile(path, dtype=self._dtype)
+        return entries[np.lexsort((entries["row"], entries["col"]))]
+
+    def close(self):
+        self._dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield np.arange(start, min(start + chunk_size, n))
+
+
+def _write_mps_columns(f, model, spool):
+    integer = False
+    for chunk, cols in enumerate(_chunks(model.num_vars, spool.chunk_size)):
+        entries = spool.chunk(chunk)
+        row_names = _names(model.constr_blocks, "R", entries["row"])
+        ptr = np.searchsorted(entries["col"], np.append(cols, cols[-1] + 1))
+        vals = entries["val"].tolist()
+        lines = []
+        for i, (col, name) in enumerate(zip(cols, _names(model.var_blocks, "x", cols))):
+            if (model.vtype[col] != "C") != integer:
+                integer = not integer
+                marker = "INTORG" if integer else "INTEND"
+                lines.append(f" MARKER 'MARKER' '{marker}'")
+            if model.obj[col]:
+                lines.append(f" {name} obj {model.obj[col]:.17g}")
+            lines.extend(
+                f" {name} {row_names[k]} {vals[k]:.17g}"
+                for k in range(ptr[i], ptr[i + 1])
+            )
+        f.write("\n".join(lines) + "\n")
+    if integer:
+        f.write(" MARKER 'MARKER' 'INTEND'\n")
+
+
+def _write_mps(f, model, spool):
+    # writes model, whose constraint coefficients are in spool, in free MPS
+    # format, chunk by chunk of rows and columns
+    f.write(f"NAME {model.name}\nROWS\n N obj\n")
+    for rows in _chunks(model.num_constrs, spool.chunk_size):
+        for row, name in zip(rows, _names(model.constr_blocks, "R", rows)):
+            f.write(f" {_MPS_SENSES[model.sense[row]]} {name}\n")
+
+    f.write("COLUMNS\n")
+    _write_mps_columns(f, model, spool)
+
+    f.write("RHS\n")
+    nonzero = np.nonzero(model.rhs)[0]
+    for start in range(0, len(nonzero), spool.chunk_size):
+        rows = nonzero[start : start + spool.chunk_size]
+        for row, name in zip(rows, _names(model.constr_blocks, "R", rows)):
+            f.write(f" rhs {name} {model.rhs[row]:.17g}\n")
+
+    f.write("BOUNDS\n")
+    for cols in _chunks(model.num_vars, spool.chunk_size):
+        for col, name in zip(cols, _names(model.var_blocks, "x", cols)):
+            lb, ub = model.lb[col], model.ub[col]
+            if model.vtype[col] == "B":
+                f.write(f" BV bnd {name}\n")
+            elif np.isneginf(lb) and np.isposinf(ub):
+                f.write(f" FR bnd {name}\n")
+            else:
+                if np.isneginf(lb):
+                    f.write(f" MI bnd {name}\n")
+                elif lb != 0:
+                    f.write(f" LO bnd {name} {lb:.17g}\n")
+                if not np.isposinf(ub):
+                    f.write(f" UP bnd {name} {ub:.17g}\n")
+                elif model.vtype[col] == "I":
+                    f.write(f" PL bnd {name}\n")
+    f.write("ENDATA\n")
+
+
+def write_mps(model, f, chunk_size=10000):
+    # Writes a MatrixModel in free MPS format, chunk_size columns at a time.
+    # The entries of A are spooled by chunk of columns, chunk_size rows at a
+    # time, rather than converting A to CSC, so that only A and one chunk are
+    # held in memory.
+    model.update()
+    with _ColumnSpool(chunk_size) as spool:
+        for rows in _chunks(model.num_constrs, chunk_size):
+            A = model.A[rows[0] : rows[-1] + 1].tocoo()
+            spool.add(A.row + rows[0], A.col, A.data)
+        _write_mps(f, model, spool)
+
+
+class _Writer(ModelBuilder):
+    # A ModelBuilder which writes the model to f when closed.  Use as
+    #
+    #   with LPWriter(f, "TI") as m:
+    #       smsp_bi.ti.matrix.TI(smsp, model=m)
+    def __init__(self, f, name):
+        self.f = f
+        super().__init__(name)
+
+    @abstractmethod
+    def _write(self):
+        pass
+
+    @abstractmethod
+    def _discard(self):
+        # removes any temporary files
+        pass
+
+    def close(self):
+        self.update()
+        try:
+            self._write()
+        finally:
+            self._discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+class LPWriter(_Writer):
+    # Writes each block of constraints to file, in LP format, as it is added
+    # rather than holding the constraint matrix in memory.  As the objective
+    # must come first in LP format the constraints are spooled to a temporary
+    # file and copied into place by close().
+    def __init__(self, f, name):
+        self._constrs = tempfile.TemporaryFile("w+")
+        super().__init__(f, name)
+
+    def _add_block(self, first, rows, cols, vals):
+        sense, rhs = self._constr_parts[-1]
+        block = np.arange(first, self.num_constrs)
+        A = sp.csr_matrix(
+            (vals, (rows - first, cols)), shape=(len(block), self.num_vars)
+        )
+        _write_lp_rows(
+            self._constrs,
+            A,
+            sense,
+            rhs,
+            _names(self.constr_blocks, "R", block),
+            self.var_blocks,
+        )
+
+    def _write(self):
+        _write_lp_objective(self.f, self)
+        self._constrs.seek(0)
+        shutil.copyfileobj(self._constrs, self.f)
+        _write_lp_bounds_and_types(self.f, self)
+
+    def _discard(self):
+        self._constrs.close()
+
+
+class MPSWriter(_Writer):
+    # Spools the coefficients of each block of constraints to temporary files
+    # by chunk of chunk_size columns as it is added, rather than holding the
+    # constraint matrix in memory, and writes the model in free MPS format,
+    # one chunk of columns at a time, when closed.
+    def __init__(self, f, name, chunk_size=10000):
+        self._spool = _ColumnSpool(chunk_size)
+        super().__init__(f, name)
+
+    def _add_block(self, first, rows, cols, vals):
+        self._spool.add(rows, cols, vals)
+
+    def _write(self):
+        _write_mps(self.f, self, self._spool)
+
+    def _discard(self):
+        self._spool.close()
@@ -0,0 +1,15 @@
+import itertools
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def brute_force():
+    # the optimal objective of a small SMSP, from every sequence of its jobs
+    def optimal_objective(smsp):
+        jobs = range(len(smsp._processing_times))
+        sequences = np.array(list(itertools.permutations(jobs)))
+        return smsp.evaluate_sequences(sequences).min()
+
+    return optimal_objective
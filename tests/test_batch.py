@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from smsp_bi.batch import solve_many
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+class _Failing(ti_matrix.TI):
+    # fails on instances of three jobs, and kills its process on those of two
+    def __init__(self, smsp):
+        n = len(smsp._processing_times)
+        if n == 2:
+            os._exit(1)
+        if n == 3:
+            raise ValueError("can not build")
+        super().__init__(smsp)
+
+
+def test_solve_many(brute_force):
+    problems = _random_problems(6)
+    results = sorted(
+        solve_many(problems, ti_matrix.TI, workers=2), key=lambda r: r.index
+    )
+    assert [result.index for result in results] == list(range(6))
+    for smsp, result in zip(problems, results):
+        assert result.error is None
+        assert result.optimal
+        result.schedule.validate()
+        assert result.objective == pytest.approx(brute_force(smsp))
+        assert result.stats["solves"]
+
+
+def test_solve_many_failures(brute_force):
+    problems = _random_problems(2) + [
+        SMSP([2, 3, 4]),
+        SMSP([2, 3]),
+        _random_problems(1, seed=1)[0],
+    ]
+    results = {r.index: r for r in solve_many(problems, _Failing, workers=2)}
+    assert sorted(results) == list(range(5))
+    assert results[2].error == "ValueError('can not build')"
+    assert results[3].error.startswith("BrokenProcessPool")
+    for index in (0, 1, 4):
+        assert results[index].objective == pytest.approx(brute_force(problems[index]))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bnb import BranchAndBound
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+
+def _problems(count, n=6, seed=0):
+    # random instances, with integer and fractional costs
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+@pytest.mark.parametrize("smsp", _problems(6))
+@pytest.mark.parametrize(
+    "formulation", [bi_matrix.BI_2, bi_matrix.BI_2_slim, ti_matrix.TI]
+)
+def test_optimal(formulation, smsp, brute_force):
+    model = BranchAndBound(smsp, formulation)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    objective = smsp.get_objective_from_schedule(schedule)
+    assert objective == pytest.approx(brute_force(smsp))
+    assert model.get_bound() == pytest.approx(objective)
+
+
+def test_more_than_64_jobs():
+    # bitmasks of jobs 64 and over, with unit jobs which are never late
+    p = [1] * 62 + [7, 2, 3, 3]
+    d = [132] * 62 + [2, 9, 10, 6]
+    c = [1] * 62 + [1, 1, 2, 3]
+    smsp = SMSP(p, d, c)
+    model = BranchAndBound(smsp)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    other = ti_matrix.TI(smsp)
+    other.optimize()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        smsp.get_objective_from_schedule(other.get_schedule())
+    )
+
+
+def test_time_limit():
+    # the limit is reached solving the root LP, leaving the heuristic schedule
+    smsp = _problems(1)[0]
+    model = BranchAndBound(smsp)
+    model.set_limits(time_limit=1e-9)
+    model.optimize()
+    assert not model.is_optimal()
+    assert model.get_bound() is None
+    model.get_schedule().validate()
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([2, 3, 4], [2, 3, 4], release_dates=[0, 5, 0]),
+        SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9]),
+    ],
+)
+def test_time_windows(smsp):
+    with pytest.raises(NotImplementedError, match="does not support release dates"):
+        BranchAndBound(smsp)
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+def _bucket_lengths(smsp, longest, seed=0):
+    # random lengths of at most longest, covering the horizon
+    rng = np.random.default_rng(seed)
+    lengths = []
+    while sum(lengths) <= smsp.horizon():
+        lengths.append(int(rng.integers(1, longest + 1)))
+    return lengths
+
+
+# including instances whose BI_3 optimum CBC's preprocessing cut off
+PROBLEMS = _random_problems(4) + [
+    SMSP([6, 5, 4, 2, 3], [0, 1, 0, 3, 16], [4, 5, 3, 4, 5]),
+    SMSP([1, 6, 6, 3, 6], [17, 3, 3, 13, 9], [1, 5, 2, 1, 3]),
+]
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", [bi_gurobi.BI_3, bi_pulp.BI_3])
+def test_bi_3(formulation, smsp, brute_force):
+    p = np.sort(smsp._processing_times)
+    for bucket_lengths in [None, _bucket_lengths(smsp, p[0] + p[1])]:
+        model = formulation(smsp, bucket_lengths=bucket_lengths)
+        model.optimize()
+        assert model.is_optimal()
+        schedule = model.get_schedule()
+        schedule.validate()
+        assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+            brute_force(smsp)
+        )
+
+
+@pytest.mark.parametrize("formulation", [bi_gurobi.BI_3, bi_pulp.BI_3])
+def test_bi_3_long_bucket(formulation):
+    # jobs 0 and 1 can both start and complete in the first bucket
+    smsp = SMSP([2, 3, 4], [3, 5, 9], [1, 1, 1])
+    with pytest.raises(ValueError, match="bucket 1 is too long"):
+        formulation(smsp, bucket_lengths=[6, 4])
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", [bi_gurobi.BI_2_V, bi_pulp.BI_2_V])
+def test_bi_2_v(formulation, smsp, brute_force):
+    p = smsp._processing_times
+    for bucket_lengths in [None, _bucket_lengths(smsp, p.min())]:
+        model = formulation(smsp, bucket_lengths=bucket_lengths)
+        model.optimize()
+        assert model.is_optimal()
+        schedule = model.get_schedule()
+        schedule.validate()
+        assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+            brute_force(smsp)
+        )
+
+
+@pytest.mark.parametrize("formulation", [bi_gurobi.BI_2_V, bi_pulp.BI_2_V])
+def test_bi_2_v_long_bucket(formulation):
+    # job 0 can start and complete in the second bucket
+    smsp = SMSP([2, 3, 4], [3, 5, 9], [1, 1, 1])
+    with pytest.raises(ValueError, match="bucket 2 is too long"):
+        formulation(smsp, bucket_lengths=[2, 3, 2, 3])
+    with pytest.raises(ValueError, match="buckets must cover the planning horizon"):
+        formulation(smsp, bucket_lengths=[2, 2])
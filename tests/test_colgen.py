@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=6, seed=0, release=False):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        release_dates = rng.integers(0, 10, n) if release else None
+        problems.append(SMSP(p, d, c, release_dates=release_dates))
+    return problems
+
+
+PROBLEMS = _random_problems(4) + _random_problems(2, seed=1, release=True)
+
+
+def _colgen(smsp, **kwargs):
+    model = ti_gurobi.TI_colgen(smsp, **kwargs)
+    model.m.setParam("OutputFlag", 0)
+    return model
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("window, columns_per_job", [(0, 1), (0, 10), (2, 3)])
+def test_bound(window, columns_per_job, smsp):
+    # column generation reaches the bound of the full TI LP relaxation
+    model = _colgen(smsp, window=window, columns_per_job=columns_per_job)
+    model.optimize()
+    assert model.is_optimal()
+    full = ti_gurobi.TI(smsp, relax=True)
+    full.m.setParam("OutputFlag", 0)
+    full.optimize()
+    assert model.get_bound() == pytest.approx(full.get_bound())
+    assert model.lower_bound <= model.get_bound() + 1e-6
+    assert len(model.x_indices) <= len(full.x_indices)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_exact_mip(smsp, brute_force):
+    # with the columns which could be in a better schedule, the MIP is exact
+    model = _colgen(smsp)
+    with pytest.raises(ValueError, match="needs the solved LP relaxation"):
+        model.add_columns_by_reduced_cost(0)
+    model.optimize()
+    model.add_columns_by_reduced_cost(heuristic_sequence(smsp)[1])
+    model.set_relax(False)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.within_time_windows(schedule)
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(smsp)
+    )
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from smsp_bi import dp
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+@pytest.mark.parametrize("smsp", _random_problems(6))
+def test_solve(smsp, brute_force):
+    optimum = brute_force(smsp)
+    upper_bounds = [None, heuristic_sequence(smsp)[1], optimum]
+    for upper_bound in upper_bounds:
+        for chunk_size in (3, 2**16):
+            schedule = dp.solve(smsp, upper_bound, chunk_size)
+            schedule.validate()
+            assert smsp.get_objective_from_schedule(schedule) == pytest.approx(optimum)
+    if optimum > 0:
+        with pytest.raises(ValueError, match="no schedule costs at most"):
+            dp.solve(smsp, upper_bound=optimum - 0.5)
+
+
+def test_medium():
+    # too many jobs for brute force, so checked against the TI model
+    smsp = _random_problems(1, n=12, seed=1)[0]
+    model = ti_matrix.TI(smsp)
+    model.optimize()
+    assert model.is_optimal()
+    assert smsp.get_objective_from_schedule(dp.solve(smsp)) == pytest.approx(
+        smsp.get_objective_from_schedule(model.get_schedule())
+    )
+
+
+def test_too_many_jobs():
+    with pytest.raises(ValueError, match="too many jobs"):
+        dp.solve(SMSP(np.ones(31, dtype=int)))
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([2, 3, 4], [2, 3, 4], release_dates=[0, 5, 0]),
+        SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9]),
+    ],
+)
+def test_time_windows(smsp):
+    with pytest.raises(NotImplementedError, match="does not support release dates"):
+        dp.solve(smsp)
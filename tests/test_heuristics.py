@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from smsp_bi import heuristics
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=6, seed=0, release=False):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        release_dates = rng.integers(0, 6, n) if release else None
+        problems.append(SMSP(p, d, c, release_dates=release_dates))
+    return problems
+
+
+def _move(sequence, i, r):
+    sequence = list(sequence)
+    sequence.insert(r, sequence.pop(i))
+    return sequence
+
+
+PROBLEMS = _random_problems(4) + _random_problems(2, seed=1, release=True)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_deltas(smsp):
+    # the changes in objective from each move, against evaluating the moves
+    sequence = heuristics.atc(smsp)
+    n = len(sequence)
+    objective = smsp.evaluate_sequences(sequence)[0]
+    swaps = [_move(sequence, i, i + 1) for i in range(n - 1)]
+    np.testing.assert_allclose(
+        heuristics.adjacent_swap_deltas(smsp, sequence),
+        smsp.evaluate_sequences(swaps) - objective,
+    )
+    insertions = [[_move(sequence, i, r) for r in range(n)] for i in range(n)]
+    np.testing.assert_allclose(
+        heuristics.insertion_deltas(smsp, sequence),
+        smsp.evaluate_sequences(np.reshape(insertions, (n * n, n))).reshape(n, n)
+        - objective,
+    )
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_heuristic_sequence(smsp, brute_force):
+    sequence, objective = heuristics.heuristic_sequence(smsp)
+    assert sorted(sequence) == list(range(len(sequence)))
+    assert objective == pytest.approx(smsp.evaluate_sequences(sequence)[0])
+    assert objective >= brute_force(smsp) - 1e-9
+    # no adjacent swap or insertion improves on a local optimum
+    assert heuristics.adjacent_swap_deltas(smsp, sequence).min() >= -1e-9
+    assert heuristics.insertion_deltas(smsp, sequence).min() >= -1e-9
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("rule", [heuristics.edd, heuristics.atc])
+def test_rules(rule, smsp):
+    sequence = rule(smsp)
+    assert sorted(sequence) == list(range(len(sequence)))
+
+
+def test_deadlines():
+    # only sequences starting with job 2 meet its deadline, and neither edd
+    # nor atc start with it
+    smsp = SMSP([3, 4, 2], [0, 0, 9], [2, 2, 1], deadlines=[20, 20, 2])
+    sequence, objective = heuristics.heuristic_sequence(smsp)
+    assert sequence[0] == 2
+    assert smsp.within_time_windows(smsp.get_schedule_from_sequence(sequence))
+    assert objective == pytest.approx(smsp.evaluate_sequences(sequence)[0])
+
+
+def test_missed_deadlines():
+    smsp = SMSP([3, 4], deadlines=[3, 3])
+    assert heuristics.heuristic_sequence(smsp)[1] == np.inf
@@ -0,0 +1,34 @@
+import pytest
+
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_pulp.BI_2,
+    bi_pulp.BI_2_slim,
+    bi_pulp.BI_2_V,
+    bi_pulp.BI_3,
+    ti_pulp.TI,
+]
+
+# instances whose heuristic sequence (shortest processing time first) is
+# optimal, with an integer and a fractional objective
+PROBLEMS = [
+    SMSP([3, 4, 5], [0, 0, 0], [1, 1, 1]),
+    SMSP([3, 4, 5], [0, 0, 0], [0.5, 0.5, 0.5]),
+]
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_optimal_incumbent(formulation, smsp):
+    sequence, objective = heuristic_sequence(smsp)
+    model = formulation(smsp)
+    model.set_incumbent(sequence)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(objective)
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from smsp_bi.base.indices import BucketIndices, TimeIndices
+
+
+def _bucket_indices(seed, n_jobs=4, n_buckets=6):
+    # random ranges of buckets, some empty, for k = 0 and 1
+    rng = np.random.default_rng(seed)
+    first = rng.integers(1, n_buckets + 1, (n_jobs, 2))
+    last = np.minimum(first + rng.integers(-1, 3, (n_jobs, 2)), n_buckets)
+    spans = rng.integers(1, 4, (n_jobs, 2))
+    return first, last, spans, n_buckets
+
+
+def _time_indices(seed, n_jobs=4, n_periods=10):
+    rng = np.random.default_rng(seed)
+    p = rng.integers(1, 4, n_jobs)
+    first = rng.integers(1, n_periods, n_jobs)
+    last = np.minimum(first + rng.integers(-1, 5, n_jobs), n_periods - p + 1)
+    return first, last, p, n_periods
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bucket_indices(seed):
+    first, last, spans, n_buckets = _bucket_indices(seed)
+    indices = BucketIndices.from_ranges(first, last, spans, n_buckets)
+    expected = [
+        (j, b, k)
+        for j in range(len(first))
+        for k in range(2)
+        for b in range(first[j, k], last[j, k] + 1)
+    ]
+    assert list(indices) == expected
+    assert len(indices) == len(expected)
+    for col, index in enumerate(expected):
+        assert indices[col] == index
+        assert index in indices
+        assert indices.get_column(index) == col
+        assert indices.column[index] == col
+    assert (0, 0, 0) not in indices
+    assert indices.get_column((0, 0, 0)) == -1
+    for j in range(len(first)):
+        assert indices.job(j) == [index for index in expected if index[0] == j]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_time_indices(seed):
+    first, last, p, n_periods = _time_indices(seed)
+    indices = TimeIndices.from_ranges(first, last, p, n_periods)
+    expected = [(j, t) for j in range(len(first)) for t in range(first[j], last[j] + 1)]
+    assert list(indices) == expected
+    for col, index in enumerate(expected):
+        assert indices[col] == index
+        assert index in indices
+        assert indices.get_column(index) == col
+    assert (0, 0) not in indices
+    assert indices.get_column((0, 0)) == -1
+    for j in range(len(first)):
+        assert indices.job(j) == [index for index in expected if index[0] == j]
+
+
+def _partition(p, bounds, earliest, latest, contained):
+    # the (j, b, e) of each job, bucket it can start in and bucket it then
+    # completes in, from each of its start times
+    partition = set()
+    for j in range(len(p)):
+        for s in range(earliest[j], latest[j] + 1):
+            b = np.searchsorted(bounds, s, side="right")
+            e = np.searchsorted(bounds, s + p[j], side="right")
+            if (e > b or contained) and e < len(bounds):
+                partition.add((j, b, e))
+    return partition
+
+
+def _starts(indices):
+    return set(zip(indices.j.tolist(), indices.b.tolist(), indices.e.tolist()))
+
+
+def _scan(indices, keep):
+    # the indices, in column order, whose bucket and end bucket pass keep
+    return [
+        index
+        for col, index in enumerate(indices)
+        if keep(indices.b[col], indices.e[col])
+    ]
+
+
+@pytest.mark.parametrize("contained", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_bucket_adjacency(seed, contained):
+    rng = np.random.default_rng(seed)
+    p = rng.integers(1, 6, 4)
+    bounds = np.concatenate(([0], np.cumsum(rng.integers(1, 5, 6))))
+    earliest = np.zeros(4, dtype=int)
+    latest = bounds[-1] - p
+    indices = BucketIndices.from_partition(p, bounds, earliest, latest, contained)
+    assert _starts(indices) == _partition(p, bounds, earliest, latest, contained)
+    for b in range(1, len(bounds)):
+        assert indices.starting(b) == _scan(indices, lambda a, e: a == b < e)
+        assert indices.ending(b) == _scan(indices, lambda a, e: a < e == b)
+        assert indices.contained(b) == _scan(indices, lambda a, e: a == e == b)
+        assert indices.spanning(b) == _scan(indices, lambda a, e: a < b < e)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_time_adjacency(seed):
+    first, last, p, n_periods = _time_indices(seed)
+    indices = TimeIndices.from_ranges(first, last, p, n_periods)
+    for t in range(1, n_periods + 1):
+        assert indices.covering(t) == [(j, s) for j, s in indices if s <= t < s + p[j]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bucket_windows(seed):
+    # jobs may be unable to start in some buckets, within their windows
+    rng = np.random.default_rng(seed)
+    p = rng.integers(1, 6, 4)
+    bounds = np.concatenate(([0], np.cumsum(rng.integers(1, 5, 6))))
+    earliest = rng.integers(0, 6, 4)
+    latest = np.minimum(earliest + rng.integers(0, 8, 4), bounds[-1] - p)
+    for contained in (False, True):
+        indices = BucketIndices.from_partition(p, bounds, earliest, latest, contained)
+        assert _starts(indices) == _partition(p, bounds, earliest, latest, contained)
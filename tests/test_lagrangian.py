@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from smsp_bi import lagrangian
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+@pytest.mark.parametrize("smsp", _random_problems(6))
+def test_lower_bound(smsp, brute_force):
+    bound, sequence, objective = lagrangian.lower_bound(smsp)
+    relaxation = ti_matrix.TI(smsp, relax=True)
+    relaxation.optimize()
+    assert bound <= relaxation.get_bound() + 1e-6
+    assert bound <= brute_force(smsp) + 1e-6
+    assert sorted(sequence) == list(range(6))
+    assert objective == pytest.approx(smsp.evaluate_sequences(sequence)[0])
+    assert objective >= brute_force(smsp) - 1e-9
+
+
+def test_proves_optimality():
+    # the bound reaches the objective of an optimal incumbent
+    smsp = SMSP([3, 4, 5], [0, 0, 0], [1, 1, 1])
+    bound, sequence, objective = lagrangian.lower_bound(smsp, incumbent=[0, 1, 2])
+    assert objective == 10
+    assert bound > objective - 1
+
+
+def test_improves_incumbent():
+    # the subproblem schedules improve on a poor incumbent
+    smsp = SMSP([5, 4, 3], [0, 0, 0], [1, 1, 1])
+    bound, sequence, objective = lagrangian.lower_bound(smsp, incumbent=[0, 1, 2])
+    assert objective < smsp.evaluate_sequences([0, 1, 2])[0]
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([2, 3, 4], [2, 3, 4], release_dates=[0, 5, 0]),
+        SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9]),
+    ],
+)
+def test_time_windows(smsp):
+    with pytest.raises(NotImplementedError, match="does not support release dates"):
+        lagrangian.lower_bound(smsp)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.utils import SMSP, get_example_problem
+
+# each model built with gurobi's matrix API, with the model it reproduces
+PAIRS = [
+    (bi_gurobi.BI_2_matrix, bi_gurobi.BI_2),
+    (bi_gurobi.BI_2_slim_matrix, bi_gurobi.BI_2_slim),
+    (ti_gurobi.TI_matrix, ti_gurobi.TI),
+]
+
+
+def _random_problems(count, n=6, seed=0):
+    # small enough for gurobi's restricted license
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        p = rng.integers(1, 9, n)
+        d = rng.integers(0, p.sum() // 2 + 1, n)
+        c = rng.integers(1, 10, n)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+PROBLEMS = [get_example_problem()] + _random_problems(5)
+
+
+def _solve(formulation, smsp, relax=False):
+    model = formulation(smsp, relax=relax)
+    model.m.setParam("OutputFlag", 0)
+    model.optimize()
+    assert model.is_optimal()
+    return model
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("matrix_formulation, formulation", PAIRS)
+def test_optimal_objective(matrix_formulation, formulation, smsp, brute_force):
+    matrix_model = _solve(matrix_formulation, smsp)
+    model = _solve(formulation, smsp)
+    matrix_schedule = matrix_model.get_schedule()
+    matrix_schedule.validate()
+    assert smsp.get_objective_from_schedule(matrix_schedule) == pytest.approx(
+        smsp.get_objective_from_schedule(model.get_schedule())
+    )
+    assert matrix_model.m.ObjVal == pytest.approx(model.m.ObjVal)
+    if len(smsp._processing_times) <= 6:
+        assert smsp.get_objective_from_schedule(matrix_schedule) == pytest.approx(
+            brute_force(smsp)
+        )
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("matrix_formulation, formulation", PAIRS)
+def test_relaxation_bound(matrix_formulation, formulation, smsp):
+    matrix_model = _solve(matrix_formulation, smsp, relax=True)
+    model = _solve(formulation, smsp, relax=True)
+    assert matrix_model.get_bound() == pytest.approx(model.get_bound())
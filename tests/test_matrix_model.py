@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+# each model built as a scipy sparse matrix, with the gurobi model it exports
+PAIRS = [
+    (bi_matrix.BI_2, bi_gurobi.BI_2),
+    (bi_matrix.BI_2_slim, bi_gurobi.BI_2_slim),
+    (ti_matrix.TI, ti_gurobi.TI),
+]
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 9, n)
+        d = rng.integers(0, p.sum() // 2 + 1, n)
+        c = rng.integers(1, 10, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+PROBLEMS = _random_problems(4)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("matrix_formulation", [pair[0] for pair in PAIRS])
+def test_optimal_objective(matrix_formulation, smsp, brute_force):
+    model = matrix_formulation(smsp)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(smsp)
+    )
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("matrix_formulation, formulation", PAIRS)
+def test_same_model(matrix_formulation, formulation, smsp):
+    matrix_model = matrix_formulation(smsp, relax=True)
+    matrix_model.m.update()
+    model = formulation(smsp, relax=True)
+    model.m.setParam("OutputFlag", 0)
+    model.m.update()
+    assert matrix_model.m.A.shape == (model.m.NumConstrs, model.m.NumVars)
+    assert matrix_model.m.num_nz == model.m.NumNZs
+    matrix_model.optimize()
+    model.optimize()
+    assert matrix_model.get_bound() == pytest.approx(model.get_bound())
@@ -0,0 +1,119 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from smsp_bi import preprocessing
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_V,
+    bi_gurobi.BI_3,
+    bi_pulp.BI_2_slim,
+    bi_pulp.BI_3,
+    bi_matrix.BI_2,
+    bi_matrix.BI_2_slim,
+    ti_matrix.TI,
+    ti_pulp.TI,
+]
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+PROBLEMS = _random_problems(6)
+
+
+def _optimal_sequences(smsp):
+    sequences = np.array(list(itertools.permutations(range(6))))
+    objectives = smsp.evaluate_sequences(sequences)
+    return sequences[np.isclose(objectives, objectives.min())]
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_windows(smsp):
+    # some optimal sequence satisfies every precedence and starts every job
+    # within its window
+    before = preprocessing.precedences(smsp)
+    earliest, latest = preprocessing.start_windows(smsp, before=before)
+    p = smsp._processing_times
+    kept = []
+    for sequence in _optimal_sequences(smsp):
+        position = np.argsort(sequence)
+        start_times = (np.cumsum(p[sequence]) - p[sequence])[position]
+        i, j = np.nonzero(before)
+        if np.all(position[i] < position[j]) and np.all(
+            (earliest <= start_times) & (start_times <= latest)
+        ):
+            kept.append(sequence)
+    assert kept
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS[:3])
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+@pytest.mark.parametrize("preprocess, precedences", [(True, False), (True, True)])
+def test_preprocessed_models(formulation, preprocess, precedences, smsp, brute_force):
+    model = formulation(smsp, preprocess=preprocess, precedences=precedences)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(smsp)
+    )
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([2, 3, 4], [2, 3, 4], release_dates=[0, 5, 0]),
+        SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9]),
+    ],
+)
+def test_time_windows(smsp):
+    match = "preprocessing does not support release dates or deadlines"
+    with pytest.raises(NotImplementedError, match=match):
+        preprocessing.precedences(smsp)
+    with pytest.raises(NotImplementedError, match=match):
+        preprocessing.start_windows(smsp)
+    with pytest.raises(NotImplementedError, match=match):
+        bi_matrix.BI_2(smsp, preprocess=True)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_precedence_pairs(smsp):
+    # the pairs kept imply every precedence
+    before = preprocessing.precedences(smsp)
+    kept = np.zeros_like(before)
+    kept[preprocessing.precedence_pairs(before)] = True
+    assert not (kept & ~before).any()
+    np.testing.assert_array_equal(preprocessing._transitive_closure(kept), before)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS[:3])
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_precedence_constraints(formulation, smsp, brute_force):
+    model = formulation(smsp, precedences=True)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(smsp)
+    )
+    i, j = np.nonzero(preprocessing.precedences(smsp))
+    assert np.all(schedule.start_times[i] < schedule.start_times[j])
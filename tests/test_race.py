@@ -0,0 +1,51 @@
+import pytest
+
+from smsp_bi.batch import race
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.bnb import BranchAndBound
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+# pulp racers get no shared bounds, so each proves optimality by itself
+FORMULATIONS = [bi_pulp.BI_2, bi_pulp.BI_2_slim, ti_pulp.TI]
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([3, 4, 5], [0, 0, 0], [1, 1, 1]),
+        SMSP([3, 4, 5], [0, 0, 0], [0.5, 0.5, 0.5]),
+    ],
+)
+def test_race_optimal_incumbent(smsp):
+    # the heuristic sequence is optimal, and is the racers' MIP start and cutoff
+    _, objective = heuristic_sequence(smsp)
+    result = race(smsp, FORMULATIONS)
+    assert result.error is None
+    assert result.optimal
+    assert result.objective == pytest.approx(objective)
+
+
+class _Failing:
+    # a formulation whose models can not be built
+    def __init__(self, smsp):
+        raise ValueError("can not build")
+
+
+def test_race_errors():
+    result = race(SMSP([3, 4, 5], [0, 0, 0], [1, 1, 1]), [_Failing, _Failing])
+    assert result.index is None
+    assert result.error == (
+        "no formulation found a solution (0: ValueError('can not build'); "
+        "1: ValueError('can not build'))"
+    )
+
+
+def test_race_branch_and_bound(brute_force):
+    # branch and bound has no gurobi model to share incumbents with
+    smsp = SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2])
+    result = race(smsp, [BranchAndBound])
+    assert result.error is None
+    assert result.optimal
+    assert result.objective == pytest.approx(brute_force(smsp))
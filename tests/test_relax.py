@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.heuristics import heuristic_sequence
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_slim,
+    bi_gurobi.BI_3,
+    ti_gurobi.TI,
+    bi_pulp.BI_2,
+    bi_pulp.BI_2_V,
+    ti_pulp.TI,
+    bi_matrix.BI_2,
+    bi_matrix.BI_2_slim,
+    ti_matrix.TI,
+]
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+@pytest.mark.parametrize("smsp", _random_problems(3))
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_reduced_cost_fixing(formulation, smsp, brute_force):
+    # the LP bound is at most the optimum, and fixing by the reduced costs
+    # of the LP keeps an optimal solution of the MIP
+    optimum = brute_force(smsp)
+    model = formulation(smsp, relax=True)
+    with pytest.raises(ValueError, match="needs the LP relaxation"):
+        formulation(smsp).fix_by_reduced_cost(optimum)
+    model.optimize()
+    assert model.is_optimal()
+    assert model.get_bound() <= optimum + 1e-6
+    upper_bound = heuristic_sequence(smsp)[1]
+    assert model.fix_by_reduced_cost(upper_bound) >= 0
+    model.set_relax(False)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(optimum)
+
+
+def test_fixes_variables():
+    # the LP bound is the optimum, so variables of costlier solutions are
+    # fixed
+    smsp = SMSP([3, 4, 5], [0, 0, 0], [1, 1, 1])
+    model = ti_matrix.TI(smsp, relax=True)
+    model.optimize()
+    optimum = heuristic_sequence(smsp)[1]
+    assert model.get_bound() == pytest.approx(optimum)
+    assert model.fix_by_reduced_cost(optimum) > 0
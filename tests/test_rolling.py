@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from smsp_bi import heuristics
+from smsp_bi.rolling import rolling_horizon
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+
+def _random_problems(count, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n) / (2 if i % 2 else 1)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+PROBLEMS = _random_problems(4)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_one_window(smsp, brute_force):
+    # a window of every job solves the whole instance
+    schedule, results = rolling_horizon(smsp, ti_matrix.TI, window=6, overlap=2)
+    schedule.validate()
+    assert len(results) == 1
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(smsp)
+    )
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize(
+    "rules", [(), (heuristics.edd,), (heuristics.edd, heuristics.atc)]
+)
+def test_windows(rules, smsp, brute_force):
+    # windows of 3 jobs, fixing 2 at a time, are no worse than the heuristic
+    sequence, objective = heuristics.heuristic_sequence(smsp)
+    schedule, results = rolling_horizon(
+        smsp, ti_matrix.TI, window=3, overlap=1, rules=rules, workers=1
+    )
+    schedule.validate()
+    assert sorted(np.argsort(schedule.start_times)) == list(range(6))
+    assert [result.index for result in results] == [0, 1, 2]
+    assert all(result.error is None for result in results)
+    value = smsp.get_objective_from_schedule(schedule)
+    assert brute_force(smsp) - 1e-9 <= value <= objective + 1e-9
+
+
+def test_overlap():
+    with pytest.raises(ValueError, match="overlap must be"):
+        rolling_horizon(PROBLEMS[0], ti_matrix.TI, window=3, overlap=3)
+
+
+@pytest.mark.parametrize(
+    "smsp",
+    [
+        SMSP([2, 3, 4], [2, 3, 4], release_dates=[0, 5, 0]),
+        SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9]),
+    ],
+)
+def test_time_windows(smsp):
+    with pytest.raises(NotImplementedError, match="does not support release dates"):
+        rolling_horizon(smsp, ti_matrix.TI)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_slim,
+    bi_gurobi.BI_2_V,
+    bi_gurobi.BI_3,
+    bi_gurobi.BI_2_matrix,
+    bi_gurobi.BI_2_slim_matrix,
+    ti_gurobi.TI,
+    ti_gurobi.TI_matrix,
+    bi_pulp.BI_2,
+    bi_pulp.BI_2_slim,
+    bi_pulp.BI_2_V,
+    bi_pulp.BI_3,
+    ti_pulp.TI,
+    bi_matrix.BI_2,
+    bi_matrix.BI_2_slim,
+    ti_matrix.TI,
+]
+
+
+def _random_problems(count, n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        problems.append(SMSP(p, d, c))
+    return problems
+
+
+@pytest.mark.parametrize("smsp", _random_problems(3))
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_schedule(formulation, smsp, brute_force):
+    # the start times of the optimal solution give a schedule of its objective
+    model = formulation(smsp)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert schedule.start_times.dtype.kind == "i"
+    assert np.all(schedule.start_times >= 0)
+    np.testing.assert_array_equal(
+        schedule.end_times, schedule.start_times + smsp._processing_times
+    )
+    objective = smsp.get_objective_from_schedule(schedule)
+    assert objective == pytest.approx(model.get_bound())
+    assert objective == pytest.approx(brute_force(smsp))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from smsp_bi import selection
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = {
+    "TI": ti_matrix.TI,
+    "BI_2": bi_matrix.BI_2,
+    "BI_2_slim": bi_matrix.BI_2_slim,
+}
+
+
+def _random_problems(count, n=6, seed=0, windows=False):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        p = rng.integers(2, 12, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        if windows:
+            release_dates = rng.integers(0, 10, n)
+            deadlines = release_dates + p + rng.integers(p.sum(), 2 * p.sum(), n)
+            problems.append(SMSP(p, d, c, release_dates, deadlines))
+        else:
+            problems.append(SMSP(p, d, c))
+    return problems
+
+
+PROBLEMS = _random_problems(5) + _random_problems(5, seed=1, windows=True)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_formulation_sizes(smsp):
+    # the sizes predicted match those of the models built
+    for name, size in selection.formulation_sizes(smsp).items():
+        model = FORMULATIONS[name](smsp)
+        assert (size["num_constrs"], size["num_vars"], size["num_nz"]) == (
+            model._size()
+        )
+
+
+@pytest.mark.parametrize("backend", ["gurobi", "pulp", "matrix"])
+def test_choose_formulation(backend, brute_force):
+    # long jobs make the TI model far bigger than the BI models
+    smsp = SMSP([120, 170, 90, 200, 150], [100, 300, 50, 400, 250], [1, 2, 3, 1, 2])
+    formulation = selection.choose_formulation(smsp, backend)
+    assert formulation.__module__ == f"smsp_bi.bi.{backend}"
+    assert formulation.__name__ in ("BI_2", "BI_2_slim")
+    model = formulation(smsp)
+    model.optimize()
+    assert smsp.get_objective_from_schedule(model.get_schedule()) == pytest.approx(
+        brute_force(smsp)
+    )
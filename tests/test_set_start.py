@@ -0,0 +1,73 @@
+import itertools
+
+import numpy as np
+import pytest
+from gurobipy import GRB
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+
+GUROBI_FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_slim,
+    bi_gurobi.BI_2_V,
+    bi_gurobi.BI_3,
+    bi_gurobi.BI_2_matrix,
+    bi_gurobi.BI_2_slim_matrix,
+    ti_gurobi.TI,
+    ti_gurobi.TI_matrix,
+]
+
+MATRIX_FORMULATIONS = [bi_matrix.BI_2, bi_matrix.BI_2_slim, ti_matrix.TI]
+
+SMSP_ = SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2])
+
+# every seventh sequence of the jobs of SMSP_
+SEQUENCES = list(itertools.permutations(range(5)))[::7]
+
+
+@pytest.mark.parametrize("formulation", GUROBI_FORMULATIONS)
+def test_gurobi_start(formulation):
+    # the start, with every variable fixed to its value, is feasible and has
+    # the objective of the sequence
+    for sequence in SEQUENCES:
+        model = formulation(SMSP_)
+        model.m.setParam("OutputFlag", 0)
+        model.set_start(sequence)
+        model.m.update()
+        variables = model.m.getVars()
+        start = model.m.getAttr("Start", variables)
+        assert max(start) < GRB.UNDEFINED
+        model.m.setAttr("LB", variables, start)
+        model.m.setAttr("UB", variables, start)
+        model.m.optimize()
+        assert model.m.Status == GRB.OPTIMAL
+        assert model.m.ObjVal == pytest.approx(SMSP_.evaluate_sequences([sequence])[0])
+
+
+@pytest.mark.parametrize("formulation", MATRIX_FORMULATIONS)
+def test_matrix_start(formulation):
+    for sequence in SEQUENCES:
+        model = formulation(SMSP_)
+        model.set_start(sequence)
+        m = model.m
+        m.update()
+        x = m.start
+        assert not np.isnan(x).any()
+        assert np.all((m.lb <= x) & (x <= m.ub))
+        row = m.A @ x
+        assert np.all(row[m.sense == "<"] <= m.rhs[m.sense == "<"] + 1e-9)
+        assert np.all(row[m.sense == ">"] >= m.rhs[m.sense == ">"] - 1e-9)
+        np.testing.assert_allclose(row[m.sense == "="], m.rhs[m.sense == "="])
+        assert m.obj @ x == pytest.approx(SMSP_.evaluate_sequences([sequence])[0])
+
+
+@pytest.mark.parametrize("formulation", MATRIX_FORMULATIONS)
+def test_start_misses_deadline(formulation):
+    smsp = SMSP([2, 3, 4], [2, 3, 4], [1, 1, 1], deadlines=[9, 9, 4])
+    model = formulation(smsp)
+    with pytest.raises(ValueError, match="misses release dates or deadlines"):
+        model.set_start([0, 1, 2])
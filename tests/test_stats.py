@@ -0,0 +1,85 @@
+import json
+import tracemalloc
+
+import pytest
+
+from smsp_bi import stats
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_3,
+    ti_gurobi.TI,
+    bi_pulp.BI_2_slim,
+    ti_pulp.TI,
+    bi_matrix.BI_2,
+    ti_matrix.TI,
+]
+
+SMSP_ = SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2])
+
+
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_stages(formulation):
+    # the sizes added by the stages sum to the size of the model
+    model = formulation(SMSP_)
+    records = model.stats.to_dict()["stages"]
+    assert records
+    totals = [
+        sum(record[key] for record in records)
+        for key in ("rows", "columns", "nonzeros")
+    ]
+    assert tuple(totals) == tuple(model._size())
+    for record in records:
+        assert record["seconds"] >= 0
+        assert record["peak_memory"] is None
+
+
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_solves(formulation):
+    model = formulation(SMSP_)
+    model.optimize()
+    model.optimize()
+    solves = model.stats.to_dict()["solves"]
+    assert len(solves) == 2
+    for record in solves:
+        assert record["stage"] == "optimize"
+        assert set(record) >= {"seconds", "status", "solver_seconds", "nodes", "gap"}
+    assert json.loads(model.stats.to_json())["solves"][0]["stage"] == "optimize"
+
+
+def test_callback():
+    received = []
+
+    def callback(model_stats, record):
+        received.append((model_stats.name, record["stage"]))
+
+    stats.add_callback(callback)
+    try:
+        model = ti_matrix.TI(SMSP_)
+        model.optimize()
+    finally:
+        stats.remove_callback(callback)
+    ti_matrix.TI(SMSP_)
+    records = model.stats.stages + model.stats.solves
+    assert received == [(model.stats.name, record["stage"]) for record in records]
+    assert model.stats.name == "smsp_bi.ti.matrix.TI"
+
+
+@pytest.mark.skipif(
+    not hasattr(tracemalloc, "reset_peak"), reason="needs python 3.9 or later"
+)
+def test_peak_memory():
+    tracemalloc.start()
+    try:
+        model = bi_matrix.BI_2(SMSP_)
+    finally:
+        tracemalloc.stop()
+    assert all(record["peak_memory"] >= 0 for record in model.stats.stages)
+    assert any(record["peak_memory"] > 0 for record in model.stats.stages)
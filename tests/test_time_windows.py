@@ -0,0 +1,93 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_slim,
+    bi_gurobi.BI_2_V,
+    bi_gurobi.BI_3,
+    bi_gurobi.BI_2_matrix,
+    bi_gurobi.BI_2_slim_matrix,
+    ti_gurobi.TI,
+    ti_gurobi.TI_matrix,
+    bi_pulp.BI_2,
+    bi_pulp.BI_2_slim,
+    bi_pulp.BI_2_V,
+    bi_pulp.BI_3,
+    ti_pulp.TI,
+    bi_matrix.BI_2,
+    bi_matrix.BI_2_slim,
+    ti_matrix.TI,
+]
+
+
+def _random_problems(count, n=5, seed=0):
+    # release dates, and deadlines which the earliest deadline sequence meets
+    rng = np.random.default_rng(seed)
+    problems = []
+    for i in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        release_dates = rng.integers(0, 10, n)
+        if i % 2:
+            problems.append(SMSP(p, d, c, release_dates))
+            continue
+        order = rng.permutation(n)
+        end_times = SMSP(p, d, c, release_dates)._end_times(order)
+        deadlines = np.empty(n, dtype=int)
+        deadlines[order] = end_times + rng.integers(0, 4, n)
+        problems.append(SMSP(p, d, c, release_dates, deadlines))
+    return problems
+
+
+def _optimal_objective(smsp):
+    # the least objective of the sequences which meet the deadlines, each job
+    # started as early as possible
+    sequences = np.array(list(itertools.permutations(range(5))))
+    objectives = smsp.evaluate_sequences(sequences)
+    return objectives[smsp._deadline_excess(sequences) == 0].min()
+
+
+PROBLEMS = _random_problems(4)
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_time_windows(formulation, smsp):
+    model = formulation(smsp)
+    model.optimize()
+    assert model.is_optimal()
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert smsp.within_time_windows(schedule)
+    assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+        _optimal_objective(smsp)
+    )
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_pruning(smsp):
+    # jobs complete within the horizon, and TI has a variable only for each
+    # start time within a job's window
+    earliest, latest = smsp.time_windows()
+    assert np.all(latest + smsp._processing_times <= smsp.horizon())
+    assert np.all(earliest <= latest)
+    model = ti_matrix.TI(smsp)
+    assert len(model.x_indices) == (latest - earliest + 1).sum()
+
+
+def test_colgen_deadlines():
+    smsp = SMSP([2, 3, 4], [2, 3, 4], deadlines=[9, 9, 9])
+    with pytest.raises(NotImplementedError, match="does not support deadlines"):
+        ti_gurobi.TI_colgen(smsp)
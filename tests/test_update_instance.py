@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from smsp_bi.bi import gurobi as bi_gurobi
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.bi import pulp as bi_pulp
+from smsp_bi.ti import gurobi as ti_gurobi
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.ti import pulp as ti_pulp
+from smsp_bi.utils import SMSP
+
+FORMULATIONS = [
+    bi_gurobi.BI_2,
+    bi_gurobi.BI_2_slim,
+    bi_gurobi.BI_2_V,
+    bi_gurobi.BI_3,
+    bi_gurobi.BI_2_matrix,
+    bi_gurobi.BI_2_slim_matrix,
+    ti_gurobi.TI,
+    ti_gurobi.TI_matrix,
+    bi_pulp.BI_2,
+    bi_pulp.BI_2_slim,
+    bi_pulp.BI_2_V,
+    bi_pulp.BI_3,
+    ti_pulp.TI,
+    bi_matrix.BI_2,
+    bi_matrix.BI_2_slim,
+    ti_matrix.TI,
+]
+
+
+def _updates(count, n=5, seed=0):
+    # instances, with the due dates and costs they are updated to, about
+    # half of which change for each job
+    rng = np.random.default_rng(seed)
+    updates = []
+    for _ in range(count):
+        p = rng.integers(1, 8, n)
+        d = rng.integers(0, p.sum(), n)
+        c = rng.integers(1, 6, n)
+        changed = rng.random((2, n)) < 0.5
+        due_dates = np.where(changed[0], rng.integers(0, p.sum(), n), d)
+        cost = np.where(changed[1], rng.integers(1, 6, n), c)
+        updates.append((SMSP(p, d, c), due_dates, cost))
+    return updates
+
+
+def _optimize(model):
+    if hasattr(model.m, "setParam"):
+        model.m.setParam("OutputFlag", 0)
+    model.optimize()
+    assert model.is_optimal()
+
+
+@pytest.mark.parametrize("smsp, due_dates, cost", _updates(3))
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_update_instance(formulation, smsp, due_dates, cost, brute_force):
+    model = formulation(smsp)
+    _optimize(model)
+    model.update_instance(due_dates=due_dates, cost=cost)
+    _optimize(model)
+    updated = SMSP(smsp._processing_times, due_dates, cost)
+    schedule = model.get_schedule()
+    schedule.validate()
+    assert updated.get_objective_from_schedule(schedule) == pytest.approx(
+        brute_force(updated)
+    )
+
+
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_update_instance_twice(formulation, brute_force):
+    # the second update restores the due dates of the first instance, so
+    # needs indices which the first dropped
+    smsp = SMSP([3, 4, 5, 2], [2, 9, 4, 6], [1, 2, 3, 1])
+    model = formulation(smsp)
+    model.update_instance(due_dates=[8, 1, 4, 0])
+    model.update_instance(due_dates=[2, 9, 4, 6], cost=[2, 1, 1, 3])
+    _optimize(model)
+    updated = SMSP([3, 4, 5, 2], [2, 9, 4, 6], [2, 1, 1, 3])
+    assert updated.get_objective_from_schedule(model.get_schedule()) == pytest.approx(
+        brute_force(updated)
+    )
+
+
+def test_update_preprocessed():
+    model = bi_gurobi.BI_2(SMSP([3, 4, 5], [2, 9, 4], [1, 2, 3]), preprocess=True)
+    with pytest.raises(NotImplementedError):
+        model.update_instance(due_dates=[1, 2, 3])
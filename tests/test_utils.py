@@ -0,0 +1,44 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from smsp_bi.utils import SMSP
+
+
+def _objective(smsp, sequence):
+    # the objective of sequence, starting each job in turn when the previous
+    # completes or it is released
+    t = 0
+    objective = 0
+    for j in sequence:
+        t = max(t, smsp._release_dates[j])
+        objective += smsp._cost[j] * max(t - smsp._due_dates[j], 0)
+        t += smsp._processing_times[j]
+    return objective
+
+
+PROBLEMS = [
+    SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2]),
+    SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [0.5, 2, 1.5, 1, 2]),
+    SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2], [0, 9, 3, 0, 30]),
+]
+
+
+@pytest.mark.parametrize("smsp", PROBLEMS)
+def test_evaluate_sequences(smsp):
+    sequences = np.array(list(itertools.permutations(range(5))))
+    objectives = smsp.evaluate_sequences(sequences)
+    assert objectives.shape == (len(sequences),)
+    np.testing.assert_allclose(
+        objectives, [_objective(smsp, sequence) for sequence in sequences]
+    )
+    # a single sequence is evaluated as one row
+    assert smsp.evaluate_sequences(sequences[5]) == pytest.approx(objectives[5])
+    for sequence in sequences[::11]:
+        schedule = smsp.get_schedule_from_sequence(sequence)
+        schedule.validate()
+        assert smsp.within_time_windows(schedule)
+        assert smsp.get_objective_from_schedule(schedule) == pytest.approx(
+            _objective(smsp, sequence)
+        )
@@ -0,0 +1,56 @@
+import io
+
+import gurobipy as gp
+import pytest
+
+from smsp_bi.bi import matrix as bi_matrix
+from smsp_bi.ti import matrix as ti_matrix
+from smsp_bi.utils import SMSP
+from smsp_bi.writers import LPWriter, MPSWriter, write_lp, write_mps
+
+FORMULATIONS = [bi_matrix.BI_2, bi_matrix.BI_2_slim, ti_matrix.TI]
+
+# the second has an empty bucket, so an empty row in BI_2
+PROBLEMS = [
+    SMSP([2, 7, 3, 9, 4], [5, 6, 2, 20, 8], [1, 2, 3, 1, 2]),
+    SMSP([5, 7, 8, 1], [3, 17, 19, 5], [2, 4, 2, 2]),
+]
+
+WRITERS = {"lp": (write_lp, LPWriter), "mps": (write_mps, MPSWriter)}
+
+
+def _read(path):
+    env = gp.Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    return gp.read(str(path), env)
+
+
+@pytest.mark.parametrize("suffix", WRITERS)
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_round_trip(formulation, smsp, suffix, tmp_path, brute_force):
+    model = formulation(smsp)
+    path = tmp_path / f"model.{suffix}"
+    with open(path, "w") as f:
+        WRITERS[suffix][0](model.m, f)
+    m = _read(path)
+    assert (m.NumVars, m.NumConstrs) == (model.m.num_vars, model.m.num_constrs)
+    m.optimize()
+    assert m.ObjVal == pytest.approx(brute_force(smsp))
+
+
+@pytest.mark.parametrize("suffix", WRITERS)
+@pytest.mark.parametrize("smsp", PROBLEMS)
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_streaming_writer(formulation, smsp, suffix):
+    # the writers which never hold the constraint matrix write the same file
+    write, writer = WRITERS[suffix]
+    with io.StringIO() as f:
+        write(formulation(smsp, name="model").m, f)
+        expected = f.getvalue()
+    with io.StringIO() as f:
+        # small chunks, so that the columns are spooled to several files
+        with writer(f, "model", **({"chunk_size": 7} if suffix == "mps" else {})) as m:
+            formulation(smsp, model=m)
+        assert f.getvalue() == expected